@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -15,12 +16,20 @@ def _prepare_sys_path() -> None:
 
 _prepare_sys_path()
 
+# Perfil de importação da partida (CAPT_IMPORTTIME=1); precisa vir antes do resto
+from app.utils.startup import start_import_profile
+
+start_import_profile()
+
 from app.ui.app import main
 from app.utils.bootstrap import bootstrap_application
 from app.bootstrap.updater import auto_update
 
 
 if __name__ == "__main__":
+    # Necessário no executável congelado para o pool de processos do painel consolidado
+    multiprocessing.freeze_support()
+
     # Executa auto-update apenas no binario empacotado
     #if getattr(sys, "frozen", False):
         #try:
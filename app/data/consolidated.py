@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Visão consolidada do grupo: totais de várias empresas somados.
+
+O parcial de cada empresa é o seu cubo de totais, que o store guarda em
+``<arquivo>.cube.json`` com a assinatura (mtime e tamanhos) do snapshot e do
+diário. Empresas cujo arquivo não mudou entram direto desse cache; as demais
+são lidas e agregadas em paralelo num pool de processos (a leitura do JSON é
+CPU-bound e não escala com threads). Os parciais são somados célula a célula
+e continuam disponíveis para detalhar cada empresa.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Mapping
+
+from app.data import store
+from app.data.cube import AggregateCube
+from app.utils.logger import get_logger
+from app.utils.security import configure_hash_algorithm, get_hash_algorithm
+
+logger = get_logger("capt.store")
+
+
+@dataclass
+class ConsolidatedView:
+    """Cubo somado do grupo e o parcial de cada empresa (na ordem pedida)."""
+
+    total: AggregateCube
+    companies: dict[str, AggregateCube]
+    recomputed: list[str] = field(default_factory=list)
+
+
+def _parcial_empresa(caminho: str, backend: str, algoritmo: str) -> list[list[Any]]:
+    # Processo filho: backend e algoritmo de hash escolhidos no pai não são
+    # herdados no spawn; sem o algoritmo, os sidecars gravados aqui sairiam no padrão
+    store.configure_backend(backend)
+    configure_hash_algorithm(algoritmo)
+    # get_cube também grava o .cube.json, que vira o cache da próxima consolidação
+    return store.get_cube(caminho).cells()
+
+
+def _recalcular(pendentes: Mapping[str, Path], max_workers: int | None) -> dict[str, AggregateCube]:
+    if len(pendentes) < 2 or store.get_backend() == "sqlite":
+        # Um processo filho só compensa com leituras para sobrepor; no SQLite
+        # o cubo já sai de um GROUP BY indexado
+        return {nome: store.get_cube(caminho) for nome, caminho in pendentes.items()}
+    trabalhadores = min(len(pendentes), max_workers or os.cpu_count() or 1)
+    parciais: dict[str, AggregateCube] = {}
+    try:
+        with ProcessPoolExecutor(max_workers=trabalhadores) as pool:
+            futuros = {
+                nome: pool.submit(
+                    _parcial_empresa, str(caminho), store.get_backend(), get_hash_algorithm()
+                )
+                for nome, caminho in pendentes.items()
+            }
+            for nome, futuro in futuros.items():
+                try:
+                    parciais[nome] = AggregateCube.from_cells(futuro.result())
+                except Exception:
+                    logger.exception("Falha ao agregar %s em paralelo; refazendo no processo atual", nome)
+    except Exception:
+        logger.exception("Pool de processos indisponível; agregando as empresas em sequência")
+    for nome, caminho in pendentes.items():
+        if nome not in parciais:
+            parciais[nome] = store.get_cube(caminho)
+    return parciais
+
+
+def consolidate(empresas: Mapping[str, str | Path], max_workers: int | None = None) -> ConsolidatedView:
+    """Soma os cubos das empresas (nome -> arquivo), recalculando só as que mudaram."""
+    parciais: dict[str, AggregateCube] = {}
+    pendentes: dict[str, Path] = {}
+    for nome, caminho in empresas.items():
+        cubo = store.peek_cube(caminho)
+        if cubo is None:
+            pendentes[nome] = Path(caminho)
+        else:
+            parciais[nome] = cubo
+    if pendentes:
+        parciais.update(_recalcular(pendentes, max_workers))
+    companies = {nome: parciais[nome] for nome in empresas}
+    return ConsolidatedView(AggregateCube.merge(companies.values()), companies, list(pendentes))
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Cubo de totais por mês × categoria × fornecedor × forma de pagamento.
+
+Cada célula guarda soma (centavos) e quantidade. O cubo é salvo ao lado do
+arquivo da empresa (``<arquivo>.cube.json``) junto com a assinatura do
+snapshot/diário a que corresponde. Inclusões, edições e exclusões aplicam
+deltas só ao cubo em memória; o arquivo é regravado na compactação.
+Navegar entre meses, KPIs e pizza viram consultas sobre as células, sem
+percorrer os lançamentos.
+"""
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+from app.data.query import month_key, normalize_key, record_cents, record_ordinal
+from app.utils.security import atomic_write_json, checksum_is_valid
+
+CUBE_SUFFIX = ".cube.json"
+_VERSAO = 1
+
+# (mes "AAAA-MM" ou None, categoria, fornecedor normalizado, forma de pagamento)
+Celula = tuple[str | None, str, str, str]
+
+
+def cube_path_for(file_path: Path) -> Path:
+    return file_path.with_suffix(file_path.suffix + CUBE_SUFFIX)
+
+
+def cell_of(registro: Mapping[str, Any]) -> Celula:
+    """Coordenadas do lançamento no cubo."""
+    return (
+        month_key(record_ordinal(registro)),
+        str(registro.get("tipo") or registro.get("categoria") or ""),
+        normalize_key(registro.get("fornecedor")),
+        str(registro.get("forma_pagamento") or ""),
+    )
+
+
+class AggregateCube:
+    """Somas e contagens por célula, com as mesmas consultas da ``ExpenseTable``."""
+
+    def __init__(self, assinatura: Any = None) -> None:
+        self.assinatura = assinatura
+        self.celulas: dict[Celula, list[int]] = {}
+
+    @classmethod
+    def from_records(cls, registros: Iterable[Mapping[str, Any]], assinatura: Any = None) -> "AggregateCube":
+        cubo = cls(assinatura)
+        for registro in registros:
+            cubo.add(registro)
+        return cubo
+
+    @classmethod
+    def merge(cls, cubos: Iterable["AggregateCube"]) -> "AggregateCube":
+        """Soma célula a célula cubos parciais (por exemplo, de várias empresas)."""
+        total = cls()
+        for cubo in cubos:
+            for celula, (soma, quantidade) in cubo.celulas.items():
+                acumulado = total.celulas.setdefault(celula, [0, 0])
+                acumulado[0] += soma
+                acumulado[1] += quantidade
+        return total
+
+    def cells(self) -> list[list[Any]]:
+        """Linhas ``(mes, categoria, fornecedor, forma, centavos, quantidade)``, inverso de ``from_cells``."""
+        return [[*celula, soma, quantidade] for celula, (soma, quantidade) in self.celulas.items()]
+
+    @classmethod
+    def from_cells(cls, linhas: Iterable[Iterable[Any]], assinatura: Any = None) -> "AggregateCube":
+        """Monta o cubo a partir de linhas ``(mes, categoria, fornecedor, forma, centavos, quantidade)``."""
+        cubo = cls(assinatura)
+        for mes, categoria, fornecedor, forma, centavos, quantidade in linhas:
+            if quantidade:
+                cubo.celulas[(mes, categoria or "", fornecedor or "", forma or "")] = [int(centavos), int(quantidade)]
+        return cubo
+
+    # ------------------------------------------------------------------ #
+    # Atualização incremental
+    # ------------------------------------------------------------------ #
+    def add(self, registro: Mapping[str, Any], sinal: int = 1) -> None:
+        celula = cell_of(registro)
+        acumulado = self.celulas.setdefault(celula, [0, 0])
+        acumulado[0] += sinal * record_cents(registro)
+        acumulado[1] += sinal
+        if acumulado[1] <= 0:
+            del self.celulas[celula]
+
+    def remove(self, registro: Mapping[str, Any]) -> None:
+        self.add(registro, -1)
+
+    # ------------------------------------------------------------------ #
+    # Consultas (O(células))
+    # ------------------------------------------------------------------ #
+    def total(self, month: str | None = None) -> tuple[int, int]:
+        """Soma em centavos e quantidade, opcionalmente de um mês ``AAAA-MM``."""
+        centavos = quantidade = 0
+        for (mes, _, _, _), (soma, contagem) in self.celulas.items():
+            if month is None or mes == month:
+                centavos += soma
+                quantidade += contagem
+        return centavos, quantidade
+
+    def months(self) -> list[str]:
+        return sorted({mes for mes, _, _, _ in self.celulas if mes is not None})
+
+    def by_month(self) -> OrderedDict[str, float]:
+        somas: dict[str, int] = {}
+        for (mes, _, _, _), (soma, _) in self.celulas.items():
+            if mes is not None:
+                somas[mes] = somas.get(mes, 0) + soma
+        return OrderedDict((mes, somas[mes] / 100) for mes in sorted(somas))
+
+    def by_category(self, month: str | None = None) -> dict[str, float]:
+        somas: dict[str, int] = {}
+        for (mes, categoria, _, _), (soma, _) in self.celulas.items():
+            if month is None or mes == month:
+                somas[categoria] = somas.get(categoria, 0) + soma
+        return {categoria: soma / 100 for categoria, soma in somas.items()}
+
+    def top_suppliers(
+        self,
+        n: int | None = None,
+        month: str | None = None,
+        canonical: Mapping[str, str] | None = None,
+    ) -> list[tuple[str, float]]:
+        """Fornecedores por valor decrescente; ``canonical`` agrupa variantes pelo id canônico."""
+        somas: dict[str, int] = {}
+        for (mes, _, fornecedor, _), (soma, _) in self.celulas.items():
+            if fornecedor and (month is None or mes == month):
+                if canonical:
+                    fornecedor = canonical.get(fornecedor, fornecedor)
+                somas[fornecedor] = somas.get(fornecedor, 0) + soma
+        ordenados = sorted(somas.items(), key=lambda item: item[1], reverse=True)
+        if n is not None:
+            ordenados = ordenados[:n]
+        return [(fornecedor, soma / 100) for fornecedor, soma in ordenados]
+
+    def supplier_counts(self) -> dict[str, int]:
+        """Lançamentos por fornecedor normalizado (entrada do job de canonicalização)."""
+        contagens: dict[str, int] = {}
+        for (_, _, fornecedor, _), (_, quantidade) in self.celulas.items():
+            if fornecedor:
+                contagens[fornecedor] = contagens.get(fornecedor, 0) + quantidade
+        return contagens
+
+    def categories(self) -> list[str]:
+        return sorted({categoria for _, categoria, _, _ in self.celulas})
+
+    # ------------------------------------------------------------------ #
+    # Persistência
+    # ------------------------------------------------------------------ #
+    def save(self, cube_path: Path) -> None:
+        payload = {
+            "versao": _VERSAO,
+            "assinatura": list(self.assinatura) if self.assinatura is not None else None,
+            "celulas": self.cells(),
+        }
+        atomic_write_json(cube_path, payload)
+
+
+def load_cube(cube_path: Path, assinatura: Any) -> AggregateCube | None:
+    """Lê o cubo salvo; None quando ausente, corrompido ou de outra versão dos dados."""
+    if not cube_path.exists() or not checksum_is_valid(cube_path):
+        return None
+    try:
+        with open(cube_path, "r", encoding="utf-8") as handler:
+            payload = json.load(handler)
+        if payload.get("versao") != _VERSAO or payload.get("assinatura") != list(assinatura):
+            return None
+        return AggregateCube.from_cells(payload.get("celulas") or [], tuple(assinatura))
+    except (OSError, ValueError, TypeError, AttributeError):
+        return None
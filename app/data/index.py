@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""Índices em memória para filtrar os lançamentos de uma empresa.
+
+Índices invertidos (valor normalizado -> posições) para categoria, forma de
+pagamento e fornecedor e um índice de datas ordenado por ordinal. Em filtros
+seletivos (um fornecedor, um intervalo curto de datas) ``select`` parte do
+índice com menos candidatos e só aplica o predicado compilado a eles; nos
+demais casos uma varredura simples com o mesmo predicado é mais barata. O
+predicado é o de ``query.compile_filter`` sobre as chaves que o índice já
+guarda por posição (``query.record_keys``, normalizadas uma vez na inclusão).
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Any, Iterable, Mapping, Sequence
+
+from app.data.query import RecordKeys, compile_filter, normalize_filters, record_keys
+
+# Acima desta fração de candidatos a varredura completa sai mais barata
+_FRACAO_SELETIVA = 0.3
+
+_CAMPOS_INDEXADOS = ("tipo", "forma", "fornecedor")
+_ORDINAL_MAXIMO = date.max.toordinal()
+
+
+class RecordIndex:
+    """Índices alinhados às posições de uma lista de lançamentos."""
+
+    def __init__(self) -> None:
+        self._linhas: list[RecordKeys | None] = []
+        self._invertidos: dict[str, dict[Any, set[int]]] = {campo: {} for campo in _CAMPOS_INDEXADOS}
+        self._datas: list[tuple[int, int]] = []
+
+    @classmethod
+    def from_records(cls, registros: Iterable[Mapping[str, Any]]) -> "RecordIndex":
+        indice = cls()
+        indice._linhas = [record_keys(registro) for registro in registros]
+        indice._reconstruir()
+        return indice
+
+    def __len__(self) -> int:
+        return len(self._linhas)
+
+    # ------------------------------------------------------------------ #
+    # Manutenção
+    # ------------------------------------------------------------------ #
+    def _reconstruir(self) -> None:
+        self._invertidos = {campo: {} for campo in _CAMPOS_INDEXADOS}
+        datas: list[tuple[int, int]] = []
+        for posicao, chaves in enumerate(self._linhas):
+            if chaves is None:
+                continue
+            self._indexar(posicao, chaves, datas=None)
+            if chaves[0] is not None:
+                datas.append((chaves[0], posicao))
+        datas.sort()
+        self._datas = datas
+
+    def _indexar(self, posicao: int, chaves: RecordKeys, datas: list[tuple[int, int]] | None) -> None:
+        ordinal, tipo, forma, fornecedor, _ = chaves
+        for campo, valor in zip(_CAMPOS_INDEXADOS, (tipo, forma, fornecedor)):
+            self._invertidos[campo].setdefault(valor, set()).add(posicao)
+        if datas is not None and ordinal is not None:
+            insort(datas, (ordinal, posicao))
+
+    def _desindexar(self, posicao: int) -> None:
+        if self._linhas[posicao] is None:
+            return
+        ordinal, tipo, forma, fornecedor, _ = self._linhas[posicao]
+        for campo, valor in zip(_CAMPOS_INDEXADOS, (tipo, forma, fornecedor)):
+            posicoes = self._invertidos[campo].get(valor)
+            if posicoes is not None:
+                posicoes.discard(posicao)
+                if not posicoes:
+                    del self._invertidos[campo][valor]
+        if ordinal is not None:
+            alvo = bisect_left(self._datas, (ordinal, posicao))
+            if alvo < len(self._datas) and self._datas[alvo] == (ordinal, posicao):
+                del self._datas[alvo]
+
+    def append(self, registro: Mapping[str, Any]) -> None:
+        chaves = record_keys(registro)
+        self._linhas.append(chaves)
+        self._indexar(len(self._linhas) - 1, chaves, self._datas)
+
+    def update(self, posicao: int, registro: Mapping[str, Any]) -> None:
+        if not 0 <= posicao < len(self._linhas):
+            raise IndexError(posicao)
+        self._desindexar(posicao)
+        chaves = record_keys(registro)
+        self._linhas[posicao] = chaves
+        self._indexar(posicao, chaves, self._datas)
+
+    def discard(self, posicao: int) -> None:
+        """Tira a posição dos índices, deixando-a vaga."""
+        if not 0 <= posicao < len(self._linhas):
+            raise IndexError(posicao)
+        self._desindexar(posicao)
+        self._linhas[posicao] = None
+
+    # ------------------------------------------------------------------ #
+    # Consulta
+    # ------------------------------------------------------------------ #
+    def candidates(self, filtros: dict[str, Any]) -> list[int] | None:
+        """Posições do índice mais seletivo, ou None quando vale varrer tudo.
+
+        ``filtros`` já normalizados. A lista devolvida é uma cópia: pode ser
+        lida em outra thread enquanto o índice continua sendo atualizado.
+        """
+        melhor: Iterable[int] | None = None
+        tamanho = len(self._linhas)
+        for campo in _CAMPOS_INDEXADOS:
+            if campo in filtros:
+                posicoes = self._invertidos[campo].get(filtros[campo], ())
+                if len(posicoes) < tamanho:
+                    melhor, tamanho = posicoes, len(posicoes)
+        if "data_inicio" in filtros or "data_fim" in filtros:
+            inicio = bisect_left(self._datas, (filtros.get("data_inicio", 0), -1))
+            fim = bisect_right(self._datas, (filtros.get("data_fim", _ORDINAL_MAXIMO), len(self._linhas)))
+            if fim - inicio < tamanho:
+                melhor, tamanho = (posicao for _, posicao in self._datas[inicio:fim]), fim - inicio
+        if melhor is None or tamanho > len(self._linhas) * _FRACAO_SELETIVA:
+            return None
+        return sorted(melhor)
+
+    def rows(self) -> list[RecordKeys | None]:
+        """Cópia das chaves por posição (None nas vagas), para ``select_positions``."""
+        return list(self._linhas)
+
+    def select(self, filters: dict[str, Any] | None) -> list[int]:
+        """Posições (em ordem crescente) que atendem aos filtros de ``query.normalize_filters``."""
+        filtros = normalize_filters(filters)
+        return select_positions(self._linhas, filtros, self.candidates(filtros) if filtros else None)
+
+
+def select_positions(
+    linhas: Sequence[RecordKeys | None],
+    filtros: dict[str, Any],
+    candidatos: Sequence[int] | None = None,
+) -> list[int]:
+    """Aplica filtros já normalizados às posições ``candidatos`` (todas quando None).
+
+    ``linhas`` vem de ``RecordIndex.rows``. Só lê os argumentos, então roda
+    fora da thread da interface desde que ``linhas`` e ``candidatos`` sejam
+    cópias tiradas antes.
+    """
+    if not filtros:
+        return [posicao for posicao, chaves in enumerate(linhas) if chaves is not None]
+    predicado = compile_filter(filtros, keys=True)
+    if candidatos is None:
+        return [posicao for posicao, chaves in enumerate(linhas) if chaves is not None and predicado(chaves)]
+    return [posicao for posicao in candidatos if predicado(linhas[posicao])]
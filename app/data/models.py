@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""Modelo compacto de lançamento (despesa).
+
+``Despesa`` guarda a data como ordinal do dia e o valor em centavos inteiros,
+com ``__slots__`` e strings internadas para categoria, forma de pagamento e
+fornecedor. Continua se comportando como um dicionário (``get``, ``update``,
+``[]``), então o código da interface que espera dicts segue funcionando.
+"""
+from __future__ import annotations
+
+import sys
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Iterator
+
+from app.utils.formatting import format_ordinal, parse_ordinal
+
+CAMPOS = ("id", "data", "tipo", "forma_pagamento", "valor", "fornecedor", "timestamp")
+
+
+class _Ausente:
+    """Marca um campo fixo que não existe no registro de origem."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<ausente>"
+
+
+_AUSENTE: Any = _Ausente()
+
+
+class _Canonico:
+    """Marca ``data``/``valor`` guardados só na forma compacta (ordinal, centavos)."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<canônico>"
+
+
+_CANONICO: Any = _Canonico()
+
+
+def _centavos(valor: Any) -> int:
+    try:
+        return int(round(float(valor or 0) * 100))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _internar(valor: Any) -> Any:
+    return sys.intern(valor) if type(valor) is str else valor
+
+
+class Despesa(MutableMapping):
+    """Lançamento com armazenamento compacto e interface de dicionário.
+
+    ``data_ord`` (ordinal do dia, ou None) e ``centavos`` permitem filtrar e
+    ordenar sem reinterpretar texto. O valor original de ``data``/``valor`` só
+    é guardado quando não tem a forma canônica, para que ``to_dict`` devolva
+    exatamente o que foi lido.
+    """
+
+    __slots__ = (
+        "id",
+        "data_ord",
+        "centavos",
+        "tipo",
+        "forma_pagamento",
+        "fornecedor",
+        "timestamp",
+        "_data_bruta",
+        "_valor_bruto",
+        "_extra",
+    )
+
+    def __init__(self, registro: Mapping[str, Any] | None = None, **campos: Any) -> None:
+        self.id = _AUSENTE
+        self.data_ord: int | None = None
+        self.centavos = 0
+        self.tipo = _AUSENTE
+        self.forma_pagamento = _AUSENTE
+        self.fornecedor = _AUSENTE
+        self.timestamp = _AUSENTE
+        self._data_bruta: Any = _AUSENTE
+        self._valor_bruto: Any = _AUSENTE
+        self._extra: dict[str, Any] | None = None
+        if registro is not None:
+            for chave, valor in registro.items():
+                self[chave] = valor
+        for chave, valor in campos.items():
+            self[chave] = valor
+
+    # ------------------------------------------------------------------ #
+    # Interface de dicionário
+    # ------------------------------------------------------------------ #
+    def __getitem__(self, chave: str) -> Any:
+        if chave == "data":
+            if self._data_bruta is _CANONICO:
+                return format_ordinal(self.data_ord)
+            valor = self._data_bruta
+        elif chave == "valor":
+            if self._valor_bruto is _CANONICO:
+                return self.centavos / 100
+            valor = self._valor_bruto
+        elif chave in ("id", "tipo", "forma_pagamento", "fornecedor", "timestamp"):
+            valor = getattr(self, chave)
+        elif self._extra is not None and chave in self._extra:
+            return self._extra[chave]
+        else:
+            raise KeyError(chave)
+        if valor is _AUSENTE:
+            raise KeyError(chave)
+        return valor
+
+    def __setitem__(self, chave: str, valor: Any) -> None:
+        if chave == "data":
+            self.data_ord = parse_ordinal(valor)
+            canonico = self.data_ord is not None and valor == format_ordinal(self.data_ord)
+            self._data_bruta = _CANONICO if canonico else valor
+        elif chave == "valor":
+            self.centavos = _centavos(valor)
+            canonico = type(valor) is float and valor == self.centavos / 100
+            self._valor_bruto = _CANONICO if canonico else valor
+        elif chave in ("tipo", "forma_pagamento", "fornecedor"):
+            setattr(self, chave, _internar(valor))
+        elif chave in ("id", "timestamp"):
+            setattr(self, chave, valor)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[chave] = valor
+
+    def __delitem__(self, chave: str) -> None:
+        if chave not in self:
+            raise KeyError(chave)
+        if chave == "data":
+            self.data_ord = None
+            self._data_bruta = _AUSENTE
+        elif chave == "valor":
+            self.centavos = 0
+            self._valor_bruto = _AUSENTE
+        elif chave in CAMPOS:
+            setattr(self, chave, _AUSENTE)
+        else:
+            del self._extra[chave]
+
+    def __iter__(self) -> Iterator[str]:
+        for chave in CAMPOS:
+            if chave in self:
+                yield chave
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, chave: object) -> bool:
+        if chave == "data":
+            return self._data_bruta is not _AUSENTE
+        if chave == "valor":
+            return self._valor_bruto is not _AUSENTE
+        if chave in ("id", "tipo", "forma_pagamento", "fornecedor", "timestamp"):
+            return getattr(self, chave) is not _AUSENTE
+        return self._extra is not None and chave in self._extra
+
+    def get(self, chave: str, padrao: Any = None) -> Any:
+        try:
+            return self[chave]
+        except KeyError:
+            return padrao
+
+    def __repr__(self) -> str:
+        return f"Despesa({self.to_dict()!r})"
+
+    # ------------------------------------------------------------------ #
+    # Conversões
+    # ------------------------------------------------------------------ #
+    def to_dict(self) -> dict[str, Any]:
+        """Dicionário simples (serializável em JSON) com os mesmos campos."""
+        return {chave: self[chave] for chave in self}
+
+    def copy(self) -> "Despesa":
+        return Despesa(self)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # O marcador de campo ausente não sobrevive ao pickle; recria pelo dict
+        return Despesa, (self.to_dict(),)
+
+    @property
+    def valor(self) -> float:
+        return self.centavos / 100
+
+
+def as_despesa(registro: Mapping[str, Any]) -> Despesa:
+    """Converte um registro em ``Despesa`` (sem copiar se já for uma)."""
+    return registro if isinstance(registro, Despesa) else Despesa(registro)
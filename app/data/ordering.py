@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Ordem cronológica mantida incrementalmente para uma lista de lançamentos.
+
+As chaves ``(ordinal da data, timestamp, -posição)`` ficam num array ordenado;
+inclusões, edições e exclusões localizam o ponto por ``bisect`` em vez de
+reordenar a lista inteira. Lista de gestão, relatório detalhado e PDF leem a
+mesma ordem. Para um subconjunto pequeno de posições (filtro seletivo), ordenar
+só as selecionadas pela chave sai mais barato que percorrer a ordem inteira.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Any, Iterable, Mapping, Sequence
+
+from app.data.query import record_ordinal
+
+# Acima desta fração de selecionadas, percorrer a ordem inteira sai mais barato
+_FRACAO_SELETIVA = 0.1
+
+_Chave = tuple[int, str, int]
+
+
+def _chave(registro: Mapping[str, Any], posicao: int) -> _Chave:
+    # -posicao: em empates, a ordem decrescente mantém a posição original crescente
+    return (record_ordinal(registro) or 0, str(registro.get("timestamp") or ""), -posicao)
+
+
+class SortedOrder:
+    """Posições de uma lista ordenadas por data e horário de registro."""
+
+    def __init__(self) -> None:
+        self._chaves: list[_Chave] = []
+        self._por_posicao: list[_Chave | None] = []
+
+    @classmethod
+    def from_records(cls, registros: Iterable[Mapping[str, Any]]) -> "SortedOrder":
+        ordem = cls()
+        ordem._por_posicao = [_chave(registro, posicao) for posicao, registro in enumerate(registros)]
+        ordem._chaves = sorted(ordem._por_posicao)
+        return ordem
+
+    def __len__(self) -> int:
+        return len(self._chaves)
+
+    def append(self, registro: Mapping[str, Any]) -> None:
+        chave = _chave(registro, len(self._por_posicao))
+        self._por_posicao.append(chave)
+        insort(self._chaves, chave)
+
+    def update(self, posicao: int, registro: Mapping[str, Any]) -> None:
+        if not 0 <= posicao < len(self._por_posicao):
+            raise IndexError(posicao)
+        anterior = self._por_posicao[posicao]
+        if anterior is not None:
+            self._descartar(anterior)
+        chave = _chave(registro, posicao)
+        self._por_posicao[posicao] = chave
+        insort(self._chaves, chave)
+
+    def discard(self, posicao: int) -> None:
+        """Tira a posição da ordem, deixando-a vaga."""
+        if not 0 <= posicao < len(self._por_posicao):
+            raise IndexError(posicao)
+        chave = self._por_posicao[posicao]
+        if chave is not None:
+            self._descartar(chave)
+            self._por_posicao[posicao] = None
+
+    def _descartar(self, chave: _Chave) -> None:
+        indice = bisect_left(self._chaves, chave)
+        if indice < len(self._chaves) and self._chaves[indice] == chave:
+            del self._chaves[indice]
+
+    def positions(self, descending: bool = True) -> list[int]:
+        """Posições na ordem cronológica (mais recentes primeiro por padrão)."""
+        chaves = reversed(self._chaves) if descending else self._chaves
+        return [-chave[2] for chave in chaves]
+
+    def order(self, posicoes: Sequence[int], descending: bool = True) -> list[int]:
+        """As ``posicoes`` (todas ocupadas) na ordem cronológica."""
+        if len(posicoes) > len(self._chaves) * _FRACAO_SELETIVA:
+            selecionadas = set(posicoes)
+            return [posicao for posicao in self.positions(descending) if posicao in selecionadas]
+        return order_positions(self._por_posicao, posicoes, descending)
+
+    def keys(self, posicoes: Iterable[int]) -> dict[int, _Chave]:
+        """Cópia das chaves das ``posicoes``, para ``order_positions`` em outra thread."""
+        return {posicao: self._por_posicao[posicao] for posicao in posicoes}
+
+
+def order_positions(
+    chaves: Mapping[int, _Chave] | Sequence[_Chave | None],
+    posicoes: Iterable[int],
+    descending: bool = True,
+) -> list[int]:
+    """Ordena ``posicoes`` pelas ``chaves`` de ``SortedOrder.keys``; só lê os argumentos."""
+    return sorted(posicoes, key=chaves.__getitem__, reverse=descending)
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""Consultas sobre lançamentos: filtros, ordenação e totais.
+
+As mesmas regras valem para os dois backends: o SQLite traduz os filtros em SQL
+e o backend JSON usa as funções deste módulo diretamente sobre a lista em memória.
+"""
+from __future__ import annotations
+
+from datetime import date
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Callable, Iterable
+
+from app.data.models import Despesa
+from app.utils.formatting import parse_ordinal
+
+ORDER_FIELDS = ("data", "valor", "tipo", "fornecedor", "forma_pagamento", "timestamp")
+GROUP_FIELDS = ("mes", "tipo", "fornecedor", "forma_pagamento")
+
+
+def date_ordinal(valor: Any) -> int | None:
+    """Converte ``DD/MM/AAAA`` (ou ``AAAA-MM-DD``/date) no ordinal do dia."""
+    return parse_ordinal(valor)
+
+
+def month_key(ordinal: int | None) -> str | None:
+    """Chave ``AAAA-MM`` a partir do ordinal do dia."""
+    if ordinal is None:
+        return None
+    dia = date.fromordinal(ordinal)
+    return f"{dia.year:04d}-{dia.month:02d}"
+
+
+def to_cents(valor: Any) -> int:
+    try:
+        return int(round(float(valor or 0) * 100))
+    except (TypeError, ValueError):
+        return 0
+
+
+def record_ordinal(registro: Any) -> int | None:
+    """Ordinal da data do lançamento; ``Despesa`` já o traz pronto."""
+    if isinstance(registro, Despesa):
+        return registro.data_ord
+    return date_ordinal(registro.get("data"))
+
+
+def record_cents(registro: Any) -> int:
+    if isinstance(registro, Despesa):
+        return registro.centavos
+    return to_cents(registro.get("valor"))
+
+
+@lru_cache(maxsize=8192)
+def _chave_texto(texto: str) -> str:
+    return texto.strip().upper()
+
+
+def normalize_key(texto: Any) -> str:
+    """Normalização usada para categoria e fornecedor (strip + upper).
+
+    Categorias e fornecedores se repetem muito; textos já vistos vêm do cache.
+    """
+    if type(texto) is str:
+        return _chave_texto(texto)
+    return str(texto or "").strip().upper()
+
+
+def normalize_filters(filtros: dict[str, Any] | None) -> dict[str, Any]:
+    """Normaliza o dicionário de filtros aceito pelas consultas.
+
+    Chaves aceitas: ``data_inicio``/``data_fim`` (texto DD/MM/AAAA ou date),
+    ``tipo``, ``forma``, ``fornecedor`` e ``valor_min``/``valor_max`` (reais).
+    Valores vazios ou "Todos" são ignorados.
+    """
+    if not filtros:
+        return {}
+    normalizados: dict[str, Any] = {}
+    for chave in ("data_inicio", "data_fim"):
+        ordinal = date_ordinal(filtros.get(chave))
+        if ordinal is not None:
+            normalizados[chave] = ordinal
+    for chave in ("tipo", "fornecedor"):
+        valor = normalize_key(filtros.get(chave))
+        if valor and valor != "TODOS":
+            normalizados[chave] = valor
+    forma = str(filtros.get("forma") or "").strip()
+    if forma and forma != "Todos":
+        normalizados["forma"] = forma
+    for chave in ("valor_min", "valor_max"):
+        if filtros.get(chave) is not None:
+            normalizados[chave] = to_cents(filtros[chave])
+    return normalizados
+
+
+# Chaves de um lançamento já normalizadas, na ordem lida pelos filtros:
+# (ordinal ou None, tipo normalizado, forma de pagamento, fornecedor normalizado, centavos)
+RecordKeys = tuple[int | None, str, Any, str, int]
+
+# Extrai cada campo de ``RecordKeys`` diretamente de um registro
+_EXTRATORES: tuple[Callable[[Any], Any], ...] = (
+    record_ordinal,
+    lambda registro: normalize_key(registro.get("tipo")),
+    lambda registro: registro.get("forma_pagamento"),
+    lambda registro: normalize_key(registro.get("fornecedor")),
+    record_cents,
+)
+
+
+def record_keys(registro: Any) -> RecordKeys:
+    """Chaves normalizadas do lançamento, como ``compile_filter(..., keys=True)`` as lê."""
+    return tuple(extrator(registro) for extrator in _EXTRATORES)  # type: ignore[return-value]
+
+
+def compile_filter(filtros: dict[str, Any], *, keys: bool = False) -> Callable[[Any], bool]:
+    """Predicado sobre registros para filtros já normalizados.
+
+    Os valores dos filtros são resolvidos uma vez e só entram as checagens dos
+    campos presentes, então cada registro paga apenas o que o filtro pede. Com
+    ``keys=True`` o predicado recebe as chaves de ``record_keys`` (normalizadas
+    uma vez, como no índice) em vez do registro.
+    """
+    campo: Callable[[int], Callable[[Any], Any]] = itemgetter if keys else _EXTRATORES.__getitem__
+    checagens: list[Callable[[Any], bool]] = []
+    if "data_inicio" in filtros or "data_fim" in filtros:
+        inicio = filtros.get("data_inicio", 0)
+        fim = filtros.get("data_fim", date.max.toordinal())
+        ordinal_de = campo(0)
+
+        def por_data(registro: Any) -> bool:
+            ordinal = ordinal_de(registro)
+            return ordinal is not None and inicio <= ordinal <= fim
+
+        checagens.append(por_data)
+    for chave, posicao in (("tipo", 1), ("forma", 2), ("fornecedor", 3)):
+        if chave in filtros:
+            checagens.append(_igual(campo(posicao), filtros[chave]))
+    if "valor_min" in filtros or "valor_max" in filtros:
+        minimo = filtros.get("valor_min")
+        maximo = filtros.get("valor_max")
+        centavos_de = campo(4)
+
+        def por_valor(registro: Any) -> bool:
+            centavos = centavos_de(registro)
+            return (minimo is None or centavos >= minimo) and (maximo is None or centavos <= maximo)
+
+        checagens.append(por_valor)
+    if not checagens:
+        return lambda _registro: True
+    if len(checagens) == 1:
+        return checagens[0]
+    return lambda registro: all(checagem(registro) for checagem in checagens)
+
+
+def _igual(extrator: Callable[[Any], Any], esperado: Any) -> Callable[[Any], bool]:
+    return lambda registro: extrator(registro) == esperado
+
+
+def sort_key(order_by: str):
+    """Função de chave para ``sorted`` equivalente ao ORDER BY do SQLite."""
+    if order_by == "data":
+        return lambda reg: (record_ordinal(reg) or 0, str(reg.get("timestamp") or ""))
+    if order_by == "valor":
+        return record_cents
+    if order_by in ("tipo", "fornecedor"):
+        return lambda reg: normalize_key(reg.get(order_by))
+    return lambda reg: str(reg.get(order_by) or "")
+
+
+def group_key(registro: dict[str, Any], group_by: str | None) -> str | None:
+    if group_by is None:
+        return None
+    if group_by == "mes":
+        return month_key(record_ordinal(registro))
+    if group_by in ("tipo", "fornecedor"):
+        return normalize_key(registro.get(group_by)) or None
+    return str(registro.get(group_by) or "") or None
+
+
+def query_records(
+    registros: Iterable[dict[str, Any]],
+    filters: dict[str, Any] | None = None,
+    *,
+    order_by: str = "data",
+    descending: bool = True,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[dict[str, Any]]:
+    """Implementação em Python de ``store.query_records`` (backend JSON)."""
+    if order_by not in ORDER_FIELDS:
+        raise ValueError(f"Campo de ordenação inválido: {order_by}")
+    predicado = compile_filter(normalize_filters(filters))
+    selecionados = [reg for reg in registros if predicado(reg)]
+    selecionados.sort(key=sort_key(order_by), reverse=descending)
+    fim = None if limit is None else offset + limit
+    return selecionados[offset:fim]
+
+
+def aggregate_records(
+    registros: Iterable[dict[str, Any]],
+    group_by: str | None = None,
+    filters: dict[str, Any] | None = None,
+) -> dict[str | None, tuple[float, int]]:
+    """Implementação em Python de ``store.aggregate`` (backend JSON)."""
+    if group_by is not None and group_by not in GROUP_FIELDS:
+        raise ValueError(f"Agrupamento inválido: {group_by}")
+    predicado = compile_filter(normalize_filters(filters))
+    somas: dict[str | None, list[int]] = {}
+    for reg in registros:
+        if not predicado(reg):
+            continue
+        chave = group_key(reg, group_by)
+        if group_by == "mes" and chave is None:
+            continue
+        acumulado = somas.setdefault(chave, [0, 0])
+        acumulado[0] += record_cents(reg)
+        acumulado[1] += 1
+    return {chave: (centavos / 100, quantidade) for chave, (centavos, quantidade) in somas.items()}
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Coleção de lançamentos endereçada por id.
+
+Cada lançamento ocupa uma posição estável (nunca reaproveitada) e um mapa
+id -> posição dá acesso O(1) para editar e excluir. Excluir só deixa a posição
+vaga, então tabela colunar, índices e ordem cronológica alinhados às mesmas
+posições não precisam deslocar nada.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator, Mapping
+
+from app.data.models import Despesa, as_despesa
+from app.data.store import new_record_id
+
+
+class RecordSet:
+    """Lançamentos da empresa indexados por id, em posições estáveis."""
+
+    def __init__(self, registros: Iterable[Mapping[str, Any]] = ()) -> None:
+        self._posicoes: list[Despesa | None] = []
+        self._por_id: dict[str, int] = {}
+        for registro in registros:
+            self.add(registro)
+
+    def __len__(self) -> int:
+        return len(self._por_id)
+
+    def __iter__(self) -> Iterator[Despesa]:
+        """Lançamentos ativos na ordem de inclusão."""
+        return (registro for registro in self._posicoes if registro is not None)
+
+    def __contains__(self, record_id: object) -> bool:
+        return record_id in self._por_id
+
+    @property
+    def slots(self) -> list[Despesa | None]:
+        """Lista por posição (None nas vagas), à qual os índices se alinham."""
+        return self._posicoes
+
+    def get(self, record_id: str | None) -> Despesa | None:
+        posicao = self._por_id.get(record_id) if record_id else None
+        return None if posicao is None else self._posicoes[posicao]
+
+    def at(self, posicao: int) -> Despesa | None:
+        return self._posicoes[posicao]
+
+    def add(self, registro: Mapping[str, Any]) -> int:
+        """Inclui no fim (atribui id quando ausente ou repetido) e devolve a posição."""
+        despesa = as_despesa(registro)
+        record_id = despesa.get("id")
+        if not isinstance(record_id, str) or not record_id or record_id in self._por_id:
+            despesa["id"] = record_id = new_record_id()
+        posicao = len(self._posicoes)
+        self._posicoes.append(despesa)
+        self._por_id[record_id] = posicao
+        return posicao
+
+    def replace(self, registro: Mapping[str, Any]) -> int:
+        """Troca o lançamento de mesmo id e devolve a posição dele."""
+        posicao = self._por_id[registro["id"]]
+        self._posicoes[posicao] = as_despesa(registro)
+        return posicao
+
+    def discard(self, record_id: str) -> int:
+        """Exclui pelo id, deixando a posição vaga, e devolve a posição."""
+        posicao = self._por_id.pop(record_id)
+        self._posicoes[posicao] = None
+        return posicao
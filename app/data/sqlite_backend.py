@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""Backend SQLite para os lançamentos de uma empresa.
+
+Cada empresa (``app/data/<empresa_id>.json``) ganha um arquivo irmão
+``<empresa_id>.sqlite3`` com colunas indexadas para data, categoria, forma de
+pagamento e fornecedor, de modo que filtros, ordenação e totais rodem no SQL.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from app.data.query import (
+    GROUP_FIELDS,
+    ORDER_FIELDS,
+    date_ordinal,
+    month_key,
+    normalize_filters,
+    normalize_key,
+    to_cents,
+)
+
+DB_SUFFIX = ".sqlite3"
+
+# Versão do esquema gravada em ``PRAGMA user_version``; o script só roda quando difere
+_VERSAO_ESQUEMA = 1
+
+_CAMPOS_FIXOS = ("id", "data", "tipo", "forma_pagamento", "valor", "fornecedor", "timestamp")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS despesas (
+    id TEXT PRIMARY KEY,
+    data TEXT,
+    data_ord INTEGER,
+    mes TEXT,
+    tipo TEXT,
+    tipo_chave TEXT,
+    forma_pagamento TEXT,
+    fornecedor TEXT,
+    fornecedor_chave TEXT,
+    valor_centavos INTEGER NOT NULL DEFAULT 0,
+    timestamp TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_despesas_data ON despesas(data_ord, timestamp);
+CREATE INDEX IF NOT EXISTS idx_despesas_tipo ON despesas(tipo_chave, data_ord);
+CREATE INDEX IF NOT EXISTS idx_despesas_forma ON despesas(forma_pagamento, data_ord);
+CREATE INDEX IF NOT EXISTS idx_despesas_fornecedor ON despesas(fornecedor_chave, data_ord);
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+_COLUNAS_ORDEM = {
+    "data": ("data_ord", "timestamp"),
+    "valor": ("valor_centavos",),
+    "tipo": ("tipo_chave",),
+    "fornecedor": ("fornecedor_chave",),
+    "forma_pagamento": ("forma_pagamento",),
+    "timestamp": ("timestamp",),
+}
+
+_COLUNAS_GRUPO = {
+    "mes": "mes",
+    "tipo": "tipo_chave",
+    "fornecedor": "fornecedor_chave",
+    "forma_pagamento": "forma_pagamento",
+}
+
+_INSERT = """
+INSERT OR REPLACE INTO despesas (
+    id, data, data_ord, mes, tipo, tipo_chave, forma_pagamento,
+    fornecedor, fornecedor_chave, valor_centavos, timestamp, extra
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SELECT = "SELECT id, data, tipo, forma_pagamento, valor_centavos, fornecedor, timestamp, extra FROM despesas"
+
+
+def db_path_for(file_path: Path) -> Path:
+    """Arquivo SQLite correspondente ao JSON da empresa."""
+    return file_path.with_suffix(DB_SUFFIX)
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    if conn.execute("PRAGMA user_version").fetchone()[0] != _VERSAO_ESQUEMA:
+        conn.executescript(_SCHEMA + f"PRAGMA user_version = {_VERSAO_ESQUEMA};")
+    return conn
+
+
+def _linha(registro: dict[str, Any]) -> tuple[Any, ...]:
+    ordinal = date_ordinal(registro.get("data"))
+    fornecedor = registro.get("fornecedor") or None
+    extra = {k: v for k, v in registro.items() if k not in _CAMPOS_FIXOS}
+    return (
+        registro["id"],
+        registro.get("data"),
+        ordinal,
+        month_key(ordinal),
+        registro.get("tipo"),
+        normalize_key(registro.get("tipo")),
+        registro.get("forma_pagamento"),
+        fornecedor,
+        normalize_key(fornecedor),
+        to_cents(registro.get("valor")),
+        registro.get("timestamp"),
+        json.dumps(extra, ensure_ascii=False) if extra else None,
+    )
+
+
+def _registro(linha: tuple[Any, ...]) -> dict[str, Any]:
+    record_id, data, tipo, forma, centavos, fornecedor, timestamp, extra = linha
+    registro: dict[str, Any] = {
+        "data": data,
+        "tipo": tipo,
+        "forma_pagamento": forma,
+        "valor": centavos / 100,
+        "fornecedor": fornecedor,
+        "timestamp": timestamp,
+    }
+    if extra:
+        registro.update(json.loads(extra))
+    registro["id"] = record_id
+    return registro
+
+
+def _where(filtros: dict[str, Any] | None) -> tuple[str, list[Any]]:
+    normalizados = normalize_filters(filtros)
+    clausulas: list[str] = []
+    params: list[Any] = []
+    if "data_inicio" in normalizados:
+        clausulas.append("data_ord >= ?")
+        params.append(normalizados["data_inicio"])
+    if "data_fim" in normalizados:
+        clausulas.append("data_ord <= ?")
+        params.append(normalizados["data_fim"])
+    if "tipo" in normalizados:
+        clausulas.append("tipo_chave = ?")
+        params.append(normalizados["tipo"])
+    if "forma" in normalizados:
+        clausulas.append("forma_pagamento = ?")
+        params.append(normalizados["forma"])
+    if "fornecedor" in normalizados:
+        clausulas.append("fornecedor_chave = ?")
+        params.append(normalizados["fornecedor"])
+    if "valor_min" in normalizados:
+        clausulas.append("valor_centavos >= ?")
+        params.append(normalizados["valor_min"])
+    if "valor_max" in normalizados:
+        clausulas.append("valor_centavos <= ?")
+        params.append(normalizados["valor_max"])
+    if not clausulas:
+        return "", params
+    return " WHERE " + " AND ".join(clausulas), params
+
+
+def iter_records(db_path: Path) -> Iterator[dict[str, Any]]:
+    """Percorre os lançamentos na ordem de inclusão sem materializar a tabela."""
+    with closing(connect(db_path)) as conn:
+        for linha in conn.execute(_SELECT + " ORDER BY rowid"):
+            yield _registro(linha)
+
+
+def replace_all(
+    db_path: Path,
+    registros: Iterable[dict[str, Any]],
+    meta: dict[str, str] | None = None,
+) -> None:
+    """Troca todos os lançamentos (e grava ``meta``) numa única transação."""
+    with closing(connect(db_path)) as conn, conn:
+        conn.execute("DELETE FROM despesas")
+        conn.executemany(_INSERT, (_linha(reg) for reg in registros))
+        if meta:
+            conn.executemany("INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", meta.items())
+
+
+def upsert(db_path: Path, registro: dict[str, Any]) -> None:
+    with closing(connect(db_path)) as conn, conn:
+        conn.execute(_INSERT, _linha(registro))
+
+
+def update(db_path: Path, registro: dict[str, Any]) -> bool:
+    """Substitui um lançamento existente; False (sem efeito) quando o id não existe."""
+    with closing(connect(db_path)) as conn, conn:
+        if conn.execute("SELECT 1 FROM despesas WHERE id = ?", (registro["id"],)).fetchone() is None:
+            return False
+        conn.execute(_INSERT, _linha(registro))
+        return True
+
+
+def delete(db_path: Path, record_id: str) -> bool:
+    with closing(connect(db_path)) as conn, conn:
+        return conn.execute("DELETE FROM despesas WHERE id = ?", (record_id,)).rowcount > 0
+
+
+def get_meta(db_path: Path, chave: str) -> str | None:
+    with closing(connect(db_path)) as conn:
+        linha = conn.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+    return linha[0] if linha else None
+
+
+def cube_cells(db_path: Path) -> list[tuple[Any, ...]]:
+    """Somas por mês × categoria × fornecedor × forma (linhas do cubo de totais)."""
+    sql = (
+        "SELECT mes, COALESCE(tipo, ''), COALESCE(fornecedor_chave, ''), COALESCE(forma_pagamento, ''), "
+        "SUM(valor_centavos), COUNT(*) FROM despesas GROUP BY 1, 2, 3, 4"
+    )
+    with closing(connect(db_path)) as conn:
+        return conn.execute(sql).fetchall()
+
+
+def query_records(
+    db_path: Path,
+    filters: dict[str, Any] | None = None,
+    *,
+    order_by: str = "data",
+    descending: bool = True,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[dict[str, Any]]:
+    if order_by not in ORDER_FIELDS:
+        raise ValueError(f"Campo de ordenação inválido: {order_by}")
+    where, params = _where(filters)
+    direcao = "DESC" if descending else "ASC"
+    ordem = ", ".join(f"{coluna} {direcao}" for coluna in _COLUNAS_ORDEM[order_by])
+    sql = f"{_SELECT}{where} ORDER BY {ordem}"
+    if limit is not None or offset:
+        sql += " LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else int(limit), int(offset)]
+    with closing(connect(db_path)) as conn:
+        return [_registro(linha) for linha in conn.execute(sql, params)]
+
+
+def aggregate(
+    db_path: Path,
+    group_by: str | None = None,
+    filters: dict[str, Any] | None = None,
+) -> dict[str | None, tuple[float, int]]:
+    if group_by is not None and group_by not in GROUP_FIELDS:
+        raise ValueError(f"Agrupamento inválido: {group_by}")
+    where, params = _where(filters)
+    if group_by is None:
+        sql = f"SELECT NULL, SUM(valor_centavos), COUNT(*) FROM despesas{where}"
+    else:
+        coluna = _COLUNAS_GRUPO[group_by]
+        if group_by == "mes":
+            where = f"{where} AND mes IS NOT NULL" if where else " WHERE mes IS NOT NULL"
+        sql = f"SELECT NULLIF({coluna}, ''), SUM(valor_centavos), COUNT(*) FROM despesas{where} GROUP BY 1"
+    resultado: dict[str | None, tuple[float, int]] = {}
+    with closing(connect(db_path)) as conn:
+        for chave, centavos, quantidade in conn.execute(sql, params):
+            if quantidade:
+                resultado[chave] = ((centavos or 0) / 100, int(quantidade))
+    return resultado
@@ -3,15 +3,69 @@ from __future__ import annotations
 
 import json
 import os
+import re
+import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator, Mapping
 
-from app.utils.security import checksum_is_valid, persist_checksum
+from app.data import query, sqlite_backend
+from app.data.cube import AggregateCube, cube_path_for, load_cube
+from app.data.models import Despesa, as_despesa
+from app.data.suppliers import (
+    DEFAULT_THRESHOLD,
+    CanonicalSuppliers,
+    canonical_path_for,
+    load_canonical,
+    names_digest,
+)
+from app.utils.logger import get_logger
+from app.utils.security import (
+    atomic_write_json,
+    checksum_is_valid,
+    discard_checksum,
+    find_corrupted_blocks,
+    refresh_manifest,
+    sealed_size,
+)
 from app.utils.paths import workspace_path
 
-# Cache simples em memória para evitar reaberturas repetidas do JSON
-_DATA_CACHE: dict[Path, tuple[float, list[dict[str, Any]]]] = {}
+logger = get_logger("capt.store")
+
+# Diário (journal) de operações gravado ao lado do snapshot JSON
+_JOURNAL_SUFFIX = ".journal"
+# Quantidade de operações acumuladas no diário antes da compactação automática
+_COMPACT_THRESHOLD = 500
+# Tamanho dos blocos lidos pelo leitor incremental do snapshot
+_READ_CHUNK = 65536
+# Bloco do manifesto do diário: cada append re-hasheia só o último bloco
+_JOURNAL_BLOCK = 4096
+# Mesmos espaços que o ``json`` aceita entre os tokens
+_ESPACOS = re.compile(r"[ \t\n\r]*")
+
+
+@dataclass
+class _EstadoDados:
+    """Estado em memória de um arquivo: snapshot + diário já reaplicado."""
+
+    assinatura: tuple[int, int, int]
+    registros: dict[str, Despesa]
+    operacoes: int = 0
+    migrar: bool = False
+
+
+# Cache em memória para evitar reaberturas repetidas do JSON
+_DATA_CACHE: dict[Path, _EstadoDados] = {}
+# Cubos de totais já carregados (a assinatura fica no próprio cubo)
+_CUBOS: dict[Path, AggregateCube] = {}
+# Cubos em memória mais novos que o ``.cube.json`` (gravados na compactação)
+_CUBOS_PENDENTES: set[Path] = set()
+
+STORAGE_BACKENDS = ("json", "sqlite")
+_BACKEND = "json"
+# Bancos SQLite já migrados nesta execução
+_MIGRADOS: set[Path] = set()
 
 
 def _mock_gastos() -> list[dict[str, Any]]:
@@ -89,56 +143,753 @@ def _resolve_data_path(path: str | Path) -> Path:
     return target
 
 
-def load_data(path: str | Path) -> list[dict[str, Any]]:
-    """Carrega os dados do JSON; em ambiente de dev sempre usa mock.
+def _journal_path(file_path: Path) -> Path:
+    return file_path.with_suffix(file_path.suffix + _JOURNAL_SUFFIX)
+
+
+def _assinatura(file_path: Path) -> tuple[int, int, int]:
+    """Identifica a versão em disco do snapshot e do diário (mtime/tamanhos)."""
+    snapshot = file_path.stat()
+    try:
+        journal_size = _journal_path(file_path).stat().st_size
+    except FileNotFoundError:
+        journal_size = 0
+    return snapshot.st_mtime_ns, snapshot.st_size, journal_size
+
+
+def new_record_id() -> str:
+    """Gera um identificador estável para um lançamento."""
+    return uuid.uuid4().hex
+
+
+def _indexar_registros(data: Any) -> tuple[dict[str, Despesa], bool]:
+    """Indexa os registros por id, atribuindo ids aos lançamentos legados.
+
+    Retorna também se algum id foi criado agora (o snapshot precisa ser regravado
+    antes de o diário poder referenciá-lo).
+    """
+    registros: dict[str, Despesa] = {}
+    migrar = False
+    for registro in data if isinstance(data, list) else []:
+        if not isinstance(registro, (dict, Despesa)):
+            continue
+        record_id = registro.get("id")
+        if not isinstance(record_id, str) or not record_id or record_id in registros:
+            record_id = new_record_id()
+            registro["id"] = record_id
+            migrar = True
+        registros[record_id] = as_despesa(registro)
+    return registros, migrar
+
+
+def _aplicar_operacao(registros: dict[str, Despesa], operacao: dict[str, Any]) -> bool:
+    """Aplica a operação; edição ou exclusão de id inexistente falha sem efeito."""
+    op = operacao.get("op")
+    record_id = operacao.get("id")
+    if not isinstance(record_id, str):
+        return False
+    if op in ("insert", "update"):
+        registro = operacao.get("registro")
+        if not isinstance(registro, dict) or (op == "update" and record_id not in registros):
+            return False
+        registros[record_id] = Despesa(registro, id=record_id)
+        return True
+    if op == "delete":
+        return registros.pop(record_id, None) is not None
+    return False
+
+
+def _limite_confiavel(journal: Path) -> int | None:
+    """Quantos bytes do diário são confiáveis; None quando todos são.
+
+    Só o que o manifesto sela é confiável. A única exceção é uma linha completa
+    anexada depois do último selo, que é o que ``_registrar_operacao`` deixa
+    ao cair entre o append e a atualização do manifesto: ela é aceita e selada
+    de novo. Diário sem manifesto, mais de uma linha fora do selo ou um bloco
+    divergente limitam a reaplicação ao trecho selado íntegro.
+    """
+    if checksum_is_valid(journal):
+        return None
+    selado = sealed_size(journal)
+    faixas = find_corrupted_blocks(journal) if selado is not None else None
+    if faixas:
+        inicio = faixas[0][0]
+        logger.warning(
+            "Diário %s corrompido a partir do byte %s (%s bloco(s) divergente(s)). "
+            "Reaplicando apenas as operações anteriores.",
+            journal,
+            inicio,
+            len(faixas),
+        )
+        return inicio
+    selado = selado or 0
+    with open(journal, "rb") as handler:
+        handler.seek(selado)
+        cauda = handler.read()
+    if cauda.endswith(b"\n") and cauda.count(b"\n") == 1:
+        refresh_manifest(journal, changed_from=selado, block_size=_JOURNAL_BLOCK)
+        return None
+    logger.warning(
+        "Diário %s tem %s byte(s) fora do manifesto. Reaplicando apenas as operações seladas.",
+        journal,
+        len(cauda),
+    )
+    return selado
+
+
+def _ler_journal(file_path: Path) -> tuple[list[dict[str, Any]], bool]:
+    """Operações válidas do diário (apenas o trecho íntegro) e se ele estava íntegro."""
+    journal = _journal_path(file_path)
+    if not journal.exists():
+        return [], True
+    limite = _limite_confiavel(journal)
+    operacoes: list[dict[str, Any]] = []
+    lidos = 0
+    with open(journal, "rb") as handler:
+        for numero, bruta in enumerate(handler, start=1):
+            lidos += len(bruta)
+            if limite is not None and lidos > limite:
+                break
+            if not bruta.strip():
+                continue
+            try:
+                operacao = json.loads(bruta)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                logger.warning("Linha %s inválida no diário %s. Ignorando.", numero, journal)
+                continue
+            if isinstance(operacao, dict):
+                operacoes.append(operacao)
+    return operacoes, limite is None
+
+
+def _reaplicar_journal(file_path: Path, registros: dict[str, Despesa]) -> tuple[int, bool]:
+    """Reaplica o diário sobre o snapshot; linhas truncadas/corrompidas são ignoradas.
+
+    Retorna a quantidade de operações aplicadas e se o diário estava íntegro.
+    """
+    operacoes, integro = _ler_journal(file_path)
+    aplicadas = sum(1 for operacao in operacoes if _aplicar_operacao(registros, operacao))
+    return aplicadas, integro
+
+
+def _iter_json_array(file_path: Path) -> Iterator[Any]:
+    """Percorre os itens do array JSON de topo lendo o arquivo em blocos.
+
+    Apenas o item corrente e o bloco lido ficam em memória; ``raw_decode`` é
+    retomado com mais texto quando um item atravessa o fim do bloco. A sintaxe
+    entre os itens segue a do ``json.load``: exatamente uma vírgula entre dois
+    itens, nenhuma antes do primeiro ou depois do último e nada após o ``]``.
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, "r", encoding="utf-8-sig") as handler:
+        buffer = ""
+        pos = 0
+        fim_arquivo = False
+        # abertura -> primeiro (item ou "]") -> separador ("," ou "]") -> item -> ... -> fim
+        esperado = "abertura"
+        while True:
+            pos = _ESPACOS.match(buffer, pos).end()
+            if pos < len(buffer):
+                caractere = buffer[pos]
+                if esperado == "abertura":
+                    if caractere != "[":
+                        raise ValueError(f"{file_path} não contém um array JSON")
+                    esperado = "primeiro"
+                    pos += 1
+                    continue
+                if esperado == "fim":
+                    raise ValueError(f"Conteúdo após o fim do array JSON em {file_path}")
+                if esperado == "separador":
+                    if caractere not in ",]":
+                        raise ValueError(f"Esperado ',' ou ']' entre os itens de {file_path}")
+                    esperado = "item" if caractere == "," else "fim"
+                    pos += 1
+                    continue
+                if caractere == "]" and esperado == "primeiro":
+                    esperado = "fim"
+                    pos += 1
+                    continue
+                if caractere in ",]":
+                    raise ValueError(f"Item ausente no array JSON de {file_path}")
+                try:
+                    item, fim_item = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if fim_arquivo:
+                        raise
+                else:
+                    # Um item que termina exatamente no fim do bloco pode estar truncado
+                    if fim_item < len(buffer) or fim_arquivo:
+                        yield item
+                        pos = fim_item
+                        esperado = "separador"
+                        continue
+            elif fim_arquivo:
+                if esperado == "fim":
+                    return
+                raise ValueError(f"Array JSON incompleto em {file_path}")
+            bloco = handler.read(_READ_CHUNK)
+            fim_arquivo = not bloco
+            buffer = buffer[pos:] + bloco
+            pos = 0
+
+
+def _iter_json(file_path: Path) -> Iterator[Mapping[str, Any]]:
+    """Lançamentos do snapshot com o diário sobreposto, sem materializar a lista."""
+    if not file_path.exists():
+        return
+    estado = _DATA_CACHE.get(file_path)
+    if estado and estado.assinatura == _assinatura(file_path):
+        # Já está em memória: nada a ler do disco
+        yield from tuple(estado.registros.values())
+        return
+    if not checksum_is_valid(file_path):
+        return
+    operacoes, _ = _ler_journal(file_path)
+    # id -> versão final segundo o diário (None = excluído)
+    sobrepostos: dict[str, dict[str, Any] | None] = {}
+    # Ids que nascem no diário; edições de ids ausentes do snapshot e do diário
+    # não viram lançamentos (como em ``_aplicar_operacao``)
+    inseridos: set[str] = set()
+    for operacao in operacoes:
+        record_id = operacao.get("id")
+        if not isinstance(record_id, str):
+            continue
+        if operacao.get("op") == "delete":
+            sobrepostos[record_id] = None
+            inseridos.discard(record_id)
+        elif operacao.get("op") in ("insert", "update") and isinstance(operacao.get("registro"), dict):
+            sobrepostos[record_id] = dict(operacao["registro"], id=record_id)
+            if operacao["op"] == "insert":
+                inseridos.add(record_id)
+    for registro in _iter_json_array(file_path):
+        if not isinstance(registro, dict):
+            continue
+        record_id = registro.get("id")
+        if isinstance(record_id, str) and record_id in sobrepostos:
+            registro = sobrepostos.pop(record_id)
+            if registro is None:
+                continue
+        yield registro
+    for record_id, registro in sobrepostos.items():
+        if registro is not None and record_id in inseridos:
+            yield registro
+
+
+def _carregar_estado(file_path: Path) -> _EstadoDados:
+    assinatura = _assinatura(file_path)
+    cached = _DATA_CACHE.get(file_path)
+    if cached and cached.assinatura == assinatura:
+        return cached
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    registros, migrar = _indexar_registros(data)
+    operacoes, integro = _reaplicar_journal(file_path, registros)
+    estado = _EstadoDados(assinatura, registros, operacoes, migrar or not integro)
+    _DATA_CACHE[file_path] = estado
+    return estado
+
+
+def _estado_para_escrita(file_path: Path) -> _EstadoDados:
+    """Estado atual para receber uma mutação; arquivo ausente/inválido começa vazio."""
+    cached = _DATA_CACHE.get(file_path)
+    if cached and file_path.exists() and cached.assinatura == _assinatura(file_path):
+        return cached
+    if file_path.exists() and checksum_is_valid(file_path):
+        return _carregar_estado(file_path)
+    return _EstadoDados((0, 0, 0), {}, 0, migrar=True)
 
-    Com cache em memória: se o arquivo não mudou (mtime idêntico), reutiliza
-    a leitura anterior para evitar I/O custoso em arquivos grandes.
+
+def _gravar_snapshot(file_path: Path, estado: _EstadoDados) -> None:
+    """Regrava o snapshot completo e descarta o diário já incorporado."""
+    atomic_write_json(file_path, [registro.to_dict() for registro in estado.registros.values()])
+    journal = _journal_path(file_path)
+    journal.unlink(missing_ok=True)
+    discard_checksum(journal)
+    estado.operacoes = 0
+    estado.migrar = False
+    estado.assinatura = _assinatura(file_path)
+    _DATA_CACHE[file_path] = estado
+
+
+def _registrar_operacao(path: str | Path, operacao: dict[str, Any]) -> bool:
+    """Aplica a operação em memória e a anexa ao diário.
+
+    Em disco, grava a linha e re-hasheia o último bloco do manifesto do
+    diário (``_JOURNAL_BLOCK``); o diário é limitado por ``_COMPACT_THRESHOLD``.
     """
-    if os.getenv("APP_ENV", "").lower() == "dev":
-        return _mock_gastos()
+    file_path = _resolve_data_path(path)
+    try:
+        estado = _estado_para_escrita(file_path)
+        assinatura_antes = estado.assinatura
+        anterior = estado.registros.get(operacao.get("id"))
+        if not _aplicar_operacao(estado.registros, operacao):
+            logger.warning("Operação %s recusada em %s: lançamento %s inexistente", operacao.get("op"), file_path, operacao.get("id"))
+            return False
+        if estado.migrar or estado.operacoes + 1 >= _COMPACT_THRESHOLD:
+            _gravar_snapshot(file_path, estado)
+            _atualizar_cubo(file_path, assinatura_antes, estado, anterior, operacao, persistir=True)
+            return True
+        linha = json.dumps(operacao, ensure_ascii=False)
+        journal = _journal_path(file_path)
+        with open(journal, "a", encoding="utf-8") as handler:
+            inicio = handler.tell()
+            handler.write(linha + "\n")
+            handler.flush()
+            os.fsync(handler.fileno())
+        # Re-hasheia só o último bloco (até _JOURNAL_BLOCK bytes) do manifesto
+        refresh_manifest(journal, changed_from=inicio, block_size=_JOURNAL_BLOCK)
+        estado.operacoes += 1
+        estado.assinatura = _assinatura(file_path)
+        _atualizar_cubo(file_path, assinatura_antes, estado, anterior, operacao)
+        return True
+    except Exception:
+        logger.exception("Falha ao registrar operação no diário de %s", file_path)
+        _DATA_CACHE.pop(file_path, None)
+        return False
+
+
+def _cubo_na_assinatura(file_path: Path, assinatura: tuple[int, int, int]) -> AggregateCube | None:
+    cubo = _CUBOS.get(file_path)
+    if cubo is not None and cubo.assinatura == assinatura:
+        return cubo
+    cubo = load_cube(cube_path_for(file_path), assinatura)
+    if cubo is not None:
+        _CUBOS[file_path] = cubo
+        _CUBOS_PENDENTES.discard(file_path)
+    return cubo
 
+
+def _persistir_cubo(file_path: Path, cubo: AggregateCube) -> None:
+    try:
+        cubo.save(cube_path_for(file_path))
+        _CUBOS_PENDENTES.discard(file_path)
+    except Exception:
+        # O cubo em memória continua válido; o arquivo antigo não bate com a assinatura
+        logger.exception("Falha ao salvar o cubo de totais de %s", file_path)
+
+
+def _descartar_cubo(file_path: Path) -> None:
+    _CUBOS.pop(file_path, None)
+    _CUBOS_PENDENTES.discard(file_path)
+    cube_path_for(file_path).unlink(missing_ok=True)
+
+
+def _atualizar_cubo(
+    file_path: Path,
+    assinatura_antes: tuple[int, int, int],
+    estado: _EstadoDados,
+    anterior: Despesa | None,
+    operacao: dict[str, Any] | None,
+    persistir: bool = False,
+) -> None:
+    """Aplica ao cubo em memória o delta da operação e a nova assinatura.
+
+    O ``.cube.json`` só é regravado com ``persistir`` (na compactação) ou
+    quando ``peek_cube`` confere a assinatura; entre uma coisa e outra cada
+    operação custa O(1). Sem cubo válido para o estado anterior nada é feito:
+    ele será reconstruído na próxima consulta. Uma edição que chega idêntica
+    ao registro em cache indica que o objeto foi alterado no lugar (valores
+    antigos perdidos); nesse caso o cubo é descartado.
+    """
+    try:
+        cubo = _cubo_na_assinatura(file_path, assinatura_antes)
+        if cubo is None:
+            return
+        if operacao is not None:
+            novo = estado.registros.get(operacao.get("id"))
+            if operacao.get("op") == "update" and anterior is not None and anterior == novo:
+                _descartar_cubo(file_path)
+                return
+            if anterior is not None:
+                cubo.remove(anterior)
+            if novo is not None:
+                cubo.add(novo)
+        cubo.assinatura = estado.assinatura
+        _CUBOS_PENDENTES.add(file_path)
+        if persistir:
+            _persistir_cubo(file_path, cubo)
+    except Exception:
+        logger.exception("Falha ao atualizar o cubo de totais de %s", file_path)
+        _descartar_cubo(file_path)
+
+
+def get_cube(path: str | Path) -> AggregateCube:
+    """Cubo de totais (mês × categoria × fornecedor × forma) da empresa.
+
+    No backend JSON vem do arquivo ``<arquivo>.cube.json`` quando a assinatura
+    bate com o snapshot/diário atuais; caso contrário é reconstruído em uma
+    passada e salvo. No SQLite é montado por um ``GROUP BY`` indexado.
+    """
+    if _is_dev():
+        return AggregateCube.from_records(load_data(path, typed=True))
+    file_path = _resolve_data_path(path)
+    if _usa_sqlite():
+        return AggregateCube.from_cells(sqlite_backend.cube_cells(_sqlite_db(file_path)))
+    if not file_path.exists():
+        return AggregateCube()
+    assinatura = _assinatura(file_path)
+    cubo = _cubo_na_assinatura(file_path, assinatura)
+    if cubo is not None:
+        return cubo
+    return _reconstruir_cubo(file_path, load_data(file_path, typed=True))
+
+
+def peek_cube(path: str | Path) -> AggregateCube | None:
+    """Cubo já calculado para a versão atual do arquivo (memória ou ``.cube.json``).
+
+    Nunca reconstrói: devolve None quando o arquivo mudou desde o último cubo
+    (ou no SQLite, em que o cubo sai de uma consulta e não fica salvo). Um
+    cubo em memória mais novo que o arquivo é gravado aqui, para que outros
+    processos (a consolidação) o encontrem.
+    """
+    if _is_dev() or _usa_sqlite():
+        return None
     file_path = _resolve_data_path(path)
+    if not file_path.exists():
+        return AggregateCube()
+    cubo = _cubo_na_assinatura(file_path, _assinatura(file_path))
+    if cubo is not None and file_path in _CUBOS_PENDENTES:
+        _persistir_cubo(file_path, cubo)
+    return cubo
+
+
+def _reconstruir_cubo(file_path: Path, registros: Iterable[Mapping[str, Any]]) -> AggregateCube:
+    # A leitura pode ter reselado o diário; vale a assinatura após a carga
+    cubo = AggregateCube.from_records(registros, _assinatura(file_path))
+    _CUBOS[file_path] = cubo
+    _CUBOS_PENDENTES.add(file_path)
+    _persistir_cubo(file_path, cubo)
+    return cubo
+
+
+def canonicalize_suppliers(path: str | Path, threshold: float = DEFAULT_THRESHOLD) -> CanonicalSuppliers:
+    """Job em lote: agrupa os fornecedores parecidos da empresa e grava a tabela canônica."""
+    tabela = CanonicalSuppliers.build(get_cube(path).supplier_counts(), threshold)
+    tabela.save(canonical_path_for(_resolve_data_path(path)))
+    return tabela
+
+
+def get_canonical_suppliers(path: str | Path) -> CanonicalSuppliers:
+    """Tabela canônica gravada pelo job; vazia (cada nome é o próprio id) se ele não rodou."""
+    return load_canonical(canonical_path_for(_resolve_data_path(path))) or CanonicalSuppliers()
+
+
+def refresh_canonical_suppliers(path: str | Path) -> CanonicalSuppliers:
+    """Tabela canônica em dia com os fornecedores atuais da empresa.
+
+    O job só roda de novo quando o conjunto de fornecedores mudou desde a
+    última tabela; novos lançamentos de fornecedores já conhecidos não o
+    disparam. Falhas ao gravar deixam a tabela só em memória.
+    """
+    # Lançamentos por fornecedor saem do cubo, sem percorrer os registros
+    contagens = get_cube(path).supplier_counts()
+    atual = get_canonical_suppliers(path)
+    if atual.origem == names_digest(contagens):
+        return atual
+    tabela = CanonicalSuppliers.build(contagens, atual.threshold)
+    try:
+        tabela.save(canonical_path_for(_resolve_data_path(path)))
+    except OSError:
+        logger.exception("Falha ao gravar a tabela de fornecedores de %s", path)
+    return tabela
+
+
+def configure_backend(nome: str | None) -> str:
+    """Seleciona o backend de armazenamento (``json`` ou ``sqlite``)."""
+    global _BACKEND
+    escolhido = (nome or "json").strip().lower()
+    if escolhido not in STORAGE_BACKENDS:
+        logger.warning("Backend de dados desconhecido '%s'. Usando JSON.", nome)
+        escolhido = "json"
+    _BACKEND = escolhido
+    return escolhido
+
+
+def get_backend() -> str:
+    return _BACKEND
+
+
+def _is_dev() -> bool:
+    return os.getenv("APP_ENV", "").lower() == "dev"
+
+
+def _usa_sqlite() -> bool:
+    return _BACKEND == "sqlite" and not _is_dev()
+
+
+def _como(registro: Mapping[str, Any], typed: bool) -> Any:
+    """Entrega o registro como ``Despesa`` (typed) ou como dict simples."""
+    if typed:
+        return as_despesa(registro)
+    return registro.to_dict() if isinstance(registro, Despesa) else registro
+
+
+def _entregar(registros: Iterable[Mapping[str, Any]], typed: bool) -> list[Any]:
+    return [_como(registro, typed) for registro in registros]
+
+
+def _load_json(file_path: Path) -> list[Despesa]:
     if file_path.exists():
         if not checksum_is_valid(file_path):
             _DATA_CACHE.pop(file_path, None)
             return []
         try:
-            mtime = file_path.stat().st_mtime
-            cached = _DATA_CACHE.get(file_path)
-            if cached and cached[0] == mtime:
-                return cached[1]
-
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            data = data if isinstance(data, list) else []
-            persist_checksum(file_path)
-            _DATA_CACHE[file_path] = (mtime, data)
-            return data
+            return list(_carregar_estado(file_path).registros.values())
         except Exception:
             _DATA_CACHE.pop(file_path, None)
             return []
     return []
 
 
+def migrate_to_sqlite(path: str | Path) -> int:
+    """Importa (uma única vez) o JSON da empresa para o arquivo SQLite irmão.
+
+    O JSON original é preservado como backup. Retorna a quantidade de registros
+    importados (0 quando a migração já havia sido feita). Um JSON que não passa
+    na verificação de integridade ou não pode ser lido levanta ``ValueError``
+    sem tocar no banco, para que a migração seja tentada de novo.
+    """
+    file_path = _resolve_data_path(path)
+    db_path = sqlite_backend.db_path_for(file_path)
+    if db_path.exists() and sqlite_backend.get_meta(db_path, "migrado_de"):
+        _MIGRADOS.add(db_path)
+        return 0
+    registros: list[Despesa] = []
+    if file_path.exists():
+        if not checksum_is_valid(file_path):
+            raise ValueError(f"{file_path} falhou na verificação de integridade; migração adiada")
+        try:
+            registros = list(_carregar_estado(file_path).registros.values())
+        except Exception as exc:
+            _DATA_CACHE.pop(file_path, None)
+            raise ValueError(f"Não foi possível ler {file_path} para a migração") from exc
+    # Lançamentos e marca de migração entram juntos: ou tudo, ou nada
+    sqlite_backend.replace_all(
+        db_path,
+        (registro.to_dict() for registro in registros),
+        meta={"migrado_de": f"{file_path.name} em {datetime.now().isoformat()}"},
+    )
+    _MIGRADOS.add(db_path)
+    logger.info("Migrados %s registros de %s para %s", len(registros), file_path, db_path)
+    return len(registros)
+
+
+def _sqlite_db(file_path: Path) -> Path:
+    db_path = sqlite_backend.db_path_for(file_path)
+    if db_path not in _MIGRADOS:
+        migrate_to_sqlite(file_path)
+    return db_path
+
+
+def load_data(path: str | Path, typed: bool = False) -> list[Any]:
+    """Carrega os dados da empresa; em ambiente de dev sempre usa mock.
+
+    No backend JSON o resultado é o snapshot com o diário de operações
+    reaplicado. Com cache em memória: se snapshot e diário não mudaram,
+    reutiliza a leitura anterior para evitar I/O custoso em arquivos grandes.
+
+    Com ``typed=True`` devolve objetos ``Despesa`` (compactos, com data em
+    ordinal e valor em centavos) em vez de dicts; no backend JSON são os
+    próprios objetos do cache, sem cópia.
+    """
+    if _is_dev():
+        registros, _ = _indexar_registros(_mock_gastos())
+        return _entregar(registros.values(), typed)
+
+    file_path = _resolve_data_path(path)
+    if _usa_sqlite():
+        try:
+            return _entregar(sqlite_backend.iter_records(_sqlite_db(file_path)), typed)
+        except Exception:
+            logger.exception("Falha ao ler %s", sqlite_backend.db_path_for(file_path))
+            return []
+    return _entregar(_load_json(file_path), typed)
+
+
+def iter_records(
+    path: str | Path,
+    predicate: Callable[[dict[str, Any]], bool] | None = None,
+    *,
+    limit: int | None = None,
+    offset: int = 0,
+    typed: bool = False,
+) -> Iterator[Any]:
+    """Gera os lançamentos um a um, em memória constante.
+
+    No backend JSON o snapshot é lido incrementalmente (sem ``json.load`` do
+    arquivo inteiro) com o diário sobreposto; lançamentos legados ainda sem id
+    são entregues como estão. ``predicate`` filtra os registros e ``offset``/
+    ``limit`` permitem buscar só "os N primeiros que atendem" para paginação,
+    interrompendo a leitura assim que a página está completa. ``typed`` tem o
+    mesmo significado que em ``load_data``.
+
+    Um snapshot truncado ou malformado levanta ``ValueError`` (e falhas de
+    leitura, ``OSError``) no ponto em que é encontrado, depois dos lançamentos
+    já entregues: quem consome decide se o resultado parcial serve.
+    """
+    if limit is not None and limit <= 0:
+        return
+    file_path = _resolve_data_path(path)
+    if _is_dev():
+        fonte: Iterator[Mapping[str, Any]] = iter(load_data(file_path, typed=True))
+    elif _usa_sqlite():
+        fonte = sqlite_backend.iter_records(_sqlite_db(file_path))
+    else:
+        fonte = _iter_json(file_path)
+    pulados = 0
+    entregues = 0
+    try:
+        for bruto in fonte:
+            registro = _como(bruto, typed)
+            if predicate is not None and not predicate(registro):
+                continue
+            if pulados < offset:
+                pulados += 1
+                continue
+            yield registro
+            entregues += 1
+            if limit is not None and entregues >= limit:
+                return
+    finally:
+        close = getattr(fonte, "close", None)
+        if close is not None:
+            close()
+
+
 def save_data(path: str | Path, data: list[dict[str, Any]]) -> bool:
+    """Grava a lista completa como novo snapshot (compatibilidade).
+
+    Prefira ``append_record``/``update_record``/``delete_record``, que anexam
+    apenas a operação ao diário em vez de reserializar a empresa inteira.
+    """
     try:
         file_path = _resolve_data_path(path)
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        persist_checksum(file_path)
-        try:
-            mtime = file_path.stat().st_mtime
-            _DATA_CACHE[file_path] = (mtime, data)
-        except Exception:
-            pass
+        registros, _ = _indexar_registros(data)
+        if _usa_sqlite():
+            sqlite_backend.replace_all(_sqlite_db(file_path), registros.values())
+            return True
+        _gravar_snapshot(file_path, _EstadoDados((0, 0, 0), registros))
+        _reconstruir_cubo(file_path, registros.values())
+        return True
+    except Exception:
+        _DATA_CACHE.pop(_resolve_data_path(path), None)
+        return False
+
+
+def _gravar_sqlite(path: str | Path, operacao: dict[str, Any]) -> bool:
+    file_path = _resolve_data_path(path)
+    try:
+        db_path = _sqlite_db(file_path)
+        if operacao["op"] == "delete":
+            return sqlite_backend.delete(db_path, operacao["id"])
+        if operacao["op"] == "update":
+            return sqlite_backend.update(db_path, operacao["registro"])
+        sqlite_backend.upsert(db_path, operacao["registro"])
+        return True
+    except Exception:
+        logger.exception("Falha ao gravar em %s", sqlite_backend.db_path_for(file_path))
+        return False
+
+
+def _registrar(path: str | Path, operacao: dict[str, Any]) -> bool:
+    if _usa_sqlite():
+        return _gravar_sqlite(path, operacao)
+    return _registrar_operacao(path, operacao)
+
+
+def append_record(path: str | Path, registro: dict[str, Any]) -> bool:
+    """Inclui um lançamento; atribui ``registro["id"]`` quando ausente."""
+    if not registro.get("id"):
+        registro["id"] = new_record_id()
+    return _registrar(path, {"op": "insert", "id": registro["id"], "registro": dict(registro)})
+
+
+def update_record(path: str | Path, registro: dict[str, Any]) -> bool:
+    """Substitui o lançamento de mesmo ``id`` pelo conteúdo informado.
+
+    Devolve False (sem gravar nada) quando o id não existe no arquivo.
+    """
+    record_id = registro.get("id")
+    if not record_id:
+        return False
+    return _registrar(path, {"op": "update", "id": record_id, "registro": dict(registro)})
+
+
+def delete_record(path: str | Path, record_id: str | None) -> bool:
+    """Remove o lançamento identificado por ``record_id``; False se ele não existe."""
+    if not record_id:
+        return False
+    return _registrar(path, {"op": "delete", "id": record_id})
+
+
+def compact(path: str | Path) -> bool:
+    """Incorpora o diário ao snapshot e o descarta (sem efeito no SQLite)."""
+    if _usa_sqlite():
+        return True
+    file_path = _resolve_data_path(path)
+    try:
+        if not file_path.exists() or not checksum_is_valid(file_path):
+            return False
+        estado = _carregar_estado(file_path)
+        if estado.operacoes or estado.migrar:
+            assinatura_antes = estado.assinatura
+            _gravar_snapshot(file_path, estado)
+            _atualizar_cubo(file_path, assinatura_antes, estado, None, None, persistir=True)
         return True
     except Exception:
+        logger.exception("Falha ao compactar %s", file_path)
+        _DATA_CACHE.pop(file_path, None)
         return False
 
 
+def query_records(
+    path: str | Path,
+    filters: dict[str, Any] | None = None,
+    *,
+    order_by: str = "data",
+    descending: bool = True,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[dict[str, Any]]:
+    """Lançamentos filtrados, ordenados e paginados.
+
+    Filtros aceitos: ``data_inicio``, ``data_fim``, ``tipo``, ``forma``,
+    ``fornecedor``, ``valor_min`` e ``valor_max`` (ver ``app.data.query``).
+    No SQLite a consulta usa os índices; no JSON roda sobre a lista em memória.
+    """
+    if _usa_sqlite():
+        return sqlite_backend.query_records(
+            _sqlite_db(_resolve_data_path(path)),
+            filters,
+            order_by=order_by,
+            descending=descending,
+            limit=limit,
+            offset=offset,
+        )
+    selecionados = query.query_records(
+        load_data(path, typed=True),
+        filters,
+        order_by=order_by,
+        descending=descending,
+        limit=limit,
+        offset=offset,
+    )
+    return _entregar(selecionados, typed=False)
+
+
+def aggregate(
+    path: str | Path,
+    group_by: str | None = None,
+    filters: dict[str, Any] | None = None,
+) -> dict[str | None, tuple[float, int]]:
+    """Soma e contagem (``SUM``/``COUNT``) agrupadas por ``mes``, ``tipo``,
+    ``fornecedor`` ou ``forma_pagamento``; ``None`` devolve apenas o total geral."""
+    if _usa_sqlite():
+        return sqlite_backend.aggregate(_sqlite_db(_resolve_data_path(path)), group_by, filters)
+    return query.aggregate_records(load_data(path, typed=True), group_by, filters)
+
+
 def get_default_data() -> list[dict[str, Any]]:
     """Expõe a base padrão para restauração automática do JSON."""
     return _mock_gastos()
-
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""Canonicalização de fornecedores digitados em texto livre.
+
+Os fornecedores só passam por ``strip().upper()``, então "ATACADAO S.A." e
+"ATACADAO SA" viram entradas distintas nas agregações. Aqui cada nome vira um
+conjunto de tokens com as mesmas regras de ``abreviar_fornecedor`` (sufixos
+societários fora, termos comuns abreviados), sem acentos e sem pontuação.
+Nomes com conjuntos parecidos (Jaccard ponderado por raridade do token) caem no
+mesmo grupo. O representante do grupo é a grafia mais usada e serve de id
+canônico.
+
+Para não comparar todos os pares, cada conjunto só é indexado pelo seu
+prefixo (tokens mais raros primeiro) que ainda pode atingir o limiar: dois
+nomes parecidos o bastante sempre dividem um token de prefixo, então só esses
+pares são verificados.
+
+A tabela (variante -> id canônico) é salva ao lado do arquivo da empresa em
+``<arquivo>.fornecedores.json`` com um resumo dos nomes de que saiu; o
+dashboard a refaz (``store.refresh_canonical_suppliers``) só quando surgem ou
+somem fornecedores. Uso em lote::
+
+    python -m app.data.suppliers gastos_empresa.json [--limiar 0.8]
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import re
+import unicodedata
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+from app.data.query import normalize_key
+from app.utils.formatting import SUPPLIER_ABBREVIATIONS, SUPPLIER_LEGAL_SUFFIXES
+from app.utils.security import atomic_write_json, checksum_is_valid
+
+CANONICAL_SUFFIX = ".fornecedores.json"
+DEFAULT_THRESHOLD = 0.8
+_VERSAO = 2
+
+_PONTUACAO = re.compile(r"[^\w\s]")
+_LIGACOES = frozenset({"DE", "DA", "DO", "DAS", "DOS", "E"})
+_SUFIXOS = SUPPLIER_LEGAL_SUFFIXES | {_PONTUACAO.sub("", sufixo) for sufixo in SUPPLIER_LEGAL_SUFFIXES}
+
+Tokens = tuple[str, ...]
+
+
+def canonical_path_for(file_path: Path) -> Path:
+    return file_path.with_suffix(file_path.suffix + CANONICAL_SUFFIX)
+
+
+def names_digest(nomes: Iterable[Any]) -> str:
+    """Resumo do conjunto de fornecedores (normalizados), para saber se a tabela envelheceu."""
+    chaves = sorted({normalize_key(nome) for nome in nomes} - {""})
+    return hashlib.sha1("\n".join(chaves).encode("utf-8")).hexdigest()
+
+
+def supplier_tokens(nome: Any) -> Tokens:
+    """Tokens comparáveis do nome: sem acento, pontuação, sufixo societário e ligações."""
+    decomposto = unicodedata.normalize("NFKD", normalize_key(nome))
+    texto = "".join(ch for ch in decomposto if not unicodedata.combining(ch))
+    tokens: set[str] = set()
+    for token in texto.split():
+        if token in _SUFIXOS:
+            continue
+        token = _PONTUACAO.sub("", SUPPLIER_ABBREVIATIONS.get(token, token))
+        if token and token not in _SUFIXOS and token not in _LIGACOES:
+            tokens.add(token)
+    return tuple(sorted(tokens))
+
+
+class _Grupos:
+    """Union-find sobre índices inteiros."""
+
+    def __init__(self, tamanho: int) -> None:
+        self._pai = list(range(tamanho))
+
+    def raiz(self, item: int) -> int:
+        while self._pai[item] != item:
+            self._pai[item] = self._pai[self._pai[item]]
+            item = self._pai[item]
+        return item
+
+    def unir(self, a: int, b: int) -> None:
+        ra, rb = self.raiz(a), self.raiz(b)
+        if ra != rb:
+            self._pai[max(ra, rb)] = min(ra, rb)
+
+
+def _agrupar_conjuntos(conjuntos: list[Tokens], limiar: float) -> _Grupos:
+    """Une conjuntos de tokens com Jaccard ponderado >= ``limiar`` (filtragem por prefixo)."""
+    frequencia: dict[str, int] = {}
+    for conjunto in conjuntos:
+        for token in conjunto:
+            frequencia[token] = frequencia.get(token, 0) + 1
+    total = len(conjuntos)
+    peso = {token: math.log(1 + total / vezes) for token, vezes in frequencia.items()}
+
+    grupos = _Grupos(total)
+    indice: dict[str, list[int]] = {}
+    pesos_conjunto: list[float] = []
+    for atual, conjunto in enumerate(conjuntos):
+        peso_total = sum(peso[token] for token in conjunto)
+        pesos_conjunto.append(peso_total)
+        # Ordem global: tokens raros primeiro; o prefixo vai até o restante não
+        # bastar para atingir o limiar sozinho
+        ordenados = sorted(conjunto, key=lambda token: (frequencia[token], token))
+        prefixo: list[str] = []
+        restante = peso_total
+        for token in ordenados:
+            if restante < limiar * peso_total:
+                break
+            prefixo.append(token)
+            restante -= peso[token]
+
+        candidatos: set[int] = set()
+        for token in prefixo:
+            candidatos.update(indice.get(token, ()))
+        for outro in candidatos:
+            peso_outro = pesos_conjunto[outro]
+            if min(peso_total, peso_outro) < limiar * max(peso_total, peso_outro):
+                continue
+            comuns = sum(peso[token] for token in conjunto if token in conjuntos[outro])
+            uniao = peso_total + peso_outro - comuns
+            if uniao and comuns / uniao >= limiar:
+                grupos.unir(atual, outro)
+        for token in prefixo:
+            indice.setdefault(token, []).append(atual)
+    return grupos
+
+
+class CanonicalSuppliers:
+    """Tabela variante normalizada -> id canônico (grafia representativa)."""
+
+    def __init__(
+        self,
+        ids: Mapping[str, str] | None = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        origem: str | None = None,
+    ) -> None:
+        # Só as variantes que diferem do próprio id; as demais são canônicas
+        self.ids: dict[str, str] = dict(ids or {})
+        self.threshold = threshold
+        # ``names_digest`` dos fornecedores de que a tabela saiu
+        self.origem = origem
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, contagens: Mapping[str, int], threshold: float = DEFAULT_THRESHOLD) -> "CanonicalSuppliers":
+        """Agrupa os fornecedores de ``contagens`` (nome -> nº de lançamentos)."""
+        por_nome: dict[str, int] = {}
+        for nome, quantidade in contagens.items():
+            chave = normalize_key(nome)
+            if chave:
+                por_nome[chave] = por_nome.get(chave, 0) + int(quantidade)
+
+        # Nomes com os mesmos tokens já são o mesmo fornecedor: compara-se só um conjunto de cada
+        nomes_por_conjunto: dict[Tokens, list[str]] = {}
+        for nome in por_nome:
+            nomes_por_conjunto.setdefault(supplier_tokens(nome) or (nome,), []).append(nome)
+        conjuntos = list(nomes_por_conjunto)
+        grupos = _agrupar_conjuntos(conjuntos, threshold)
+
+        membros: dict[int, list[str]] = {}
+        for posicao, conjunto in enumerate(conjuntos):
+            membros.setdefault(grupos.raiz(posicao), []).extend(nomes_por_conjunto[conjunto])
+
+        ids: dict[str, str] = {}
+        for nomes in membros.values():
+            if len(nomes) < 2:
+                continue
+            # Representante: grafia mais usada; empate fica com a mais curta
+            canonico = min(nomes, key=lambda nome: (-por_nome[nome], len(nome), nome))
+            for nome in nomes:
+                if nome != canonico:
+                    ids[nome] = canonico
+        return cls(ids, threshold, names_digest(por_nome))
+
+    # ------------------------------------------------------------------ #
+    # Persistência
+    # ------------------------------------------------------------------ #
+    def save(self, path: Path) -> None:
+        atomic_write_json(
+            path,
+            {"versao": _VERSAO, "limiar": self.threshold, "origem": self.origem, "fornecedores": self.ids},
+        )
+
+
+def load_canonical(path: Path) -> CanonicalSuppliers | None:
+    """Lê a tabela salva; None quando ausente, corrompida ou de outra versão."""
+    if not path.exists() or not checksum_is_valid(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as handler:
+            payload = json.load(handler)
+        if payload.get("versao") != _VERSAO:
+            return None
+        return CanonicalSuppliers(
+            payload.get("fornecedores") or {},
+            float(payload.get("limiar", DEFAULT_THRESHOLD)),
+            payload.get("origem"),
+        )
+    except (OSError, ValueError, TypeError, AttributeError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    from app.data.store import canonicalize_suppliers
+
+    parser = argparse.ArgumentParser(description="Agrupa fornecedores parecidos e grava a tabela canônica.")
+    parser.add_argument("arquivos", nargs="+", help="arquivos JSON das empresas")
+    parser.add_argument("--limiar", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+    for arquivo in args.arquivos:
+        tabela = canonicalize_suppliers(arquivo, args.limiar)
+        print(f"{arquivo}: {len(tabela)} variantes unificadas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""Tabela colunar de lançamentos para totais vetorizados (NumPy).
+
+Cada coluna é um array: data (ordinal do dia e mês), valor em centavos e
+categoria, fornecedor e forma de pagamento codificados por dicionário. Filtros
+viram máscaras booleanas e os agrupamentos usam ``bincount``, então KPIs e
+gráficos não percorrem os registros em Python.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+
+from app.data.query import normalize_filters, normalize_key, record_cents, record_ordinal
+
+# Ordinal de 01/01/1970, origem do datetime64 do NumPy
+_ORDINAL_EPOCH = date(1970, 1, 1).toordinal()
+_CAPACIDADE_MINIMA = 64
+
+
+class _Dicionario:
+    """Codificação valor <-> código inteiro de uma coluna de texto (0 = vazio)."""
+
+    def __init__(self) -> None:
+        self.valores: list[str] = [""]
+        self.codigos: dict[str, int] = {"": 0}
+
+    def codigo(self, valor: str) -> int:
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            codigo = len(self.valores)
+            self.codigos[valor] = codigo
+            self.valores.append(valor)
+        return codigo
+
+    def copy(self) -> "_Dicionario":
+        copia = _Dicionario()
+        copia.valores = list(self.valores)
+        copia.codigos = dict(self.codigos)
+        return copia
+
+    def codigos_normalizados(self, chave: str) -> np.ndarray:
+        """Códigos cujo valor, normalizado, é igual a ``chave``."""
+        return np.fromiter(
+            (codigo for codigo, valor in enumerate(self.valores) if normalize_key(valor) == chave),
+            dtype=np.int32,
+        )
+
+
+def month_label(mes: int) -> str:
+    """Chave ``AAAA-MM`` a partir do número de meses desde 1970-01."""
+    return f"{1970 + mes // 12:04d}-{mes % 12 + 1:02d}"
+
+
+def _mes_de(ordinal: int | None) -> int:
+    if not ordinal:
+        return -1
+    dia = date.fromordinal(ordinal)
+    return (dia.year - 1970) * 12 + dia.month - 1
+
+
+def _mes_para_indice(chave: str) -> int:
+    ano, mes = chave.split("-")
+    return (int(ano) - 1970) * 12 + int(mes) - 1
+
+
+class ExpenseTable:
+    """Lançamentos em colunas NumPy, alinhados às posições da lista de origem."""
+
+    def __init__(self, capacidade: int = 0) -> None:
+        capacidade = max(capacidade, _CAPACIDADE_MINIMA)
+        self._n = 0
+        self._ordinais = np.zeros(capacidade, dtype=np.int32)
+        self._meses = np.full(capacidade, -1, dtype=np.int32)
+        self._centavos = np.zeros(capacidade, dtype=np.int64)
+        self._categorias = np.zeros(capacidade, dtype=np.int32)
+        self._fornecedores = np.zeros(capacidade, dtype=np.int32)
+        self._formas = np.zeros(capacidade, dtype=np.int32)
+        # Posições vagas (lançamento excluído) ficam False e saem de todos os totais
+        self._vivos = np.zeros(capacidade, dtype=bool)
+        self.categorias = _Dicionario()
+        self.fornecedores = _Dicionario()
+        self.formas = _Dicionario()
+
+    # ------------------------------------------------------------------ #
+    # Construção e manutenção
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def from_records(cls, registros: Iterable[Mapping[str, Any]]) -> "ExpenseTable":
+        """Monta a tabela em uma passada sobre os registros (dicts ou ``Despesa``)."""
+        tabela = cls()
+        ordinais: list[int] = []
+        centavos: list[int] = []
+        categorias: list[int] = []
+        fornecedores: list[int] = []
+        formas: list[int] = []
+        for registro in registros:
+            ordinal, cents, categoria, fornecedor, forma = tabela._codificar(registro)
+            ordinais.append(ordinal)
+            centavos.append(cents)
+            categorias.append(categoria)
+            fornecedores.append(fornecedor)
+            formas.append(forma)
+        n = len(ordinais)
+        tabela._reservar(n)
+        tabela._ordinais[:n] = ordinais
+        tabela._centavos[:n] = centavos
+        tabela._categorias[:n] = categorias
+        tabela._fornecedores[:n] = fornecedores
+        tabela._formas[:n] = formas
+        tabela._meses[:n] = _meses_vetorizado(tabela._ordinais[:n])
+        tabela._vivos[:n] = True
+        tabela._n = n
+        return tabela
+
+    def snapshot(self) -> "ExpenseTable":
+        """Cópia independente (colunas e dicionários) para ler em outra thread.
+
+        ``append`` realoca as colunas e ``update`` as regrava no lugar; quem
+        lê fora da thread que altera a tabela deve receber uma cópia.
+        """
+        copia = ExpenseTable(self._n)
+        for nome in ("_ordinais", "_meses", "_centavos", "_categorias", "_fornecedores", "_formas", "_vivos"):
+            getattr(copia, nome)[: self._n] = getattr(self, nome)[: self._n]
+        copia._n = self._n
+        copia.categorias = self.categorias.copy()
+        copia.fornecedores = self.fornecedores.copy()
+        copia.formas = self.formas.copy()
+        return copia
+
+    def _codificar(self, registro: Mapping[str, Any]) -> tuple[int, int, int, int, int]:
+        categoria = registro.get("tipo") or registro.get("categoria") or ""
+        return (
+            record_ordinal(registro) or 0,
+            record_cents(registro),
+            self.categorias.codigo(str(categoria)),
+            self.fornecedores.codigo(normalize_key(registro.get("fornecedor"))),
+            self.formas.codigo(str(registro.get("forma_pagamento") or "")),
+        )
+
+    def _reservar(self, total: int) -> None:
+        capacidade = len(self._ordinais)
+        if total <= capacidade:
+            return
+        nova = max(total, capacidade * 2)
+        for nome in ("_ordinais", "_meses", "_centavos", "_categorias", "_fornecedores", "_formas", "_vivos"):
+            antigo = getattr(self, nome)
+            novo = np.full(nova, -1 if nome == "_meses" else 0, dtype=antigo.dtype)
+            novo[: self._n] = antigo[: self._n]
+            setattr(self, nome, novo)
+
+    def _gravar_linha(self, indice: int, registro: Mapping[str, Any]) -> None:
+        ordinal, cents, categoria, fornecedor, forma = self._codificar(registro)
+        self._ordinais[indice] = ordinal
+        self._meses[indice] = _mes_de(ordinal)
+        self._centavos[indice] = cents
+        self._categorias[indice] = categoria
+        self._fornecedores[indice] = fornecedor
+        self._formas[indice] = forma
+        self._vivos[indice] = True
+
+    def append(self, registro: Mapping[str, Any]) -> None:
+        """Acrescenta um lançamento ao fim (custo amortizado O(1))."""
+        self._reservar(self._n + 1)
+        self._gravar_linha(self._n, registro)
+        self._n += 1
+
+    def update(self, indice: int, registro: Mapping[str, Any]) -> None:
+        """Regrava a linha ``indice`` com o conteúdo atual do registro."""
+        if not 0 <= indice < self._n:
+            raise IndexError(indice)
+        self._gravar_linha(indice, registro)
+
+    def discard(self, indice: int) -> None:
+        """Marca a linha ``indice`` como vaga; as demais não mudam de posição."""
+        if not 0 <= indice < self._n:
+            raise IndexError(indice)
+        self._vivos[indice] = False
+
+    def __len__(self) -> int:
+        return self._n
+
+    # ------------------------------------------------------------------ #
+    # Colunas (somente as linhas ocupadas)
+    # ------------------------------------------------------------------ #
+    @property
+    def cents(self) -> np.ndarray:
+        return self._centavos[: self._n]
+
+    # ------------------------------------------------------------------ #
+    # Filtros e agregações
+    # ------------------------------------------------------------------ #
+    def mask(self, filters: dict[str, Any] | None = None) -> np.ndarray:
+        """Máscara booleana equivalente a ``query.compile_filter`` com os mesmos filtros."""
+        filtros = normalize_filters(filters)
+        n = self._n
+        mascara = self._vivos[:n].copy()
+        if "data_inicio" in filtros or "data_fim" in filtros:
+            ordinais = self._ordinais[:n]
+            mascara &= ordinais > 0
+            if "data_inicio" in filtros:
+                mascara &= ordinais >= filtros["data_inicio"]
+            if "data_fim" in filtros:
+                mascara &= ordinais <= filtros["data_fim"]
+        if "tipo" in filtros:
+            mascara &= np.isin(self._categorias[:n], self.categorias.codigos_normalizados(filtros["tipo"]))
+        if "forma" in filtros:
+            mascara &= self._formas[:n] == self.formas.codigos.get(filtros["forma"], -1)
+        if "fornecedor" in filtros:
+            mascara &= self._fornecedores[:n] == self.fornecedores.codigos.get(filtros["fornecedor"], -1)
+        if "valor_min" in filtros:
+            mascara &= self._centavos[:n] >= filtros["valor_min"]
+        if "valor_max" in filtros:
+            mascara &= self._centavos[:n] <= filtros["valor_max"]
+        return mascara
+
+    def _selecao(self, mask: np.ndarray | None) -> np.ndarray:
+        if mask is None:
+            return self._vivos[: self._n]
+        return mask
+
+    def total(self, mask: np.ndarray | None = None) -> tuple[int, int]:
+        """Soma em centavos e quantidade de linhas selecionadas."""
+        selecao = self._selecao(mask)
+        return int(self._centavos[: self._n][selecao].sum()), int(np.count_nonzero(selecao))
+
+    def _somar_por(self, codigos: np.ndarray, selecao: np.ndarray, tamanho: int) -> np.ndarray:
+        return np.bincount(
+            codigos[selecao],
+            weights=self._centavos[: self._n][selecao],
+            minlength=tamanho,
+        )
+
+    def months(self, mask: np.ndarray | None = None) -> list[str]:
+        """Meses (``AAAA-MM``) com lançamentos, em ordem cronológica."""
+        selecao = self._selecao(mask) & (self._meses[: self._n] >= 0)
+        return [month_label(int(mes)) for mes in np.unique(self._meses[: self._n][selecao])]
+
+    def by_month(self, mask: np.ndarray | None = None) -> OrderedDict[str, float]:
+        """Total (reais) por mês em ordem cronológica; datas inválidas ficam de fora."""
+        selecao = self._selecao(mask) & (self._meses[: self._n] >= 0)
+        meses, inverso = np.unique(self._meses[: self._n][selecao], return_inverse=True)
+        somas = np.bincount(inverso, weights=self._centavos[: self._n][selecao], minlength=len(meses))
+        return OrderedDict((month_label(int(mes)), float(soma) / 100) for mes, soma in zip(meses, somas))
+
+    def by_category(self, month: str | None = None, mask: np.ndarray | None = None) -> dict[str, float]:
+        """Total (reais) por categoria, opcionalmente só no mês ``AAAA-MM``."""
+        selecao = self._selecao(mask)
+        if month:
+            selecao = selecao & (self._meses[: self._n] == _mes_para_indice(month))
+        contagens = np.bincount(self._categorias[: self._n][selecao], minlength=len(self.categorias.valores))
+        somas = self._somar_por(self._categorias[: self._n], selecao, len(self.categorias.valores))
+        return {
+            self.categorias.valores[codigo]: float(somas[codigo]) / 100
+            for codigo in np.flatnonzero(contagens)
+        }
+
+    def top_suppliers(
+        self,
+        n: int | None = None,
+        month: str | None = None,
+        mask: np.ndarray | None = None,
+        canonical: Mapping[str, str] | None = None,
+    ) -> list[tuple[str, float]]:
+        """Fornecedores (normalizados) por valor decrescente; sem fornecedor fica de fora.
+
+        ``month`` restringe ao mês ``AAAA-MM``; ``canonical`` (variante -> id
+        canônico) soma as variantes sob o mesmo id.
+        """
+        selecao = self._selecao(mask)
+        if month:
+            selecao = selecao & (self._meses[: self._n] == _mes_para_indice(month))
+        tamanho = len(self.fornecedores.valores)
+        contagens = np.bincount(self._fornecedores[: self._n][selecao], minlength=tamanho)
+        somas = self._somar_por(self._fornecedores[: self._n], selecao, tamanho)
+        codigos = np.flatnonzero(contagens[1:]) + 1
+        if canonical:
+            por_id: dict[str, float] = {}
+            for codigo in codigos:
+                nome = self.fornecedores.valores[codigo]
+                nome = canonical.get(nome, nome)
+                por_id[nome] = por_id.get(nome, 0) + float(somas[codigo])
+            agrupados = sorted(por_id.items(), key=lambda item: item[1], reverse=True)
+            if n is not None:
+                agrupados = agrupados[:n]
+            return [(nome, soma / 100) for nome, soma in agrupados]
+        ordem = codigos[np.argsort(-somas[codigos], kind="stable")]
+        if n is not None:
+            ordem = ordem[:n]
+        return [(self.fornecedores.valores[codigo], float(somas[codigo]) / 100) for codigo in ordem]
+
+    def supplier_counts(self) -> dict[str, int]:
+        """Lançamentos por fornecedor normalizado (entrada do job de canonicalização)."""
+        contagens = np.bincount(self._fornecedores[: self._n][self._vivos[: self._n]], minlength=len(self.fornecedores.valores))
+        return {self.fornecedores.valores[codigo]: int(contagens[codigo]) for codigo in np.flatnonzero(contagens[1:]) + 1}
+
+    def categories(self) -> list[str]:
+        """Categorias presentes na tabela (texto original, "" = sem categoria)."""
+        presentes = np.unique(self._categorias[: self._n][self._vivos[: self._n]])
+        return [self.categorias.valores[codigo] for codigo in presentes]
+
+
+def _meses_vetorizado(ordinais: np.ndarray) -> np.ndarray:
+    """Meses desde 1970-01 para cada ordinal (``-1`` quando não há data)."""
+    validos = ordinais > 0
+    meses = np.full(len(ordinais), -1, dtype=np.int32)
+    dias = (ordinais[validos].astype(np.int64) - _ORDINAL_EPOCH).astype("datetime64[D]")
+    meses[validos] = dias.astype("datetime64[M]").astype(np.int64)
+    return meses
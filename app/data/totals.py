@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Totais correntes (soma e quantidade) para os cards de resumo.
+
+Guarda o total geral e o total sob os filtros do resumo. Inclusões, edições e
+exclusões ajustam os dois por delta em O(1); a recontagem completa só acontece
+quando os filtros mudam.
+"""
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+from app.data.query import compile_filter, normalize_filters, record_cents
+from app.data.table import ExpenseTable
+
+
+class RunningTotals:
+    """Soma em centavos e quantidade, gerais e sob um filtro fixo."""
+
+    def __init__(self, filters: dict[str, Any] | None = None) -> None:
+        self.filters = filters
+        self._predicado = compile_filter(normalize_filters(filters))
+        self._geral = [0, 0]
+        self._filtrado = [0, 0]
+
+    @classmethod
+    def from_table(cls, tabela: ExpenseTable, filters: dict[str, Any] | None = None) -> "RunningTotals":
+        """Recontagem completa (vetorizada) a partir da tabela colunar."""
+        totais = cls(filters)
+        totais._geral = list(tabela.total())
+        totais._filtrado = list(tabela.total(tabela.mask(filters)))
+        return totais
+
+    @property
+    def overall(self) -> tuple[int, int]:
+        return self._geral[0], self._geral[1]
+
+    @property
+    def filtered(self) -> tuple[int, int]:
+        return self._filtrado[0], self._filtrado[1]
+
+    def add(self, registro: Mapping[str, Any], sinal: int = 1) -> None:
+        centavos = record_cents(registro)
+        self._geral[0] += sinal * centavos
+        self._geral[1] += sinal
+        if self._predicado(registro):
+            self._filtrado[0] += sinal * centavos
+            self._filtrado[1] += sinal
+
+    def remove(self, registro: Mapping[str, Any]) -> None:
+        self.add(registro, -1)
+
+    def replace(self, anterior: Mapping[str, Any], novo: Mapping[str, Any]) -> None:
+        self.remove(anterior)
+        self.add(novo)
@@ -10,7 +10,6 @@ from pathlib import Path
 import shutil
 
 import customtkinter as ctk
-from PIL import Image
 from datetime import datetime
 import tkinter as tk
 from tkinter import messagebox, filedialog
@@ -18,17 +17,22 @@ from typing import Any, Iterable
 
 from app.utils.formatting import format_brl, validar_data, validar_valor
 
-from app.utils.report import generate_pdf_report
-from app.ui.dashboard import abrir_dashboard
+# Dashboard (matplotlib), relatório PDF (reportlab), e-mail e PIL só são
+# importados no primeiro uso: a partida não paga por eles
 
-from app.data.store import load_data, save_data
-try:
-    from app.utils import send_csv_mail
-except Exception:  # pragma: no cover
-    send_csv_mail = None
+from app.data.index import RecordIndex, select_positions
+from app.data.models import Despesa
+from app.data.ordering import SortedOrder, order_positions
+from app.data.records import RecordSet
+from app.data.query import compile_filter, normalize_filters, normalize_key, record_cents, record_ordinal
+from app.data.store import append_record, delete_record, load_data, update_record
+from app.data.table import ExpenseTable
+from app.data.totals import RunningTotals
 
-from app.ui.widgets import ReadOnlyComboBox
+from app.ui.background import LatestOnlyWorker
+from app.ui.widgets import ReadOnlyComboBox, TableColumn, VirtualList, VirtualTable, update_listbox
 from app.utils.paths import runtime_path, workspace_path
+from app.utils.search import SearchIndex
 
 LIGHT_COLORS = {
     "background": "#F5F7FA",
@@ -51,6 +55,23 @@ FONT_FAMILY = "Segoe UI"
 
 USE_EMOJI = False
 
+# Altura fixa (px) de cada card da lista virtualizada de despesas
+ALTURA_CARD_GASTO = 196
+
+# Espera (ms) após a última alteração de filtro antes de refiltrar a gestão
+DEBOUNCE_FILTRO_MS = 250
+
+# Máximo de sugestões exibidas nas janelas de busca de fornecedor/categoria
+LIMITE_BUSCA = 200
+
+# Faixas do filtro de valor da gestão (limite inferior exclusivo, em reais)
+FAIXAS_VALOR: dict[str, dict[str, float]] = {
+    "Até 100": {"valor_max": 100},
+    "100 a 500": {"valor_min": 100.01, "valor_max": 500},
+    "500 a 1000": {"valor_min": 500.01, "valor_max": 1000},
+    "Acima de 1000": {"valor_min": 1000.01},
+}
+
 def e(txt: str, emoji: str) -> str:
 
     return f"{emoji} {txt}" if USE_EMOJI and emoji else txt
@@ -92,8 +113,18 @@ class ControleGastosApp(ctk.CTk):
 
         self.empresa_slug = self._gerar_slug(self.empresa_razao or self.empresa_nome or self.empresa_id)
 
-        self.gastos: list[dict[str, Any]] = load_data(self.arquivo_dados)
+        # Lançamentos por id; tabela, índices e ordem usam as mesmas posições estáveis
+        self.gastos = RecordSet(load_data(self.arquivo_dados, typed=True))
+        # Colunas NumPy alinhadas a self.gastos para recontagens vetorizadas
+        self.tabela_gastos = ExpenseTable.from_records(self.gastos)
+        # Índices invertidos e de datas para os filtros da gestão e do relatório
+        self.indice_gastos = RecordIndex.from_records(self.gastos)
+        # Ordem cronológica compartilhada por gestão, relatório e PDF
+        self.ordem_gastos = SortedOrder.from_records(self.gastos)
         self.fornecedores: list[str] = sorted({str(g.get("fornecedor") or "").strip() for g in self.gastos if (g.get("fornecedor") or "").strip()})
+        # Índices de busca da empresa; acompanham as listas por diferença ao abrir a busca
+        self._busca_fornecedores = SearchIndex()
+        self._busca_categorias = SearchIndex()
 
         # Estado janela de gestão (lista com filtros por campos simples)
 
@@ -113,17 +144,23 @@ class ControleGastosApp(ctk.CTk):
 
         self.filtro_valor_combo = None
 
+        # Filtragem da gestão em segundo plano (só o pedido mais recente é exibido)
+        self._filtro_worker = LatestOnlyWorker(self)
+
         self.scroll_container: ctk.CTkScrollableFrame | None = None
 
         self.resumo_filtros: dict[str, str] | None = None
 
+        # Totais dos cards (gerais e sob resumo_filtros), ajustados por delta
+        self.totais_resumo = RunningTotals.from_table(self.tabela_gastos, self.resumo_filtros)
+
         self.relatorio_filtros: dict[str, str] | None = None
 
         self.relatorio_dados_visiveis: list[dict[str, Any]] = []
 
         self.relatorio_window: ctk.CTkToplevel | None = None
 
-        self.relatorio_scroll_frame: ctk.CTkScrollableFrame | None = None
+        self.relatorio_tabela: VirtualTable | None = None
 
         self.logo_path = self._resolver_recurso("logo_empresa.png")
 
@@ -283,6 +320,8 @@ class ControleGastosApp(ctk.CTk):
 
         try:
 
+            from PIL import Image
+
             imagem = Image.open(caminho)
 
         except Exception:
@@ -449,7 +488,7 @@ class ControleGastosApp(ctk.CTk):
 
         self.janela_gestao = None
         self.relatorio_window = None
-        self.relatorio_scroll_frame = None
+        self.relatorio_tabela = None
 
     def _reset_ui(self):
         """Remove todos os filhos visuais para recriar a interface do zero."""
@@ -1018,46 +1057,6 @@ class ControleGastosApp(ctk.CTk):
 
             return None
 
-    def _normalizar_filtros(self, filtros: dict[str, str] | None) -> dict[str, Any]:
-
-        if not filtros:
-
-            return {}
-
-        normalizados: dict[str, Any] = {}
-
-        data_inicio = self._parse_data_str(filtros.get("data_inicio"))
-
-        data_fim = self._parse_data_str(filtros.get("data_fim"))
-
-        if data_inicio:
-
-            normalizados["data_inicio"] = data_inicio
-
-        if data_fim:
-
-            normalizados["data_fim"] = data_fim
-
-        tipo = self._normalizar_categoria(filtros.get("tipo"))
-
-        if tipo and tipo != "TODOS":
-
-            normalizados["tipo"] = tipo
-
-        forma = (filtros.get("forma") or "").strip()
-
-        if forma and forma != "Todos":
-
-            normalizados["forma"] = forma
-
-        fornecedor = self._normalizar_fornecedor(filtros.get("fornecedor"))
-
-        if fornecedor and fornecedor != "TODOS":
-
-            normalizados["fornecedor"] = fornecedor
-
-        return normalizados
-
     def _normalizar_categoria(self, nome: str | None) -> str:
         """Normaliza o nome da categoria para comparação e exibição."""
         return (nome or "").strip().upper()
@@ -1104,14 +1103,12 @@ class ControleGastosApp(ctk.CTk):
         lista = tk.Listbox(modal, height=15, font=("Segoe UI", 11))
         lista.pack(fill="both", expand=True, padx=12, pady=(0, 12))
 
-        fornecedores = self.fornecedores
+        self._busca_fornecedores.sync(self.fornecedores)
+        exibidos: list[str] = []
 
         def atualizar_lista(filtro: str = "") -> None:
-            lista.delete(0, tk.END)
-            termo = filtro.strip().upper()
-            for nome in fornecedores:
-                if not termo or termo in nome:
-                    lista.insert(tk.END, nome)
+            nonlocal exibidos
+            exibidos = update_listbox(lista, exibidos, self._busca_fornecedores.search(filtro, LIMITE_BUSCA))
 
         def selecionar(event=None) -> None:  # noqa: ANN001
             if not lista.curselection():
@@ -1151,14 +1148,12 @@ class ControleGastosApp(ctk.CTk):
         lista = tk.Listbox(modal, height=15, font=("Segoe UI", 11))
         lista.pack(fill="both", expand=True, padx=12, pady=(0, 12))
 
-        categorias = sorted(self.tipos_despesa)
+        self._busca_categorias.sync(self.tipos_despesa)
+        exibidos: list[str] = []
 
         def atualizar_lista(filtro: str = "") -> None:
-            lista.delete(0, tk.END)
-            termo = filtro.strip().upper()
-            for nome in categorias:
-                if not termo or termo in nome:
-                    lista.insert(tk.END, nome)
+            nonlocal exibidos
+            exibidos = update_listbox(lista, exibidos, self._busca_categorias.search(filtro, LIMITE_BUSCA))
 
         def selecionar(event=None) -> None:  # noqa: ANN001
             if not lista.curselection():
@@ -1263,63 +1258,32 @@ class ControleGastosApp(ctk.CTk):
 
         return texto or "empresa"
 
-    def _registro_atende_filtros(self, gasto: dict[str, Any], filtros: dict[str, Any]) -> bool:
-
-        if not filtros:
-
-            return True
-
-        data_gasto = self._parse_data_str(str(gasto.get("data", "")))
-
-        data_inicio = filtros.get("data_inicio")
-
-        data_fim = filtros.get("data_fim")
-
-        if data_inicio and (not data_gasto or data_gasto < data_inicio):
-
-            return False
+    def _filtrar_registros(
 
-        if data_fim and (not data_gasto or data_gasto > data_fim):
-
-            return False
-
-        tipo = filtros.get("tipo")
-
-        if tipo and self._normalizar_categoria(gasto.get("tipo")) != tipo:
-
-            return False
-
-        forma = filtros.get("forma")
-
-        if forma and gasto.get("forma_pagamento") != forma:
-
-            return False
-
-        fornecedor = filtros.get("fornecedor")
-
-        if fornecedor and self._normalizar_fornecedor(gasto.get("fornecedor")) != fornecedor:
+        self,
 
-            return False
+        registros: Iterable[dict[str, Any]],
 
-        return True
+        filtros: dict[str, str] | None,
 
-    def _filtrar_registros(self, registros: Iterable[dict[str, Any]], filtros: dict[str, str] | None) -> list[dict[str, Any]]:
+        ordenado: bool = False,
 
-        filtros_norm = self._normalizar_filtros(filtros)
+    ) -> list[dict[str, Any]]:
 
-        if not filtros_norm:
+        if registros is self.gastos:
 
-            return list(registros)
+            # Lista principal: o índice entrega só as posições candidatas
+            posicoes = self.indice_gastos.select(filtros)
 
-        filtrados: list[dict[str, Any]] = []
+            if ordenado:
 
-        for registro in registros:
+                posicoes = self._ordenar_posicoes(posicoes)
 
-            if self._registro_atende_filtros(registro, filtros_norm):
+            return [self.gastos.at(posicao) for posicao in posicoes]
 
-                filtrados.append(registro)
+        predicado = compile_filter(normalize_filters(filtros))
 
-        return filtrados
+        return [registro for registro in registros if predicado(registro)]
 
     def _abrir_modal_filtros(
 
@@ -2068,6 +2032,20 @@ class ControleGastosApp(ctk.CTk):
 
         ).pack(side='left', expand=True, fill='x', padx=8)
 
+        self._criar_botao(
+
+            botoes_relatorios,
+
+            'Consolidado',
+
+            self.abrir_dashboard_consolidado,
+
+            fg_color=BRAND_COLORS['neutral'],
+
+            hover_color="#4B4B4B",
+
+        ).pack(side='left', expand=True, fill='x', padx=8)
+
         self._criar_botao(
 
             botoes_relatorios,
@@ -2111,11 +2089,33 @@ class ControleGastosApp(ctk.CTk):
 
         self.resumo_filtros = filtros
 
+        # Filtro novo: única situação que exige recontar tudo
+        self.totais_resumo = RunningTotals.from_table(self.tabela_gastos, filtros)
+
         self.atualizar_stats()
 
+    def abrir_dashboard_consolidado(self):
+        try:
+            from app.ui.dashboard import abrir_dashboard
+            from app.ui.empresa_selector import EMPRESAS_PRE_CONFIGURADAS
+
+            pasta = workspace_path("app", "data")
+            empresas = {
+                empresa["nome_fantasia"]: pasta / f"{empresa['id']}.json"
+                for empresa in EMPRESAS_PRE_CONFIGURADAS
+                if (pasta / f"{empresa['id']}.json").exists()
+            }
+            abrir_dashboard(self, Path(self.arquivo_dados), empresas=empresas)
+        except Exception as exc:  # noqa: BLE001
+            messagebox.showerror("Erro", f"Não foi possível exibir o painel consolidado:\n{exc}")
+
     def abrir_dashboard_executivo(self):
         try:
-            abrir_dashboard(self, Path(self.arquivo_dados))
+            from app.ui.dashboard import abrir_dashboard
+
+            # Tabela colunar já em memória: o painel abre sem reler o arquivo e
+            # copia a tabela antes de entregá-la à thread de trabalho
+            abrir_dashboard(self, Path(self.arquivo_dados), self.tabela_gastos)
         except Exception as exc:  # noqa: BLE001
             messagebox.showerror("Erro", f"Não foi possível exibir o painel:\n{exc}")
 
@@ -2147,133 +2147,63 @@ class ControleGastosApp(ctk.CTk):
 
     def _renderizar_relatorio_detalhado(self):
 
-        if not self.relatorio_scroll_frame or not self.relatorio_scroll_frame.winfo_exists():
-
-            return
-
-        for child in self.relatorio_scroll_frame.winfo_children():
-
-            child.destroy()
-
-        registros = self._filtrar_registros(self.gastos, self.relatorio_filtros)
-
-        def _parse_data(g: dict[str, Any]) -> datetime:
-
-            try:
-
-                return datetime.strptime(g.get("data", "01/01/1970"), "%d/%m/%Y")
-
-            except (ValueError, TypeError):
-
-                return datetime(1970, 1, 1)
-
-        registros_ordenados = sorted(registros, key=_parse_data, reverse=True)
-
-        self.relatorio_dados_visiveis = registros_ordenados
-
-        frame = self.relatorio_scroll_frame
-
-        frame.grid_columnconfigure(0, weight=0, minsize=90)
-        frame.grid_columnconfigure(1, weight=2, minsize=220)
-        frame.grid_columnconfigure(2, weight=1, minsize=140)
-        frame.grid_columnconfigure(3, weight=0, minsize=90)
-        frame.grid_columnconfigure(4, weight=2, minsize=220)
-
-        if not registros_ordenados:
-
-            ctk.CTkLabel(
-
-                frame,
-
-                text="Nenhum lançamento corresponde aos filtros selecionados.",
-
-                font=self.fonts["label"],
-
-                text_color=BRAND_COLORS["text_secondary"],
-
-            ).pack(pady=20)
+        if not self.relatorio_tabela or not self.relatorio_tabela.winfo_exists():
 
             return
 
-        header_font = self.fonts["subtitle"]
+        registros = self._filtrar_registros(self.gastos, self.relatorio_filtros, ordenado=True)
 
-        headers = ["Data", "Tipo de despesa", "Forma de pagamento", "Valor", "Fornecedor"]
+        # Já vem na ordem cronológica compartilhada; a tabela só desenha as linhas visíveis
+        self.relatorio_tabela.set_items(registros, sorted_by=("data", True))
 
-        for col, header_text in enumerate(headers):
+        self.relatorio_dados_visiveis = list(self.relatorio_tabela.items)
 
-            sticky = "e" if col == 3 else "w"
+    def _colunas_relatorio(self) -> list[TableColumn]:
 
-            ctk.CTkLabel(
-
-                frame,
+        def data_chave(gasto):
 
-                text=header_text,
+            return (record_ordinal(gasto) or 0, gasto.get("timestamp", "") or "")
 
-                font=header_font,
+        return [
 
-                text_color=BRAND_COLORS["text_secondary"],
+            TableColumn("data", "Data", minwidth=110, sort_key=data_chave),
 
-            ).grid(row=0, column=col, padx=10, pady=(5, 6), sticky=sticky)
+            TableColumn("tipo", "Tipo de despesa", minwidth=220, weight=2, sort_key=lambda g: normalize_key(g.get("tipo"))),
 
-        separator = ctk.CTkFrame(frame, height=2, fg_color=BRAND_COLORS["neutral"])
+            TableColumn("forma_pagamento", "Forma de pagamento", minwidth=160, weight=1),
 
-        separator.grid(row=1, column=0, columnspan=5, sticky="ew", padx=5, pady=(0, 8))
+            TableColumn(
 
-        row_font = self.fonts["label"]
+                "valor",
 
-        for i, gasto in enumerate(registros_ordenados, start=2):
+                "Valor",
 
-            data_label = ctk.CTkLabel(frame, text=gasto.get("data", "--"), font=row_font)
-
-            tipo_label = ctk.CTkLabel(
-                frame,
-                text=gasto.get("tipo", "--"),
-                font=row_font,
-                anchor="w",
-                justify="left",
-                wraplength=300,
-            )
+                minwidth=120,
 
-            forma_label = ctk.CTkLabel(frame, text=gasto.get("forma_pagamento", "--"), font=row_font)
+                anchor="e",
 
-            valor_label = ctk.CTkLabel(
+                format=lambda g: format_brl(g.get("valor", 0.0)),
 
-                frame,
+                sort_key=record_cents,
 
-                text=format_brl(gasto.get("valor", 0.0)),
-
-                font=row_font,
-
-                text_color=BRAND_COLORS["text_primary"],
-
-            )
-            fornecedor_label = ctk.CTkLabel(
-                frame,
-                text=gasto.get("fornecedor", "--") or "--",
-                font=row_font,
-                anchor="w",
-                justify="left",
-                wraplength=260,
-            )
-
-            data_label.grid(row=i, column=0, padx=10, pady=6, sticky="w")
+            ),
 
-            tipo_label.grid(row=i, column=1, padx=10, pady=6, sticky="w")
+            TableColumn("fornecedor", "Fornecedor", minwidth=220, weight=2, sort_key=lambda g: normalize_key(g.get("fornecedor"))),
 
-            forma_label.grid(row=i, column=2, padx=10, pady=6, sticky="w")
+        ]
 
-            valor_label.grid(row=i, column=3, padx=10, pady=6, sticky="e")
-            fornecedor_label.grid(row=i, column=4, padx=10, pady=6, sticky="w")
+    def _exportar_pdf_relatorio_filtrado(self):
 
-            row_separator = ctk.CTkFrame(frame, height=1, fg_color=BRAND_COLORS["neutral"])
+        if self.relatorio_tabela and self.relatorio_tabela.winfo_exists():
 
-            row_separator.grid(row=i + 1, column=0, columnspan=5, sticky="ew", padx=10)
+            # Exporta na ordem escolhida no cabeçalho da tabela
+            registros = list(self.relatorio_tabela.items)
 
-    def _exportar_pdf_relatorio_filtrado(self):
+        else:
 
-        registros = self.relatorio_dados_visiveis or self._filtrar_registros(self.gastos, self.relatorio_filtros)
+            registros = self.relatorio_dados_visiveis or self._filtrar_registros(self.gastos, self.relatorio_filtros, ordenado=True)
 
-        self.exportar_relatorio_pdf(registros)
+        self.exportar_relatorio_pdf(registros, presorted=True)
 
     def _fechar_relatorio_window(self):
 
@@ -2283,7 +2213,7 @@ class ControleGastosApp(ctk.CTk):
 
         self.relatorio_window = None
 
-        self.relatorio_scroll_frame = None
+        self.relatorio_tabela = None
 
     def _reiniciar_aplicacao(self):
 
@@ -2377,18 +2307,26 @@ class ControleGastosApp(ctk.CTk):
         if getattr(self, "fornecedor_ativo", tk.IntVar(value=0)).get():
             fornecedor = self._normalizar_fornecedor(self.combo_fornecedor.get())
 
-        registro = {
+        registro = Despesa({
             "data": data,
             "tipo": tipo,
             "forma_pagamento": pagamento,
             "valor": valor,
             "fornecedor": fornecedor or None,
             "timestamp": datetime.now().isoformat(),
-        }
+        })
 
-        self.gastos.append(registro)
+        self.gastos.add(registro)
 
-        if not save_data(self.arquivo_dados, self.gastos):
+        self.tabela_gastos.append(registro)
+
+        self.indice_gastos.append(registro)
+
+        self.ordem_gastos.append(registro)
+
+        self.totais_resumo.add(registro)
+
+        if not append_record(self.arquivo_dados, registro):
 
             messagebox.showerror("Erro", "Não foi possível salvar os dados em disco.")
 
@@ -2428,15 +2366,11 @@ class ControleGastosApp(ctk.CTk):
 
     def atualizar_stats(self):
 
-        registros = []
-
-        if isinstance(self.gastos, list):
+        total_centavos, quantidade = self.totais_resumo.filtered
 
-            registros = self._filtrar_registros(self.gastos, self.resumo_filtros)
+        _, quantidade_geral = self.totais_resumo.overall
 
-        total = sum((g.get("valor", 0.0) if isinstance(g, dict) else 0.0) for g in registros)
-
-        quantidade = len(registros)
+        total = total_centavos / 100
 
         if self.total_card_value:
 
@@ -2446,7 +2380,14 @@ class ControleGastosApp(ctk.CTk):
 
             sufixo = "lançamento" if quantidade == 1 else "lançamentos"
 
-            self.quantidade_card_value.configure(text=f"{quantidade} {sufixo}")
+            # Com filtro de resumo, a contagem geral (mantida pelo mesmo delta) dá a proporção
+            if normalize_filters(self.resumo_filtros):
+
+                self.quantidade_card_value.configure(text=f"{quantidade} de {quantidade_geral} {sufixo}")
+
+            else:
+
+                self.quantidade_card_value.configure(text=f"{quantidade} {sufixo}")
 
     # ------- Gestão com múltiplos filtros simples -------
 
@@ -2577,18 +2518,20 @@ class ControleGastosApp(ctk.CTk):
         self.filtro_data_inicio_entry = ctk.CTkEntry(filtros_frame, height=36, font=self.fonts['label'])
 
         self.filtro_data_inicio_entry.grid(row=1, column=0, padx=12, pady=(0, 10), sticky='ew')
-        self.filtro_data_inicio_entry.bind("<KeyRelease>", lambda event: self._formatar_data_widget(self.filtro_data_inicio_entry))
+        self.filtro_data_inicio_entry.bind("<KeyRelease>", lambda event: self._ao_digitar_data_filtro(self.filtro_data_inicio_entry))
 
         self.filtro_data_fim_entry = ctk.CTkEntry(filtros_frame, height=36, font=self.fonts['label'])
 
         self.filtro_data_fim_entry.grid(row=1, column=1, padx=12, pady=(0, 10), sticky='ew')
-        self.filtro_data_fim_entry.bind("<KeyRelease>", lambda event: self._formatar_data_widget(self.filtro_data_fim_entry))
+        self.filtro_data_fim_entry.bind("<KeyRelease>", lambda event: self._ao_digitar_data_filtro(self.filtro_data_fim_entry))
 
         tipos_filtro = ['Todos'] + sorted(self.tipos_despesa)
 
         self.filtro_tipo_combo = ReadOnlyComboBox(
 
-            filtros_frame, values=tipos_filtro, height=36, font=self.fonts['label'], dropdown_font=self.fonts['dropdown']
+            filtros_frame, values=tipos_filtro, height=36, font=self.fonts['label'], dropdown_font=self.fonts['dropdown'],
+
+            command=self.agendar_filtro_gestao,
 
         )
 
@@ -2600,7 +2543,9 @@ class ControleGastosApp(ctk.CTk):
 
         self.filtro_forma_combo = ReadOnlyComboBox(
 
-            filtros_frame, values=formas_filtro, height=36, font=self.fonts['label'], dropdown_font=self.fonts['dropdown']
+            filtros_frame, values=formas_filtro, height=36, font=self.fonts['label'], dropdown_font=self.fonts['dropdown'],
+
+            command=self.agendar_filtro_gestao,
 
         )
 
@@ -2624,7 +2569,9 @@ class ControleGastosApp(ctk.CTk):
 
         self.filtro_fornecedor_combo = ReadOnlyComboBox(
 
-            filtros_frame, values=fornecedores_filtro, height=36, font=self.fonts['label'], dropdown_font=self.fonts['dropdown']
+            filtros_frame, values=fornecedores_filtro, height=36, font=self.fonts['label'], dropdown_font=self.fonts['dropdown'],
+
+            command=self.agendar_filtro_gestao,
 
         )
 
@@ -2656,6 +2603,8 @@ class ControleGastosApp(ctk.CTk):
 
             dropdown_font=self.fonts['dropdown'],
 
+            command=self.agendar_filtro_gestao,
+
         )
 
         self.filtro_valor_combo.set('Todos')
@@ -2690,10 +2639,22 @@ class ControleGastosApp(ctk.CTk):
 
         ).pack(side='left', expand=True, fill='x', padx=(6, 0))
 
-        self.lista_gastos_frame = ctk.CTkScrollableFrame(
+        self.lista_gastos_frame = VirtualList(
 
             self.janela_gestao,
 
+            row_height=ALTURA_CARD_GASTO,
+
+            create_row=self._criar_linha_gasto,
+
+            bind_row=self._preencher_linha_gasto,
+
+            empty_text="Nenhuma despesa correspondente aos filtros.",
+
+            empty_font=self.fonts["label"],
+
+            empty_text_color=BRAND_COLORS["text_secondary"],
+
             width=880,
 
             height=420,
@@ -2724,6 +2685,8 @@ class ControleGastosApp(ctk.CTk):
 
     def fechar_janela_gestao(self):
 
+        self._filtro_worker.cancel()
+
         if self.janela_gestao and self.janela_gestao.winfo_exists():
 
             self.janela_gestao.destroy()
@@ -2766,19 +2729,30 @@ class ControleGastosApp(ctk.CTk):
 
         self.renderizar_lista_gastos()
 
-    def obter_gastos_ordenados(self):
+    def _ordenar_posicoes(self, posicoes: list[int]) -> list[int]:
+        """Aplica a ordem cronológica compartilhada a um subconjunto de posições."""
 
-        def parse_data(gasto):
+        if len(posicoes) == len(self.gastos):
 
-            try:
+            return self.ordem_gastos.positions()
+
+        return self.ordem_gastos.order(posicoes)
+
+    def agendar_filtro_gestao(self, _valor=None):
+        """Refiltra a gestão após uma pausa na edição dos filtros (debounce)."""
+
+        self._filtro_worker.debounce(DEBOUNCE_FILTRO_MS, self.renderizar_lista_gastos)
+
+    def _ao_digitar_data_filtro(self, widget):
 
-                return datetime.strptime(gasto.get("data", ""), "%d/%m/%Y")
+        self._formatar_data_widget(widget)
 
-            except (ValueError, TypeError):
+        texto = widget.get().strip()
 
-                return datetime.min
+        # Datas incompletas não mudam o resultado; só refiltra com o campo vazio ou completo
+        if not texto or validar_data(texto):
 
-        return sorted(enumerate(self.gastos), key=lambda item: (parse_data(item[1]), item[1].get("timestamp", "")), reverse=True)
+            self.agendar_filtro_gestao()
 
     def renderizar_lista_gastos(self):
 
@@ -2786,238 +2760,265 @@ class ControleGastosApp(ctk.CTk):
 
             return
 
-        for child in self.lista_gastos_frame.winfo_children():
+        # Widgets, lista, ordem e índices só são lidos aqui (thread da interface);
+        # a thread de trabalho recebe cópias, pois salvar ou excluir pode
+        # alterá-los enquanto o filtro roda
+        filtros = normalize_filters(self._filtros_gestao())
 
-            child.destroy()
+        slots = list(self.gastos.slots)
 
-        gastos_filtrados = self.filtrar_gastos(self.obter_gastos_ordenados())
+        linhas = self.indice_gastos.rows() if filtros else None
 
-        if not gastos_filtrados:
+        candidatos = self.indice_gastos.candidates(filtros) if filtros else None
 
-            ctk.CTkLabel(
+        # Filtro seletivo: só as chaves de ordem dos candidatos vão para a
+        # thread, que ordena a seleção em vez de percorrer a ordem inteira
+        chaves = self.ordem_gastos.keys(candidatos) if candidatos is not None else None
 
-                self.lista_gastos_frame,
+        ordem = self.ordem_gastos.positions() if chaves is None else None
 
-                text="Nenhuma despesa correspondente aos filtros.",
+        def calcular(cancelado):
 
-                font=self.fonts["label"],
+            if not filtros:
 
-                text_color=BRAND_COLORS["text_secondary"],
+                return [(posicao, slots[posicao]) for posicao in ordem]
 
-            ).pack(pady=20)
+            selecionados = select_positions(linhas, filtros, candidatos)
 
-            return
+            if cancelado():
 
-        for indice, gasto in gastos_filtrados:
+                return None
 
-            card = ctk.CTkFrame(
+            if chaves is not None:
 
-                self.lista_gastos_frame,
+                return [(posicao, slots[posicao]) for posicao in order_positions(chaves, selecionados)]
 
-                corner_radius=16,
+            conjunto = set(selecionados)
 
-                fg_color=BRAND_COLORS["panel"],
+            return [(posicao, slots[posicao]) for posicao in ordem if posicao in conjunto]
 
-                border_color=BRAND_COLORS["neutral"],
+        def exibir(gastos_filtrados):
 
-                border_width=1,
+            # Só os cards visíveis existem; os demais são religados durante a rolagem
+            if self.lista_gastos_frame and self.lista_gastos_frame.winfo_exists():
 
-            )
+                self.lista_gastos_frame.set_items(gastos_filtrados)
 
-            card.pack(fill="x", padx=14, pady=8)
+        self._filtro_worker.submit(calcular, exibir)
 
-            topo = ctk.CTkFrame(card, fg_color="transparent")
+    def _criar_linha_gasto(self, parent):
 
-            topo.pack(fill="x", padx=16, pady=(12, 4))
+        linha = ctk.CTkFrame(parent, fg_color="transparent")
 
-            topo.grid_columnconfigure(0, weight=1)
+        linha.record_id = None
 
-            ctk.CTkLabel(
+        card = ctk.CTkFrame(
 
-                topo,
+            linha,
 
-                text=gasto.get("data", "--"),
+            corner_radius=16,
 
-                font=self.fonts["subtitle"],
+            fg_color=BRAND_COLORS["panel"],
 
-                text_color=BRAND_COLORS["text_primary"],
+            border_color=BRAND_COLORS["neutral"],
 
-            ).grid(row=0, column=0, sticky="w")
+            border_width=1,
 
-            ctk.CTkLabel(
+        )
 
-                topo,
+        card.pack(fill="both", expand=True, padx=14, pady=8)
 
-                text=format_brl(gasto.get("valor", 0.0)),
+        topo = ctk.CTkFrame(card, fg_color="transparent")
 
-                font=self.fonts["section"],
+        topo.pack(fill="x", padx=16, pady=(12, 4))
 
-                text_color=BRAND_COLORS["success"],
+        topo.grid_columnconfigure(0, weight=1)
 
-            ).grid(row=0, column=1, sticky="e")
+        linha.data_label = ctk.CTkLabel(
 
-            detalhes = ctk.CTkFrame(card, fg_color="transparent")
+            topo,
 
-            detalhes.pack(fill="x", padx=16, pady=(0, 8))
+            text="",
 
-            ctk.CTkLabel(
+            font=self.fonts["subtitle"],
 
-                detalhes,
+            text_color=BRAND_COLORS["text_primary"],
 
-                text=f"{gasto.get('tipo', '--')}  |  Forma: {gasto.get('forma_pagamento', '--')}",
+        )
 
-                font=self.fonts["label"],
+        linha.data_label.grid(row=0, column=0, sticky="w")
 
-                text_color=BRAND_COLORS["text_primary"],
+        linha.valor_label = ctk.CTkLabel(
 
-            ).grid(row=0, column=0, sticky="w")
+            topo,
 
-            fornecedor_nome = gasto.get("fornecedor") or ""
-            if fornecedor_nome:
-                ctk.CTkLabel(
-                    detalhes,
-                    text=f"Fornecedor: {fornecedor_nome}",
-                    font=self.fonts["subtitle"],
-                    text_color=BRAND_COLORS["text_secondary"],
-                ).grid(row=2, column=0, sticky="w", pady=(2, 0))
+            text="",
 
-            timestamp = gasto.get("timestamp")
+            font=self.fonts["section"],
 
-            exibicao = timestamp.replace("T", " ")[:16] if timestamp else "Sem registro de horário"
+            text_color=BRAND_COLORS["success"],
 
-            ctk.CTkLabel(
+        )
 
-                detalhes,
+        linha.valor_label.grid(row=0, column=1, sticky="e")
 
-                text=f"Registrado em {exibicao}",
+        detalhes = ctk.CTkFrame(card, fg_color="transparent")
 
-                font=self.fonts["subtitle"],
+        detalhes.pack(fill="x", padx=16, pady=(0, 8))
 
-                text_color=BRAND_COLORS["text_muted"],
+        linha.tipo_label = ctk.CTkLabel(
 
-            ).grid(row=1, column=0, sticky="w", pady=(2, 0))
+            detalhes,
 
-            botoes_frame = ctk.CTkFrame(card, fg_color="transparent")
+            text="",
 
-            botoes_frame.pack(fill="x", padx=16, pady=(4, 12))
+            font=self.fonts["label"],
 
-            self._criar_botao(
+            text_color=BRAND_COLORS["text_primary"],
 
-                botoes_frame,
+        )
 
-                "Editar despesa",
+        linha.tipo_label.grid(row=0, column=0, sticky="w")
 
-                lambda idx=indice: self.abrir_editor_gasto(idx),
+        linha.registro_label = ctk.CTkLabel(
 
-                height=38,
+            detalhes,
 
-            ).pack(side="left", expand=True, fill="x", padx=(0, 6))
+            text="",
 
-            self._criar_botao(
+            font=self.fonts["subtitle"],
 
-                botoes_frame,
+            text_color=BRAND_COLORS["text_muted"],
 
-                "Excluir",
+        )
 
-                lambda idx=indice: self.excluir_gasto(idx),
+        linha.registro_label.grid(row=1, column=0, sticky="w", pady=(2, 0))
 
-                fg_color=BRAND_COLORS["danger"],
+        linha.fornecedor_label = ctk.CTkLabel(
 
-                hover_color="#96281B",
+            detalhes,
 
-                height=38,
+            text="",
 
-            ).pack(side="left", expand=True, fill="x", padx=(6, 0))
+            font=self.fonts["subtitle"],
 
-    def filtrar_gastos(self, gastos_ordenados):
+            text_color=BRAND_COLORS["text_secondary"],
 
-        filtros_basicos: dict[str, str] = {}
+        )
 
-        inicio = self.filtro_data_inicio_entry.get().strip() if self.filtro_data_inicio_entry else ""
+        linha.fornecedor_label.grid(row=2, column=0, sticky="w", pady=(2, 0))
 
-        fim = self.filtro_data_fim_entry.get().strip() if self.filtro_data_fim_entry else ""
+        botoes_frame = ctk.CTkFrame(card, fg_color="transparent")
 
-        if inicio:
+        botoes_frame.pack(fill="x", padx=16, pady=(4, 12))
 
-            filtros_basicos["data_inicio"] = inicio
+        self._criar_botao(
 
-        if fim:
+            botoes_frame,
 
-            filtros_basicos["data_fim"] = fim
+            "Editar despesa",
 
-        tipo_filtro = self.filtro_tipo_combo.get() if self.filtro_tipo_combo else "Todos"
+            lambda l=linha: self.abrir_editor_gasto(l.record_id),
 
-        if tipo_filtro and tipo_filtro != "Todos":
+            height=38,
 
-            filtros_basicos["tipo"] = tipo_filtro
+        ).pack(side="left", expand=True, fill="x", padx=(0, 6))
 
-        forma_filtro = self.filtro_forma_combo.get() if self.filtro_forma_combo else "Todos"
+        self._criar_botao(
 
-        if forma_filtro and forma_filtro != "Todos":
+            botoes_frame,
 
-            filtros_basicos["forma"] = forma_filtro
+            "Excluir",
 
-        fornecedor_filtro = self.filtro_fornecedor_combo.get() if getattr(self, "filtro_fornecedor_combo", None) else "Todos"
+            lambda l=linha: self.excluir_gasto(l.record_id),
 
-        if fornecedor_filtro and fornecedor_filtro != "Todos":
+            fg_color=BRAND_COLORS["danger"],
 
-            filtros_basicos["fornecedor"] = fornecedor_filtro
+            hover_color="#96281B",
 
-        valor_filtro = self.filtro_valor_combo.get() if self.filtro_valor_combo else "Todos"
+            height=38,
+
+        ).pack(side="left", expand=True, fill="x", padx=(6, 0))
 
-        filtros_norm = self._normalizar_filtros(filtros_basicos)
+        return linha
 
-        def corresponde_valor(valor, criterio):
+    def _preencher_linha_gasto(self, linha, item, _posicao):
 
-            if criterio == "Todos":
+        _, gasto = item
 
-                return True
+        linha.record_id = gasto.get("id")
 
-            if criterio == "Até 100":
+        linha.data_label.configure(text=gasto.get("data", "--"))
 
-                return valor <= 100
+        linha.valor_label.configure(text=format_brl(gasto.get("valor", 0.0)))
 
-            if criterio == "100 a 500":
+        linha.tipo_label.configure(text=f"{gasto.get('tipo', '--')}  |  Forma: {gasto.get('forma_pagamento', '--')}")
 
-                return 100 < valor <= 500
+        timestamp = gasto.get("timestamp")
 
-            if criterio == "500 a 1000":
+        exibicao = timestamp.replace("T", " ")[:16] if timestamp else "Sem registro de horário"
 
-                return 500 < valor <= 1000
+        linha.registro_label.configure(text=f"Registrado em {exibicao}")
 
-            if criterio == "Acima de 1000":
+        fornecedor_nome = gasto.get("fornecedor") or ""
 
-                return valor > 1000
+        if fornecedor_nome:
 
-            return True
+            linha.fornecedor_label.configure(text=f"Fornecedor: {fornecedor_nome}")
 
-        resultado = []
+            linha.fornecedor_label.grid()
 
-        for indice, gasto in gastos_ordenados:
+        else:
 
-            if filtros_norm and not self._registro_atende_filtros(gasto, filtros_norm):
+            linha.fornecedor_label.grid_remove()
 
-                continue
+    def _filtros_gestao(self) -> dict[str, Any]:
 
-            try:
+        filtros_basicos: dict[str, Any] = {}
+
+        inicio = self.filtro_data_inicio_entry.get().strip() if self.filtro_data_inicio_entry else ""
 
-                valor_float = float(gasto.get("valor", 0) or 0)
+        fim = self.filtro_data_fim_entry.get().strip() if self.filtro_data_fim_entry else ""
 
-            except (TypeError, ValueError):
+        if inicio:
 
-                valor_float = 0
+            filtros_basicos["data_inicio"] = inicio
 
-            if not corresponde_valor(valor_float, valor_filtro):
+        if fim:
 
-                continue
+            filtros_basicos["data_fim"] = fim
 
-            resultado.append((indice, gasto))
+        tipo_filtro = self.filtro_tipo_combo.get() if self.filtro_tipo_combo else "Todos"
 
-        return resultado
+        if tipo_filtro and tipo_filtro != "Todos":
 
-    def abrir_editor_gasto(self, indice):
+            filtros_basicos["tipo"] = tipo_filtro
 
-        gasto = self.gastos[indice]
+        forma_filtro = self.filtro_forma_combo.get() if self.filtro_forma_combo else "Todos"
+
+        if forma_filtro and forma_filtro != "Todos":
+
+            filtros_basicos["forma"] = forma_filtro
+
+        fornecedor_filtro = self.filtro_fornecedor_combo.get() if getattr(self, "filtro_fornecedor_combo", None) else "Todos"
+
+        if fornecedor_filtro and fornecedor_filtro != "Todos":
+
+            filtros_basicos["fornecedor"] = fornecedor_filtro
+
+        valor_filtro = self.filtro_valor_combo.get() if self.filtro_valor_combo else "Todos"
+
+        filtros_basicos.update(FAIXAS_VALOR.get(valor_filtro, {}))
+
+        return filtros_basicos
+
+    def abrir_editor_gasto(self, record_id):
+
+        gasto = self.gastos.get(record_id)
+
+        if gasto is None:
+
+            return
 
         editor = ctk.CTkToplevel(self)
 
@@ -3230,7 +3231,11 @@ class ControleGastosApp(ctk.CTk):
 
                 return
 
-            gasto.update(
+            # Edita uma cópia: o store compara com a versão anterior para
+            # atualizar o cubo de totais por delta
+            atualizado = gasto.copy()
+
+            atualizado.update(
 
                 {
 
@@ -3246,19 +3251,31 @@ class ControleGastosApp(ctk.CTk):
 
             )
 
-            save_ok = save_data(self.arquivo_dados, self.gastos)
+            if not update_record(self.arquivo_dados, atualizado):
 
-            self.atualizar_stats()
+                self._recarregar_gastos()
 
-            self.renderizar_lista_gastos()
+                messagebox.showerror("Erro", "Não foi possível salvar a alteração. A lista foi recarregada com os dados do disco.")
+
+                editor.destroy()
 
-            if not save_ok:
+                return
 
-                messagebox.showerror("Erro", "Não foi possível salvar os dados em disco.")
+            posicao = self.gastos.replace(atualizado)
 
-            else:
+            self.tabela_gastos.update(posicao, atualizado)
 
-                messagebox.showinfo("Sucesso", "Despesa atualizada com sucesso!")
+            self.indice_gastos.update(posicao, atualizado)
+
+            self.ordem_gastos.update(posicao, atualizado)
+
+            self.totais_resumo.replace(gasto, atualizado)
+
+            self.atualizar_stats()
+
+            self.renderizar_lista_gastos()
+
+            messagebox.showinfo("Sucesso", "Despesa atualizada com sucesso!")
 
             editor.destroy()
 
@@ -3288,9 +3305,31 @@ class ControleGastosApp(ctk.CTk):
 
         ).pack(side="left", expand=True, fill="x", padx=(8, 0))
 
-    def excluir_gasto(self, indice):
+    def _recarregar_gastos(self):
+
+        # O store recusou uma edição/exclusão (id ausente do arquivo, por exemplo
+        # após ids novos para lançamentos legados): a tela volta ao que está salvo
+        self.gastos = RecordSet(load_data(self.arquivo_dados, typed=True))
+
+        self.tabela_gastos = ExpenseTable.from_records(self.gastos)
+
+        self.indice_gastos = RecordIndex.from_records(self.gastos)
+
+        self.ordem_gastos = SortedOrder.from_records(self.gastos)
+
+        self.totais_resumo = RunningTotals.from_table(self.tabela_gastos, self.resumo_filtros)
+
+        self.atualizar_stats()
+
+        self.renderizar_lista_gastos()
+
+    def excluir_gasto(self, record_id):
 
-        gasto = self.gastos[indice]
+        gasto = self.gastos.get(record_id)
+
+        if gasto is None:
+
+            return
 
         valor = gasto.get("valor", 0)
 
@@ -3304,21 +3343,29 @@ class ControleGastosApp(ctk.CTk):
 
             return
 
-        del self.gastos[indice]
+        if not delete_record(self.arquivo_dados, record_id):
 
-        save_ok = save_data(self.arquivo_dados, self.gastos)
+            self._recarregar_gastos()
 
-        self.atualizar_stats()
+            messagebox.showerror("Erro", "Não foi possível excluir a despesa. A lista foi recarregada com os dados do disco.")
 
-        self.renderizar_lista_gastos()
+            return
 
-        if not save_ok:
+        posicao = self.gastos.discard(record_id)
 
-            messagebox.showerror("Erro", "Não foi possível salvar os dados em disco.")
+        self.tabela_gastos.discard(posicao)
 
-        else:
+        self.indice_gastos.discard(posicao)
+
+        self.ordem_gastos.discard(posicao)
 
-            messagebox.showinfo("Sucesso", "Despesa removida com sucesso!")
+        self.totais_resumo.remove(gasto)
+
+        self.atualizar_stats()
+
+        self.renderizar_lista_gastos()
+
+        messagebox.showinfo("Sucesso", "Despesa removida com sucesso!")
 
     def mostrar_relatorio(self):
 
@@ -3402,9 +3449,31 @@ class ControleGastosApp(ctk.CTk):
 
         ).pack(side="left", expand=True, fill="x", padx=(6, 0))
 
-        self.relatorio_scroll_frame = ctk.CTkScrollableFrame(self.relatorio_window, fg_color=BRAND_COLORS["surface"])
+        self.relatorio_tabela = VirtualTable(
+
+            self.relatorio_window,
+
+            self._colunas_relatorio(),
 
-        self.relatorio_scroll_frame.pack(fill="both", expand=True, padx=24, pady=(0, 20))
+            font=self.fonts["label"],
+
+            header_font=self.fonts["subtitle"],
+
+            text_color=BRAND_COLORS["text_primary"],
+
+            header_text_color=BRAND_COLORS["text_secondary"],
+
+            line_color=BRAND_COLORS["neutral"],
+
+            background=BRAND_COLORS["surface"],
+
+            empty_text="Nenhum lançamento corresponde aos filtros selecionados.",
+
+            sort=("data", True),
+
+        )
+
+        self.relatorio_tabela.pack(fill="both", expand=True, padx=24, pady=(0, 20))
 
         botoes_frame = ctk.CTkFrame(self.relatorio_window, fg_color="transparent")
 
@@ -3443,7 +3512,13 @@ class ControleGastosApp(ctk.CTk):
         self._renderizar_relatorio_detalhado()
 
 
-    def exportar_relatorio_pdf(self, registros: Iterable[dict[str, Any]] | None = None):
+    def exportar_relatorio_pdf(self, registros: Iterable[dict[str, Any]] | None = None, presorted: bool = False):
+
+        if registros is None:
+
+            registros = self._filtrar_registros(self.gastos, None, ordenado=True)
+
+            presorted = True
 
         registros_validos = self._obter_registros_exportacao(registros)
         if registros_validos is None:
@@ -3461,11 +3536,14 @@ class ControleGastosApp(ctk.CTk):
         try:
             logo_param = str(self.logo_path) if self.logo_path and self.logo_path.exists() else None
             company_label = f"{self.empresa_razao} - Captacao de Despesas-14D"
+            from app.utils.report import generate_pdf_report
+
             caminho = generate_pdf_report(
                 registros_validos,
                 str(caminho_destino),
                 company_name=company_label,
                 logo_path=logo_param,
+                presorted=presorted,
             )
         except RuntimeError as exc:
             messagebox.showerror(
@@ -3486,7 +3564,7 @@ class ControleGastosApp(ctk.CTk):
         registros_validos: list[dict[str, Any]] = []
         if registros is not None:
             registros_validos = list(registros)
-        elif isinstance(self.gastos, list):
+        elif self.gastos:
             registros_validos = list(self.gastos)
         if not registros_validos:
             messagebox.showinfo("Informação", "Nenhum lançamento disponível para exportação.")
@@ -3523,14 +3601,15 @@ class ControleGastosApp(ctk.CTk):
                         fornecedor_csv,
                     ])
             messagebox.showinfo("Relatório criado", f"Arquivo CSV criado em: {caminho_destino}")
-            # Envio assíncrono via e-mail (se configurado)
-            if send_csv_mail:
-                def _bg_envio():
-                    try:
-                        send_csv_mail.enviar_csv(caminho_destino, empresa=self.empresa_nome or self.empresa_slug)
-                    except Exception:
-                        pass
-                threading.Thread(target=_bg_envio, daemon=True).start()
+            # Envio assíncrono via e-mail (se configurado); o módulo é importado na thread
+            def _bg_envio():
+                try:
+                    from app.utils import send_csv_mail
+
+                    send_csv_mail.enviar_csv(caminho_destino, empresa=self.empresa_nome or self.empresa_slug)
+                except Exception:
+                    pass
+            threading.Thread(target=_bg_envio, daemon=True).start()
         except Exception as exc:  # noqa: BLE001
             messagebox.showerror("Erro", f"Não foi possível gerar o arquivo CSV: {exc}")
 
@@ -3625,13 +3704,13 @@ class ControleGastosApp(ctk.CTk):
                 return
 
             filtros_periodo = {"data_inicio": inicio_val, "data_fim": fim_val}
-            registros_periodo = self._filtrar_registros(self.gastos, filtros_periodo)
+            registros_periodo = self._filtrar_registros(self.gastos, filtros_periodo, ordenado=True)
             if not registros_periodo:
                 messagebox.showinfo("Aviso", "Nenhum registro no período informado.")
                 return
 
             if formato_var.get() == "pdf":
-                self.exportar_relatorio_pdf(registros_periodo)
+                self.exportar_relatorio_pdf(registros_periodo, presorted=True)
             else:
                 self.exportar_relatorio_csv(registros_periodo)
             modal.destroy()
@@ -3656,6 +3735,10 @@ class ControleGastosApp(ctk.CTk):
 def main(theme_mode: str | None = None, config_path: str | None = None):
     """Ponto de entrada da UI: abre seletor e instancia a aplicação."""
     from app.ui.empresa_selector import selecionar_empresa
+    from app.utils.startup import finish_import_profile
+
+    # Tudo o que a partida importa já carregou: o perfil (se ligado) termina aqui
+    finish_import_profile()
 
     empresa_info = selecionar_empresa()
     if not empresa_info:
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Execução em segundo plano para a interface (Tk não é thread-safe).
+
+``LatestOnlyWorker`` roda cálculos em uma thread e só entrega, na thread da
+interface, o resultado do pedido mais recente: pedidos novos tornam os
+anteriores obsoletos (cancelados). O resultado volta por uma fila lida com
+``after()``, então nenhum widget é tocado fora do laço do Tk.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable
+
+from app.utils.logger import get_logger
+
+logger = get_logger("capt.ui")
+
+_POLL_MS = 30
+
+
+class LatestOnlyWorker:
+    """Cálculos em thread com debounce e descarte de pedidos obsoletos.
+
+    ``compute(cancelado)`` roda na thread de trabalho e pode consultar
+    ``cancelado()`` para abandonar cedo; ``deliver(resultado)`` roda na thread
+    da interface e só para o último pedido.
+    """
+
+    def __init__(self, widget: Any, poll_ms: int = _POLL_MS) -> None:
+        self._widget = widget
+        self._poll_ms = poll_ms
+        self._geracao = 0
+        self._agendado: str | None = None
+        self._verificando: str | None = None
+        self._pendentes = 0
+        self._resultados: queue.Queue[tuple[int, Any, Callable[[Any], None]]] = queue.Queue()
+
+    def debounce(self, delay_ms: int, callback: Callable[[], None]) -> None:
+        """Agenda ``callback`` para daqui a ``delay_ms``, descartando o agendamento anterior."""
+        self._cancelar_agendamento()
+        self._agendado = self._widget.after(delay_ms, self._disparar, callback)
+
+    def _disparar(self, callback: Callable[[], None]) -> None:
+        self._agendado = None
+        callback()
+
+    def submit(self, compute: Callable[[Callable[[], bool]], Any], deliver: Callable[[Any], None]) -> None:
+        """Inicia o cálculo; qualquer pedido anterior ainda em curso fica obsoleto."""
+        self._cancelar_agendamento()
+        self._geracao += 1
+        geracao = self._geracao
+
+        def cancelado() -> bool:
+            return geracao != self._geracao
+
+        def executar() -> None:
+            try:
+                resultado = compute(cancelado)
+            except Exception:  # noqa: BLE001
+                if not cancelado():
+                    logger.exception("Falha no cálculo em segundo plano")
+                resultado = None
+                geracao_entregue = -1
+            else:
+                geracao_entregue = geracao
+            self._resultados.put((geracao_entregue, resultado, deliver))
+
+        self._pendentes += 1
+        threading.Thread(target=executar, daemon=True).start()
+        if self._verificando is None:
+            self._verificando = self._widget.after(self._poll_ms, self._verificar)
+
+    def cancel(self) -> None:
+        """Descarta agendamentos e resultados ainda não entregues."""
+        self._cancelar_agendamento()
+        self._geracao += 1
+
+    def _cancelar_agendamento(self) -> None:
+        if self._agendado is not None:
+            try:
+                self._widget.after_cancel(self._agendado)
+            except Exception:
+                pass
+            self._agendado = None
+
+    def _verificar(self) -> None:
+        self._verificando = None
+        while True:
+            try:
+                geracao, resultado, deliver = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._pendentes -= 1
+            if geracao == self._geracao:
+                deliver(resultado)
+        if self._pendentes:
+            try:
+                self._verificando = self._widget.after(self._poll_ms, self._verificar)
+            except Exception:
+                # Janela destruída: não há mais onde entregar
+                self._pendentes = 0
@@ -1,20 +1,33 @@
 """Dashboard executivo de despesas (CustomTkinter + Matplotlib).
 
 API pública:
-    abrir_dashboard(parent, empresa_path: Path)
+    abrir_dashboard(parent, empresa_path: Path, dados=None, *, empresas=None)
 """
 
 from __future__ import annotations
 
-import json
+import math
+from bisect import bisect_right
 from collections import defaultdict, OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Iterable
 
 import customtkinter as ctk
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
+from matplotlib.patches import Wedge
+from matplotlib.transforms import Bbox
+
+from app.data.consolidated import consolidate
+from app.data.cube import AggregateCube
+from app.data.store import get_cube, refresh_canonical_suppliers
+from app.data.suppliers import CanonicalSuppliers
+from app.data.table import ExpenseTable
+from app.ui.background import LatestOnlyWorker
+from app.ui.widgets import ReadOnlyComboBox
 
 # Paleta expandida para garantir cores distintas nas categorias
 PIE_PALETTE = [
@@ -63,39 +76,27 @@ def _palette() -> dict[str, str]:
 
 
 # ---------------------- Dados e KPIs ---------------------- #
-def _ler_despesas(empresa_path: Path) -> list[dict]:
+def _ler_cubo(empresa_path: Path) -> AggregateCube:
+    """Totais pré-agregados da empresa (mantidos pelo store a cada alteração)."""
     try:
-        raw = Path(empresa_path).read_text(encoding="utf-8")
-        data = json.loads(raw)
-        if isinstance(data, list):
-            return data
+        return get_cube(empresa_path)
     except Exception:
-        return []
-    return []
+        return AggregateCube()
 
 
-def _parse_data(reg: dict) -> datetime | None:
-    valor = reg.get("data") or ""
-    for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
-        try:
-            return datetime.strptime(valor, fmt)
-        except Exception:
-            continue
-    return None
+def _como_tabela(despesas: AggregateCube | ExpenseTable | Iterable[dict]) -> AggregateCube | ExpenseTable:
+    # Cubo e tabela colunar oferecem as mesmas consultas (by_month, by_category...)
+    if isinstance(despesas, (AggregateCube, ExpenseTable)):
+        return despesas
+    return ExpenseTable.from_records(despesas)
 
 
-def _agrupa_por_mes(despesas: Iterable[dict]) -> OrderedDict[str, float]:
-    soma = defaultdict(float)
-    for reg in despesas:
-        dt = _parse_data(reg)
-        if not dt:
-            continue
-        chave = dt.strftime("%Y-%m")
-        try:
-            soma[chave] += float(reg.get("valor", 0) or 0)
-        except Exception:
-            continue
-    return OrderedDict(sorted(soma.items()))
+def _rotulo_categoria(nome: str) -> str:
+    return nome or "Sem categoria"
+
+
+def _agrupa_por_mes(despesas: AggregateCube | ExpenseTable | Iterable[dict]) -> OrderedDict[str, float]:
+    return _como_tabela(despesas).by_month()
 
 
 def _ultimos_meses(dados: OrderedDict[str, float], limite: int = 6) -> OrderedDict[str, float]:
@@ -105,60 +106,104 @@ def _ultimos_meses(dados: OrderedDict[str, float], limite: int = 6) -> OrderedDi
     return OrderedDict(items)
 
 
-def _total_por_categoria(despesas: Iterable[dict], mes_ano: str | None = None) -> dict[str, float]:
-    tot = defaultdict(float)
-    for reg in despesas:
-        dt = _parse_data(reg)
-        if not dt:
-            continue
-        if mes_ano and dt.strftime("%Y-%m") != mes_ano:
-            continue
-        cat = str(reg.get("tipo") or reg.get("categoria") or "Sem categoria")
-        try:
-            tot[cat] += float(reg.get("valor", 0) or 0)
-        except Exception:
-            continue
+def _total_por_categoria(despesas: AggregateCube | ExpenseTable | Iterable[dict], mes_ano: str | None = None) -> dict[str, float]:
+    tot: dict[str, float] = defaultdict(float)
+    for nome, valor in _como_tabela(despesas).by_category(mes_ano).items():
+        tot[_rotulo_categoria(nome)] += valor
     return dict(tot)
 
 
-def _total_por_fornecedor(despesas: Iterable[dict]) -> dict[str, float]:
-    """Soma valores por fornecedor (normalizado)."""
-    tot = defaultdict(float)
-    try:
-        if not despesas:
-            return {}
-        for reg in despesas:
-            if not isinstance(reg, dict):
-                continue
-            nome = str(reg.get("fornecedor") or "").strip().upper()
-            if not nome:
-                continue
-            try:
-                tot[nome] += float(reg.get("valor", 0) or 0)
-            except Exception:
-                continue
-    except Exception:
-        return {}
-    return dict(sorted(tot.items(), key=lambda x: x[1], reverse=True))
+def _canonicos_em_memoria(despesas: AggregateCube | ExpenseTable) -> dict[str, str]:
+    """Variante -> id canônico agrupado a partir dos dados já carregados (sem ler arquivos)."""
+    return CanonicalSuppliers.build(despesas.supplier_counts()).ids
 
 
-def _kpis(despesas: list[dict]) -> dict[str, str]:
-    agrupado = _agrupa_por_mes(despesas)
-    meses = list(agrupado.keys())
-    atual_chave = meses[-1] if meses else None
-    anterior_chave = meses[-2] if len(meses) > 1 else None
+def _ler_canonicos(caminhos: Iterable[Path]) -> dict[str, str]:
+    """Variante -> id canônico dos fornecedores das empresas (job refeito se os nomes mudaram)."""
+    canonicos: dict[str, str] = {}
+    for caminho in caminhos:
+        try:
+            canonicos.update(refresh_canonical_suppliers(caminho).ids)
+        except Exception:
+            continue
+    return canonicos
+
+
+def _maior_fornecedor(
+    despesas: AggregateCube | ExpenseTable,
+    mes_ano: str | None,
+    canonicos: dict[str, str] | None = None,
+) -> str:
+    """Fornecedor de maior valor no mês, somando as grafias do mesmo id canônico."""
+    maiores = despesas.top_suppliers(1, month=mes_ano, canonical=canonicos)
+    return maiores[0][0] if maiores else "N/A"
+
+
+@dataclass
+class _DadosDashboard:
+    """Agregados do painel, calculados fora da thread do Tk."""
+
+    despesas: AggregateCube | ExpenseTable
+    meses: list[str]
+    agrupado: OrderedDict[str, float]
+    idx: int
+    color_map_global: dict[str, str]
+    palette: list[str]
+    categorias: dict[str, float] = field(default_factory=dict)
+    color_map: dict[str, str] = field(default_factory=dict)
+    # Variante -> id canônico do fornecedor (job de canonicalização)
+    canonicos: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def preparar(
+        cls,
+        despesas: AggregateCube | ExpenseTable,
+        colors: dict[str, str],
+        canonicos: dict[str, str] | None = None,
+    ) -> "_DadosDashboard":
+        agrupado = _agrupa_por_mes(despesas)
+        meses = list(agrupado.keys())
+        idx = len(meses) - 1 if meses else 0
+        # mapa de cores para todas as categorias do dataset
+        palette = colors["pie"]
+        todas_categorias = sorted({_rotulo_categoria(nome) for nome in despesas.categories()})
+        color_map_global = {nome: palette[i % len(palette)] for i, nome in enumerate(todas_categorias)}
+        dados = cls(despesas, meses, agrupado, idx, color_map_global, palette, canonicos=canonicos or {})
+        categorias = _total_por_categoria(despesas, meses[idx]) if meses else {}
+        dados.categorias = categorias or _total_por_categoria(despesas, None)
+        dados.color_map = dados.cores_para(dados.categorias)
+        return dados
 
-    atual_total = agrupado.get(atual_chave, 0.0)
-    anterior_total = agrupado.get(anterior_chave, 0.0)
-    variacao = 0.0
-    if anterior_total:
-        variacao = ((atual_total - anterior_total) / anterior_total) * 100
+    def cores_para(self, categorias: dict[str, float]) -> dict[str, str]:
+        # baseado no mapa global para a mesma categoria manter a cor entre meses
+        return {
+            nome: self.color_map_global.get(nome, self.palette[i % len(self.palette)])
+            for i, nome in enumerate(categorias.keys())
+        }
 
-    cat_mes = _total_por_categoria(despesas, atual_chave) if atual_chave else {}
-    maior_categoria = max(cat_mes.items(), key=lambda x: x[1])[0] if cat_mes else "N/A"
 
-    def fmt_moeda(v: float) -> str:
-        return f"R$ {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+def _kpis_do_mes(dados: _DadosDashboard | None, idx: int) -> dict[str, str | bool]:
+    """KPIs do mês ``idx`` de ``dados.meses`` comparado ao anterior."""
+    if not dados or not dados.meses:
+        return {
+            "mes_atual_label": "—",
+            "mes_anterior_label": "—",
+            "total_mes_atual": _fmt_brl(0.0),
+            "total_mes_anterior": _fmt_brl(0.0),
+            "variacao": "+0.0%",
+            "variacao_up": True,
+            "maior_categoria": "—",
+            "maior_fornecedor": "—",
+        }
+    atual_key = dados.meses[idx]
+    prev_key = dados.meses[idx - 1] if idx - 1 >= 0 else None
+    atual_total = dados.agrupado.get(atual_key, 0.0)
+    prev_total = dados.agrupado.get(prev_key, 0.0) if prev_key else 0.0
+    variacao = 0.0
+    if prev_total:
+        variacao = ((atual_total - prev_total) / prev_total) * 100
+    cats_mes = _total_por_categoria(dados.despesas, atual_key)
+    maior_cat = max(cats_mes.items(), key=lambda x: x[1])[0] if cats_mes else "N/A"
 
     def fmt_mes(chave: str | None) -> str:
         if not chave:
@@ -167,13 +212,14 @@ def _kpis(despesas: list[dict]) -> dict[str, str]:
         return dt.strftime("%b/%Y")
 
     return {
-        "mes_atual_label": fmt_mes(atual_chave),
-        "mes_anterior_label": fmt_mes(anterior_chave),
-        "total_mes_atual": fmt_moeda(atual_total),
-        "total_mes_anterior": fmt_moeda(anterior_total),
+        "mes_atual_label": fmt_mes(atual_key),
+        "mes_anterior_label": fmt_mes(prev_key),
+        "total_mes_atual": _fmt_brl(atual_total),
+        "total_mes_anterior": _fmt_brl(prev_total),
         "variacao": f"{variacao:+.1f}%",
         "variacao_up": variacao >= 0,
-        "maior_categoria": maior_categoria,
+        "maior_categoria": maior_cat,
+        "maior_fornecedor": _maior_fornecedor(dados.despesas, atual_key, dados.canonicos),
     }
 
 
@@ -184,6 +230,12 @@ FONT_KPI_TITLE = ("Segoe UI Semibold", 13)
 FONT_KPI_VALUE = ("Segoe UI Semibold", 18)
 FONT_KPI_LABEL = ("Segoe UI", 10)
 
+# Texto dos KPIs enquanto os agregados são calculados
+_PLACEHOLDER = "…"
+
+# Opção do seletor da visão consolidada que soma todas as empresas
+ROTULO_GRUPO = "Todas as empresas"
+
 
 def _center(win: ctk.CTkToplevel | ctk.CTk, w: int = 1150, h: int = 760) -> None:
     try:
@@ -250,169 +302,305 @@ def _estilizar_axes(ax, colors: dict[str, str]):
         spine.set_color(colors["divider"])
 
 
-def _plot_barras(ax, dados: OrderedDict[str, float], colors: dict[str, str]):
-    if not dados:
-        ax.text(0.5, 0.5, "Sem dados", ha="center", va="center", color=colors["text_secondary"])
-        ax.axis("off")
-        return
-    labels = [datetime.strptime(k, "%Y-%m").strftime("%b/%y") for k in dados.keys()]
-    valores = list(dados.values())
-    bars = ax.bar(labels, valores, color=colors["bar"], edgecolor=colors["divider"], linewidth=0.6, width=0.6)
-    ax.bar_label(
-        bars,
-        labels=[f"R$ {v:,.0f}".replace(",", "X").replace(".", ",").replace("X", ".") for v in valores],
-        fontsize=8,
-        padding=2,
-        color=colors["text_secondary"],
-        rotation=90,
-    )
-    ax.set_title("Gastos por mês", color=colors["text_primary"], pad=12, fontsize=12, fontweight="bold")
-    _estilizar_axes(ax, colors)
-
-
-def _plot_pizza(ax, categorias: dict[str, float], colors: dict[str, str], color_map: dict[str, str] | None = None):
-    if not categorias:
-        ax.text(0.5, 0.5, "Sem dados", ha="center", va="center", color=colors["text_secondary"])
-        ax.axis("off")
-        return []
-    labels = list(categorias.keys())
-    valores = list(categorias.values())
-    total = sum(valores) or 1.0
-    # Explode zero para não destacar fatias pequenas
-    explode = [0.0 for _ in valores]
-    palette = colors.get("pie")
-    if not palette:
-        palette = [
-            "#7B61FF", "#4C7DFF", "#7DD3FC", "#F59E0B", "#EF4444",
-            "#10B981", "#6366F1", "#EC4899", "#22D3EE", "#F97316",
+def _indice_fatia(limites: list[float], x: float | None, y: float | None, raio_interno: float, raio: float = 1.0) -> int | None:
+    """Fatia sob o ponto (coordenadas de dados) por bisect no ângulo do ponteiro.
+
+    ``limites`` são os ângulos finais acumulados de cada fatia, em graus a
+    partir de 90° no sentido anti-horário (o ``startangle=90`` da rosca).
+    """
+    if x is None or y is None or not limites:
+        return None
+    if not raio_interno <= math.hypot(x, y) <= raio:
+        return None
+    angulo = (math.degrees(math.atan2(y, x)) - 90.0) % 360.0
+    # bisect_right pula fatias de valor zero (limites repetidos)
+    idx = bisect_right(limites, angulo)
+    return idx if idx < len(limites) else None
+
+
+class _GraficoPizza:
+    """Rosca de categorias com figura, eixos e artistas criados uma única vez.
+
+    Trocar de mês ou de filtro só ajusta os ângulos e cores das fatias já
+    existentes (novas só surgem quando há mais categorias que antes; as que
+    sobram ficam ocultas): nada de recriar ``Figure`` ou o widget do canvas.
+    Fatias, total e dica são artistas animados redesenhados por blitting sobre
+    o fundo (título, eixos) guardado no último desenho completo. Um segundo
+    fundo, já com as fatias, deixa o hover só com a dica para desenhar; a
+    fatia sob o ponteiro sai de um bisect nos limites angulares.
+
+    A figura nasce sem canvas (pode ser montada e rasterizada com Agg numa
+    thread de trabalho); ``attach`` a liga ao Tk na thread da interface.
+    """
+
+    LARGURA_ANEL = 0.35
+    TAMANHO = (6.2, 4.8)
+
+    def __init__(self, colors: dict[str, str], figsize: tuple[float, float] = TAMANHO) -> None:
+        self.colors = colors
+        self.figure = Figure(figsize=figsize, dpi=100, facecolor=colors["surface"])
+        self.ax = ax = self.figure.add_subplot(1, 1, 1, facecolor=colors["panel"])
+        # Mesmo enquadramento que ax.pie aplicaria
+        ax.set_aspect("equal")
+        ax.set_xlim(-1.25, 1.25)
+        ax.set_ylim(-1.25, 1.25)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        _estilizar_axes(ax, colors)
+        ax.set_frame_on(False)
+        ax.set_title("Distribuição por categoria", color=colors["text_primary"], pad=10, fontsize=12, fontweight="bold")
+
+        self._fatias: list[Wedge] = []
+        # Ângulo final acumulado de cada fatia exibida (ver _indice_fatia)
+        self._limites: list[float] = []
+        self._sob_ponteiro: int | None = None
+        self._rotulos: list[str] = []
+        self._valores: list[float] = []
+        self._soma = 0.0
+        self._texto_total = ax.text(0, 0, "", ha="center", va="center", color=colors["text_primary"], fontsize=11, fontweight="bold")
+        self._texto_vazio = ax.text(
+            0.5, 0.5, "Sem dados", ha="center", va="center", color=colors["text_secondary"], transform=ax.transAxes, visible=False
+        )
+        self._annot = ax.annotate(
+            "",
+            xy=(0, 0),
+            xytext=(12, 12),
+            textcoords="offset points",
+            ha="left",
+            va="bottom",
+            fontsize=9,
+            color=colors["text_primary"],
+            bbox=dict(boxstyle="round,pad=0.35", fc=colors["panel"], ec=colors["divider"], lw=1),
+        )
+        self._annot.set_visible(False)
+        for artista in (self._texto_total, self._texto_vazio, self._annot):
+            artista.set_animated(True)
+        self.figure.tight_layout(pad=1.0)
+
+        self._fundo = None
+        self._fundo_fatias = None
+        # Área da tela (pixels) ocupada pela dica no último blit
+        self._area_dica: Bbox | None = None
+        self.canvas: FigureCanvasTkAgg | None = None
+
+    def attach(self, master) -> None:
+        """Liga a figura a um canvas Tk (só na thread da interface)."""
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=30, pady=(10, 12))
+        self.canvas.mpl_connect("draw_event", self._ao_desenhar)
+        self.canvas.mpl_connect("motion_notify_event", self._hover)
+
+    def rasterize(self):
+        """Desenho completo fora da tela (Agg), como imagem PIL; seguro fora da thread do Tk."""
+        from PIL import Image
+
+        canvas = FigureCanvasAgg(self.figure)
+        canvas.draw()
+        # O desenho normal pula os artistas animados
+        self._desenhar_animados()
+        largura, altura = canvas.get_width_height()
+        return Image.frombuffer("RGBA", (largura, altura), bytes(canvas.buffer_rgba()), "raw", "RGBA", 0, 1)
+
+    def _desenhar_animados(self, dica: bool = True) -> None:
+        for artista in (*self._fatias, self._texto_total, self._texto_vazio):
+            if artista.get_visible():
+                self.ax.draw_artist(artista)
+        if dica:
+            self._desenhar_dica()
+
+    def _desenhar_dica(self) -> None:
+        if self._annot.get_visible():
+            self.ax.draw_artist(self._annot)
+
+    def _extensao_dica(self) -> Bbox | None:
+        """Retângulo em pixels da dica (texto e caixa), com folga para a borda."""
+        if not self._annot.get_visible():
+            return None
+        renderer = self.canvas.get_renderer()
+        caixa = self._annot.get_bbox_patch()
+        partes = [self._annot.get_window_extent(renderer)]
+        if caixa is not None:
+            partes.append(caixa.get_window_extent(renderer))
+        return Bbox.union(partes).padded(3)
+
+    def _ao_desenhar(self, _event) -> None:
+        # Desenho completo (abertura, redimensionamento): guarda o fundo sem os
+        # animados e o fundo com as fatias, base do hover
+        self._fundo = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._desenhar_animados(dica=False)
+        self._fundo_fatias = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._desenhar_dica()
+        self._area_dica = self._extensao_dica()
+
+    def _redesenhar(self) -> None:
+        if self.canvas is None:
+            return
+        if self._fundo is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._fundo)
+        self._desenhar_animados(dica=False)
+        self._fundo_fatias = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._desenhar_dica()
+        self._area_dica = self._extensao_dica()
+        self.canvas.blit(self.figure.bbox)
+
+    def _redesenhar_dica(self) -> None:
+        # Hover: as fatias não mudaram, basta repor o fundo com elas e a dica e
+        # enviar à tela só a área da dica anterior (a apagar) e da nova
+        if self.canvas is None or self._fundo_fatias is None:
+            self._redesenhar()
+            return
+        self.canvas.restore_region(self._fundo_fatias)
+        self._desenhar_dica()
+        anterior, self._area_dica = self._area_dica, self._extensao_dica()
+        areas = [area for area in (anterior, self._area_dica) if area is not None]
+        if areas:
+            self.canvas.blit(Bbox.union(areas))
+
+    def update(self, categorias: dict[str, float], color_map: dict[str, str] | None = None) -> list[tuple[str, float, float, str]]:
+        """Redesenha com os valores de ``categorias``; devolve os itens da legenda."""
+        palette = self.colors.get("pie") or PIE_PALETTE
+        color_map = color_map or {}
+        self._rotulos = list(categorias.keys())
+        self._valores = [max(float(valor), 0.0) for valor in categorias.values()]
+        self._soma = sum(self._valores)
+        cores = [color_map.get(rotulo, palette[idx % len(palette)]) for idx, rotulo in enumerate(self._rotulos)]
+        exibir = self._soma > 0
+
+        while len(self._fatias) < len(self._valores):
+            fatia = Wedge((0, 0), 1, 90, 90, width=self.LARGURA_ANEL, edgecolor=self.colors["surface"], linewidth=1, animated=True)
+            self.ax.add_patch(fatia)
+            self._fatias.append(fatia)
+
+        # Sentido anti-horário a partir de 90°, como ax.pie(startangle=90)
+        acumulado = 0.0
+        self._limites = []
+        self._sob_ponteiro = None
+        for idx, fatia in enumerate(self._fatias):
+            if not exibir or idx >= len(self._valores):
+                fatia.set_visible(False)
+                continue
+            inicio = 90 + 360 * acumulado / self._soma
+            acumulado += self._valores[idx]
+            fatia.set_theta1(inicio)
+            fatia.set_theta2(90 + 360 * acumulado / self._soma)
+            self._limites.append(360 * acumulado / self._soma)
+            fatia.set_facecolor(cores[idx])
+            fatia.set_visible(True)
+
+        self._texto_total.set_text(f"{_fmt_brl(self._soma)}\nTotal")
+        self._texto_total.set_visible(exibir)
+        self._texto_vazio.set_visible(not exibir)
+        self._annot.set_visible(False)
+        self._redesenhar()
+
+        if not exibir:
+            return []
+        return [
+            (rotulo, valor, valor / self._soma * 100, cor)
+            for rotulo, valor, cor in zip(self._rotulos, self._valores, cores)
         ]
-    if color_map:
-        palette = [color_map.get(lbl, palette[idx % len(palette)]) for idx, lbl in enumerate(labels)]
-    pie_result = ax.pie(
-        valores,
-        labels=None,
-        autopct=None,
-        pctdistance=0.7,
-        startangle=90,
-        explode=explode,
-        colors=palette[: len(valores)],
-        textprops={"color": colors["text_primary"], "fontsize": 9},
-        wedgeprops={"width": 0.35, "edgecolor": colors["surface"], "linewidth": 1},
-    )
-    wedges = pie_result[0]
-    legend_items = []
-    effective_colors = palette[: len(valores)]
-    for lbl, val, cor in zip(labels, valores, effective_colors):
-        pct = (val / total) * 100 if total else 0
-        legend_items.append((lbl, val, pct, cor))
-
-    # hover: exibe tooltip com valor e %
-    annot = ax.annotate(
-        "",
-        xy=(0, 0),
-        xytext=(12, 12),
-        textcoords="offset points",
-        ha="left",
-        va="bottom",
-        fontsize=9,
-        color=colors["text_primary"],
-        bbox=dict(boxstyle="round,pad=0.35", fc=colors["panel"], ec=colors["divider"], lw=1),
-    )
-    annot.set_visible(False)
 
-    def _hover(event):
-        vis = annot.get_visible()
-        if event.inaxes != ax:
-            if vis:
+    def _hover(self, event) -> None:
+        annot = self._annot
+        idx = None
+        if event.inaxes == self.ax:
+            idx = _indice_fatia(self._limites, event.xdata, event.ydata, 1 - self.LARGURA_ANEL)
+        if idx is None:
+            if annot.get_visible():
                 annot.set_visible(False)
-                ax.figure.canvas.draw_idle()
+                self._sob_ponteiro = None
+                self._redesenhar_dica()
             return
-        for wedge, lbl, val in zip(wedges, labels, valores):
-            contains, _ = wedge.contains(event)
-            if contains:
-                pct = (val / total) * 100 if total else 0
-                annot.xy = (event.xdata, event.ydata)
-                annot.set_text(f"{lbl}\n{_fmt_brl(val)} ({pct:.1f}%)")
-                annot.get_bbox_patch().set_facecolor(colors["panel"])
-                annot.get_bbox_patch().set_edgecolor(colors["divider"])
-                annot.set_visible(True)
-                ax.figure.canvas.draw_idle()
-                return
-        if vis:
-            annot.set_visible(False)
-            ax.figure.canvas.draw_idle()
-
-    ax.figure.canvas.mpl_connect("motion_notify_event", _hover)
-
-    ax.text(0, 0, f"{_fmt_brl(total)}\nTotal", ha="center", va="center", color=colors["text_primary"], fontsize=11, fontweight="bold")
-    ax.set_title("Distribuição por categoria", color=colors["text_primary"], pad=10, fontsize=12, fontweight="bold")
-    _estilizar_axes(ax, colors)
-    return legend_items
-
-
-def _plot_top_fornecedores(ax, dados: dict[str, float], colors: dict[str, str], limite: int = 7):
-    """Exibe barras horizontais dos maiores fornecedores por valor."""
-    if not dados:
-        ax.text(0.5, 0.5, "Sem dados", ha="center", va="center", color=colors["text_secondary"])
-        ax.axis("off")
-        return
-    items = sorted(dados.items(), key=lambda x: x[1], reverse=True)[:limite]
-    labels = [k for k, _ in items][::-1]
-    valores = [v for _, v in items][::-1]
-    bars = ax.barh(range(len(labels)), valores, color=colors["bar"], edgecolor=colors["divider"], height=0.6)
-    ax.set_yticks(range(len(labels)))
-    ax.set_yticklabels(labels, color=colors["text_secondary"], fontsize=9)
-    for bar, val in zip(bars, valores, strict=False):
-        ax.text(
-            bar.get_width() + max(valores) * 0.02,
-            bar.get_y() + bar.get_height() / 2,
-            _fmt_brl(val),
-            va="center",
-            color=colors["text_primary"],
-            fontsize=9,
-        )
-    ax.invert_yaxis()
-    ax.set_title("Top fornecedores por valor", color=colors["text_primary"], pad=10, fontsize=12, fontweight="bold")
-    ax.grid(axis="x", linestyle="--", alpha=0.3, color=colors["divider"])
-    ax.set_facecolor(colors["panel"])
-    ax.tick_params(colors=colors["text_secondary"], labelsize=9)
-    return []
-
-
-def _plot_linha(ax, dados: OrderedDict[str, float], colors: dict[str, str]):
-    if not dados:
-        ax.text(0.5, 0.5, "Sem dados", ha="center", va="center", color=colors["text_secondary"])
-        ax.axis("off")
-        return
-    labels = [datetime.strptime(k, "%Y-%m").strftime("%b/%y") for k in dados.keys()]
-    valores = list(dados.values())
-    acumulado = []
-    soma = 0.0
-    for v in valores:
-        soma += v
-        acumulado.append(soma)
-    ax.plot(labels, acumulado, marker="o", color=colors["line"], linewidth=2.2, markersize=6)
-    ax.fill_between(range(len(acumulado)), acumulado, color=colors["accent_muted"], alpha=0.18)
-    ax.set_title("Evolução acumulada", color=colors["text_primary"], pad=12, fontsize=12, fontweight="bold")
-    _estilizar_axes(ax, colors)
-
-
-def _criar_figuras(frame_plots, dados_mes, categorias_mes, linha_total, colors):
-    # Mantido por compatibilidade, embora não seja chamado atualmente
-    fig = Figure(figsize=(8, 4), dpi=100, facecolor=colors["surface"])
-    ax = fig.add_subplot(1, 1, 1, facecolor=colors["panel"])
-    _plot_pizza(ax, categorias_mes, colors)
-    canvas = FigureCanvasTkAgg(fig, master=frame_plots)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill="both", expand=True)
-    return canvas
+        if idx != self._sob_ponteiro:
+            # Texto só muda ao trocar de fatia; no resto do movimento a dica só acompanha o ponteiro
+            valor = self._valores[idx]
+            pct = (valor / self._soma) * 100 if self._soma else 0
+            annot.set_text(f"{self._rotulos[idx]}\n{_fmt_brl(valor)} ({pct:.1f}%)")
+            self._sob_ponteiro = idx
+        annot.xy = (event.xdata, event.ydata)
+        annot.set_visible(True)
+        self._redesenhar_dica()
+
+
+class _LegendaCategorias:
+    """Legenda da rosca com linhas reaproveitadas entre atualizações."""
+
+    def __init__(self, frame, colors: dict[str, str]) -> None:
+        self.frame = frame
+        self.colors = colors
+        self._linhas: list[tuple] = []
+        self._exibidas = 0
+        ctk.CTkLabel(
+            frame,
+            text="Categorias",
+            font=("Segoe UI Semibold", 13),
+            text_color=colors["text_primary"],
+        ).pack(anchor="w", padx=12, pady=(10, 8))
+
+    def _nova_linha(self) -> tuple:
+        colors = self.colors
+        row = ctk.CTkFrame(self.frame, fg_color="transparent")
+        marcador = ctk.CTkLabel(row, text="●", font=ctk.CTkFont(size=16))
+        marcador.pack(side="left", padx=(0, 8))
+        text_container = ctk.CTkFrame(row, fg_color="transparent")
+        text_container.pack(side="left", fill="x", expand=True)
+        nome = ctk.CTkLabel(text_container, text="", font=("Segoe UI Semibold", 12), text_color=colors["text_primary"], anchor="w")
+        nome.pack(fill="x")
+        valor = ctk.CTkLabel(text_container, text="", font=("Segoe UI", 11), text_color=colors["text_secondary"], anchor="w")
+        valor.pack(fill="x")
+        pct = ctk.CTkLabel(row, text="", font=("Segoe UI", 11), text_color=colors["text_secondary"])
+        pct.pack(side="right", padx=(6, 0))
+        return row, marcador, nome, valor, pct
+
+    def update(self, items: list[tuple[str, float, float, str]] | None) -> None:
+        items = sorted(items or [], key=lambda x: x[1], reverse=True)
+        while len(self._linhas) < len(items):
+            self._linhas.append(self._nova_linha())
+        for idx, (nome, val, pct, cor) in enumerate(items):
+            row, marcador, lbl_nome, lbl_valor, lbl_pct = self._linhas[idx]
+            marcador.configure(text_color=cor)
+            lbl_nome.configure(text=nome if len(nome) <= 28 else nome[:25] + "...")
+            lbl_valor.configure(text=_fmt_brl(val))
+            lbl_pct.configure(text=f"{pct:.1f}%")
+        # Ocultas sempre formam um sufixo: reempacotar em ordem preserva a sequência
+        for row, *_ in self._linhas[len(items) : self._exibidas]:
+            row.pack_forget()
+        for row, *_ in self._linhas[self._exibidas : len(items)]:
+            row.pack(fill="x", padx=10, pady=4)
+        self._exibidas = len(items)
 
 
 # ---------------------- Dashboard ---------------------- #
-def abrir_dashboard(parent, empresa_path: Path):
-    """Abre o dashboard executivo para a empresa indicada."""
-    despesas = _ler_despesas(empresa_path) or []
+def abrir_dashboard(
+    parent,
+    empresa_path: Path,
+    dados: AggregateCube | ExpenseTable | Iterable[dict] | None = None,
+    *,
+    empresas: dict[str, Path] | None = None,
+):
+    """Abre o dashboard executivo para a empresa indicada.
+
+    ``dados`` é o conjunto já mantido pela aplicação (a ``ExpenseTable`` em
+    memória): o painel consulta direto dele, sem nova leitura do arquivo, e
+    mostra o mesmo estado da tela. Como a aplicação continua alterando esse
+    conjunto, a thread de trabalho recebe uma cópia tirada aqui, na thread do
+    Tk. Sem ``dados`` usa o cubo de totais salvo.
+
+    Com ``empresas`` (nome -> arquivo) o painel é o consolidado do grupo: os
+    cubos das empresas são somados (``app.data.consolidated``) e um seletor
+    detalha cada empresa.
+
+    A janela abre na hora com placeholders; agregados e a primeira imagem da
+    rosca (Agg, fora da tela) são preparados numa thread e entram quando
+    ficam prontos.
+    """
     colors = _palette()
+    if isinstance(dados, ExpenseTable):
+        dados = dados.snapshot()
+    elif dados is not None and not isinstance(dados, AggregateCube):
+        dados = [dict(registro) for registro in dados]
 
     janela = ctk.CTkToplevel(parent)
     janela.title("Central de Controle - Dashboard")
@@ -432,7 +620,7 @@ def abrir_dashboard(parent, empresa_path: Path):
     header.pack(fill="x", padx=16, pady=(16, 12))
     ctk.CTkLabel(
         header,
-        text=f"Centro de controle de gastos — {Path(empresa_path).stem}",
+        text=f"Centro de controle de gastos — {'Grupo (consolidado)' if empresas else Path(empresa_path).stem}",
         font=FONT_TITLE,
         text_color=colors["text_primary"],
     ).pack(anchor="w")
@@ -447,104 +635,37 @@ def abrir_dashboard(parent, empresa_path: Path):
     scroll = ctk.CTkScrollableFrame(janela, fg_color="transparent")
     scroll.pack(fill="both", expand=True, padx=0, pady=0)
 
-    # meses disponíveis e estado atual
-    meses_disponiveis = list(_agrupa_por_mes(despesas).keys())
-    if not meses_disponiveis:
-        meses_disponiveis = []
-    current_idx = len(meses_disponiveis) - 1 if meses_disponiveis else 0
-
-    # mapa de cores para todas as categorias do dataset
-    todas_categorias = sorted({str(reg.get("tipo") or reg.get("categoria") or "Sem categoria") for reg in despesas})
-    palette_base = colors["pie"]
-    color_map_global = {nome: palette_base[i % len(palette_base)] for i, nome in enumerate(todas_categorias)}
-
-    agrupado = _agrupa_por_mes(despesas)
-
-    def calcular_kpi_idx(idx: int) -> dict[str, str | bool]:
-        if not meses_disponiveis:
-            return {
-                "mes_atual_label": "—",
-                "mes_anterior_label": "—",
-                "total_mes_atual": _fmt_brl(0.0),
-                "total_mes_anterior": _fmt_brl(0.0),
-                "variacao": "+0.0%",
-                "variacao_up": True,
-                "maior_categoria": "—",
-            }
-        atual_key = meses_disponiveis[idx]
-        prev_key = meses_disponiveis[idx - 1] if idx - 1 >= 0 else None
-        atual_total = agrupado.get(atual_key, 0.0)
-        prev_total = agrupado.get(prev_key, 0.0) if prev_key else 0.0
-        variacao = 0.0
-        if prev_total:
-            variacao = ((atual_total - prev_total) / prev_total) * 100
-        cats_mes = _total_por_categoria(despesas, atual_key)
-        maior_cat = max(cats_mes.items(), key=lambda x: x[1])[0] if cats_mes else "N/A"
-
-        def fmt_mes(chave: str | None) -> str:
-            if not chave:
-                return "—"
-            dt = datetime.strptime(chave, "%Y-%m")
-            return dt.strftime("%b/%Y")
+    # Preenchido quando a thread entrega os agregados
+    estado: _DadosDashboard | None = None
+    grafico_pizza: _GraficoPizza | None = None
+    imagem_pizza: ctk.CTkLabel | None = None
+    visoes: dict[str, AggregateCube] = {}
+    selected_categories: set[str] = set()
 
-        return {
-            "mes_atual_label": fmt_mes(atual_key),
-            "mes_anterior_label": fmt_mes(prev_key),
-            "total_mes_atual": _fmt_brl(atual_total),
-            "total_mes_anterior": _fmt_brl(prev_total),
-            "variacao": f"{variacao:+.1f}%",
-            "variacao_up": variacao >= 0,
-            "maior_categoria": maior_cat,
-        }
-
-    if meses_disponiveis:
-        mes_atual = meses_disponiveis[current_idx]
-        categorias_orig: dict[str, float] = _total_por_categoria(despesas, mes_atual)
-        if not categorias_orig:
-            categorias_orig = _total_por_categoria(despesas, None)
-    else:
-        categorias_orig = _total_por_categoria(despesas, None)
-    color_map: dict[str, str] = {nome: color_map_global.get(nome, palette_base[i % len(palette_base)]) for i, nome in enumerate(categorias_orig.keys())}
-
-    # KPIs (grid 4 col)
-    kpi_data = calcular_kpi_idx(current_idx)
+    # KPIs (grid 5 col), com placeholders até os dados chegarem
     kpi_wrap = ctk.CTkFrame(scroll, fg_color="transparent")
     kpi_wrap.pack(fill="x", padx=12, pady=(0, 8))
 
-    for i in range(4):
+    for i in range(5):
         kpi_wrap.grid_columnconfigure(i, weight=1)
 
-    card1 = _criar_kpi(
-        kpi_wrap,
-        f"Total do mês — {kpi_data['mes_atual_label']}",
-        kpi_data["total_mes_atual"],
-    )
+    card1 = _criar_kpi(kpi_wrap, "Total do mês", _PLACEHOLDER)
     card1.grid(row=0, column=0, sticky="nsew", padx=4, pady=2, ipady=0)
 
-    card2 = _criar_kpi(
-        kpi_wrap,
-        f"Total do mês anterior — {kpi_data['mes_anterior_label']}",
-        kpi_data["total_mes_anterior"],
-    )
+    card2 = _criar_kpi(kpi_wrap, "Total do mês anterior", _PLACEHOLDER)
     card2.grid(row=0, column=1, sticky="nsew", padx=4, pady=2, ipady=0)
 
-    card3 = _criar_kpi(
-        kpi_wrap,
-        "Variação frente ao mês anterior",
-        kpi_data["variacao"],
-        cor_valor=colors["success"] if kpi_data["variacao_up"] else colors["danger"],
-    )
+    card3 = _criar_kpi(kpi_wrap, "Variação frente ao mês anterior", _PLACEHOLDER)
     card3.grid(row=0, column=2, sticky="nsew", padx=4, pady=2, ipady=0)
 
-    card4 = _criar_kpi(
-        kpi_wrap,
-        "Despesa com maior impacto no mês",
-        kpi_data["maior_categoria"],
-    )
+    card4 = _criar_kpi(kpi_wrap, "Despesa com maior impacto no mês", _PLACEHOLDER)
     card4.grid(row=0, column=3, sticky="nsew", padx=4, pady=2, ipady=0)
 
+    card5 = _criar_kpi(kpi_wrap, "Maior fornecedor no mês", _PLACEHOLDER)
+    card5.grid(row=0, column=4, sticky="nsew", padx=4, pady=2, ipady=0)
+
     def atualizar_kpis(idx: int) -> None:
-        kpi = calcular_kpi_idx(idx)
+        kpi = _kpis_do_mes(estado, idx)
         card1.lbl_titulo.configure(text=f"Total do mês — {kpi['mes_atual_label']}")
         card1.lbl_valor.configure(text=kpi["total_mes_atual"])
         card2.lbl_titulo.configure(text=f"Total do mês anterior — {kpi['mes_anterior_label']}")
@@ -554,58 +675,19 @@ def abrir_dashboard(parent, empresa_path: Path):
             text_color=colors["success"] if kpi.get("variacao_up") else colors["danger"],
         )
         card4.lbl_valor.configure(text=kpi["maior_categoria"])
-    atualizar_kpis(current_idx)
+        fornecedor = str(kpi["maior_fornecedor"])
+        card5.lbl_valor.configure(text=fornecedor if len(fornecedor) <= 28 else fornecedor[:25] + "...")
 
     # Plots (somente pizza com legenda)
     plots_frame = ctk.CTkFrame(scroll, fg_color=colors["surface"], corner_radius=18)
     plots_frame.pack(fill="both", expand=True, padx=14, pady=12)
 
     def mes_label(idx: int) -> str:
-        if not meses_disponiveis:
+        if not estado or not estado.meses:
             return "Sem dados"
-        dt = datetime.strptime(meses_disponiveis[idx], "%Y-%m")
+        dt = datetime.strptime(estado.meses[idx], "%Y-%m")
         return dt.strftime("%b/%Y")
 
-    agrupado = _agrupa_por_mes(despesas)
-
-    def calcular_kpi_idx(idx: int) -> dict[str, str | bool]:
-        if not meses_disponiveis:
-            return {
-                "mes_atual_label": "—",
-                "mes_anterior_label": "—",
-                "total_mes_atual": _fmt_brl(0.0),
-                "total_mes_anterior": _fmt_brl(0.0),
-                "variacao": "+0.0%",
-                "variacao_up": True,
-                "maior_categoria": "—",
-            }
-        atual_key = meses_disponiveis[idx]
-        prev_key = meses_disponiveis[idx - 1] if idx - 1 >= 0 else None
-        atual_total = agrupado.get(atual_key, 0.0)
-        prev_total = agrupado.get(prev_key, 0.0) if prev_key else 0.0
-        variacao = 0.0
-        if prev_total:
-            variacao = ((atual_total - prev_total) / prev_total) * 100
-        cats_mes = _total_por_categoria(despesas, atual_key)
-        maior_cat = max(cats_mes.items(), key=lambda x: x[1])[0] if cats_mes else "N/A"
-        def fmt_mes(chave: str | None) -> str:
-            if not chave:
-                return "—"
-            dt = datetime.strptime(chave, "%Y-%m")
-            return dt.strftime("%b/%Y")
-        return {
-            "mes_atual_label": fmt_mes(atual_key),
-            "mes_anterior_label": fmt_mes(prev_key),
-            "total_mes_atual": _fmt_brl(atual_total),
-            "total_mes_anterior": _fmt_brl(prev_total),
-            "variacao": f"{variacao:+.1f}%",
-            "variacao_up": variacao >= 0,
-            "maior_categoria": maior_cat,
-        }
-
-    # estado do filtro
-    selected_categories: set[str] = set(categorias_orig.keys())
-
     # header de filtros dentro do frame de gráficos
     toolbar = ctk.CTkFrame(plots_frame, fg_color="transparent")
     toolbar.pack(fill="x", padx=10, pady=(8, 0))
@@ -616,26 +698,25 @@ def abrir_dashboard(parent, empresa_path: Path):
 
     lbl_mes = ctk.CTkLabel(
         month_nav,
-        text=mes_label(current_idx),
+        text=_PLACEHOLDER,
         font=FONT_KPI_TITLE,
         text_color=colors["text_primary"],
     )
 
     def mudar_mes(delta: int):
-        nonlocal current_idx, categorias_orig, selected_categories
-        if not meses_disponiveis:
+        nonlocal selected_categories
+        if not estado or not estado.meses:
             return
-        new_idx = max(0, min(len(meses_disponiveis) - 1, current_idx + delta))
-        if new_idx == current_idx:
+        new_idx = max(0, min(len(estado.meses) - 1, estado.idx + delta))
+        if new_idx == estado.idx:
             return
-        current_idx = new_idx
-        lbl_mes.configure(text=mes_label(current_idx))
-        mes_atual = meses_disponiveis[current_idx]
-        categorias_orig = _total_por_categoria(despesas, mes_atual)
-        selected_categories = set(categorias_orig.keys())
-        atualizar_colors(categorias_orig)
-        render_pie(categorias_orig)
-        atualizar_kpis(current_idx)
+        estado.idx = new_idx
+        lbl_mes.configure(text=mes_label(estado.idx))
+        estado.categorias = _total_por_categoria(estado.despesas, estado.meses[estado.idx])
+        selected_categories = set(estado.categorias.keys())
+        estado.color_map = estado.cores_para(estado.categorias)
+        render_pie(estado.categorias)
+        atualizar_kpis(estado.idx)
 
     btn_prev = ctk.CTkButton(
         month_nav,
@@ -670,23 +751,32 @@ def abrir_dashboard(parent, empresa_path: Path):
         text_color=colors["text_primary"],
     ).pack(side="left", padx=6)
 
-    def render_pie(cats: dict[str, float]):
-        # destrói canvas anterior, se existir
-        nonlocal canvas_pie
-        if canvas_pie:
-            try:
-                canvas_pie.get_tk_widget().destroy()
-            except Exception:
-                pass
-        fig = Figure(figsize=(6.5, 5.2), dpi=100, facecolor=colors["surface"])
-        ax_pie = fig.add_subplot(1, 1, 1, facecolor=colors["panel"])
-        _plot_pizza(ax_pie, cats, colors, color_map)
-        fig.tight_layout(pad=1.2)
-        canvas_pie = FigureCanvasTkAgg(fig, master=plots_frame)
-        canvas_pie.draw()
-        canvas_pie.get_tk_widget().pack(fill="both", expand=True, padx=30, pady=(10, 12))
+    def trocar_empresa(nome: str) -> None:
+        # Detalhamento: cada parcial já é um cubo, então trocar é O(células)
+        nonlocal estado, selected_categories
+        if nome not in visoes:
+            return
+        estado = _DadosDashboard.preparar(visoes[nome], colors, estado.canonicos if estado else None)
+        selected_categories = set(estado.categorias.keys())
+        lbl_mes.configure(text=mes_label(estado.idx))
+        atualizar_kpis(estado.idx)
+        render_pie(estado.categorias)
+
+    combo_empresa: ReadOnlyComboBox | None = None
+    if empresas:
+        combo_empresa = ReadOnlyComboBox(
+            toolbar,
+            values=[ROTULO_GRUPO],
+            width=220,
+            command=trocar_empresa,
+        )
+        combo_empresa.set(ROTULO_GRUPO)
+        combo_empresa.pack(side="right", padx=(8, 0))
 
     def abrir_filtro_categorias():
+        if not estado:
+            return
+        categorias_orig = estado.categorias
         modal = ctk.CTkToplevel(janela)
         modal.title("Ajustar categorias")
         modal.configure(fg_color=colors["surface"])
@@ -788,70 +878,71 @@ def abrir_dashboard(parent, empresa_path: Path):
     legend_frame.grid(row=0, column=1, sticky="nsew", padx=(6, 10), pady=6)
     legend_frame.pack_propagate(True)
 
-    canvas_pie: FigureCanvasTkAgg | None = None
-
-    def atualizar_legenda(items: list[tuple[str, float, float, str]] | None):
-        items = items or []
-        for child in legend_frame.winfo_children():
-            try:
-                child.destroy()
-            except Exception:
-                pass
-        ctk.CTkLabel(
-            legend_frame,
-            text="Categorias",
-            font=("Segoe UI Semibold", 13),
-            text_color=colors["text_primary"],
-        ).pack(anchor="w", padx=12, pady=(10, 8))
-        for nome, val, pct, cor in sorted(items, key=lambda x: x[1], reverse=True):
-            row = ctk.CTkFrame(legend_frame, fg_color="transparent")
-            row.pack(fill="x", padx=10, pady=4)
-            ctk.CTkLabel(row, text="●", font=ctk.CTkFont(size=16), text_color=cor).pack(side="left", padx=(0, 8))
-            text_container = ctk.CTkFrame(row, fg_color="transparent")
-            text_container.pack(side="left", fill="x", expand=True)
-            ctk.CTkLabel(
-                text_container,
-                text=f"{nome if len(nome)<=28 else nome[:25]+'...'}",
-                font=("Segoe UI Semibold", 12),
-                text_color=colors["text_primary"],
-                anchor="w",
-            ).pack(fill="x")
-            ctk.CTkLabel(
-                text_container,
-                text=f"{_fmt_brl(val)}",
-                font=("Segoe UI", 11),
-                text_color=colors["text_secondary"],
-                anchor="w",
-            ).pack(fill="x")
-            ctk.CTkLabel(
-                row,
-                text=f"{pct:.1f}%",
-                font=("Segoe UI", 11),
-                text_color=colors["text_secondary"],
-            ).pack(side="right", padx=(6, 0))
-
-    def atualizar_colors(cats_ref: dict[str, float]):
-        nonlocal color_map
-        # recalcula color_map baseado no global para consistência
-        color_map = {nome: color_map_global.get(nome, palette_base[i % len(palette_base)]) for i, nome in enumerate(cats_ref.keys())}
+    legenda = _LegendaCategorias(legend_frame, colors)
+
+    # Esqueleto do gráfico no tamanho da figura, trocado pela imagem pronta
+    largura_fig, altura_fig = (int(lado * 100) for lado in _GraficoPizza.TAMANHO)
+    esqueleto = ctk.CTkFrame(chart_holder, fg_color=colors["panel"], corner_radius=12, width=largura_fig, height=altura_fig)
+    esqueleto.pack(padx=30, pady=(10, 12))
+    esqueleto.pack_propagate(False)
+    ctk.CTkLabel(esqueleto, text="Carregando gráfico…", font=FONT_KPI_LABEL, text_color=colors["text_secondary"]).pack(expand=True)
+
+    def ativar_grafico() -> _GraficoPizza | None:
+        # Imagem estática -> canvas interativo (hover, blitting) no primeiro uso
+        nonlocal imagem_pizza
+        if grafico_pizza is None:
+            return None
+        if grafico_pizza.canvas is None:
+            grafico_pizza.attach(chart_holder)
+            if imagem_pizza is not None:
+                imagem_pizza.destroy()
+                imagem_pizza = None
+        return grafico_pizza
 
     def render_pie(cats: dict[str, float]):
-        nonlocal canvas_pie
-        if canvas_pie:
-            try:
-                canvas_pie.get_tk_widget().destroy()
-            except Exception:
-                pass
-        fig = Figure(figsize=(6.2, 4.8), dpi=100, facecolor=colors["surface"])
-        ax_pie = fig.add_subplot(1, 1, 1, facecolor=colors["panel"])
-        legend_items = _plot_pizza(ax_pie, cats, colors, color_map) or []
-        fig.tight_layout(pad=1.0)
-        canvas_pie = FigureCanvasTkAgg(fig, master=chart_holder)
-        canvas_pie.draw()
-        canvas_pie.get_tk_widget().pack(fill="both", expand=True, padx=30, pady=(10, 12))
-        atualizar_legenda(legend_items)
-
-    render_pie(categorias_orig)
+        grafico = ativar_grafico()
+        if grafico is not None:
+            legenda.update(grafico.update(cats, estado.color_map if estado else None))
+
+    def calcular(cancelado) -> tuple | None:
+        # Thread de trabalho: nada de Tk aqui, só agregados e Agg fora da tela
+        partes: dict[str, AggregateCube] = {}
+        if empresas:
+            consolidado = consolidate(empresas)
+            partes = {ROTULO_GRUPO: consolidado.total, **consolidado.companies}
+            despesas = consolidado.total
+        else:
+            despesas = _ler_cubo(empresa_path) if dados is None else _como_tabela(dados)
+        if dados is None or empresas:
+            canonicos = _ler_canonicos(empresas.values() if empresas else [empresa_path])
+        else:
+            # Dados vindos da aplicação: nada de store (arquivos, caches) nesta thread
+            canonicos = _canonicos_em_memoria(despesas)
+        preparado = _DadosDashboard.preparar(despesas, colors, canonicos)
+        if cancelado():
+            return None
+        grafico = _GraficoPizza(colors)
+        itens = grafico.update(preparado.categorias, preparado.color_map)
+        return preparado, grafico, itens, grafico.rasterize(), partes
+
+    def entregar(resultado: tuple | None) -> None:
+        nonlocal estado, grafico_pizza, imagem_pizza, selected_categories
+        if resultado is None or not janela.winfo_exists():
+            return
+        estado, grafico_pizza, itens, imagem, partes = resultado
+        visoes.update(partes)
+        if combo_empresa is not None:
+            combo_empresa.configure(values=list(visoes))
+        selected_categories = set(estado.categorias.keys())
+        lbl_mes.configure(text=mes_label(estado.idx))
+        atualizar_kpis(estado.idx)
+        legenda.update(itens)
+        esqueleto.destroy()
+        imagem_pizza = ctk.CTkLabel(chart_holder, text="", image=ctk.CTkImage(light_image=imagem, size=imagem.size))
+        imagem_pizza.pack(padx=30, pady=(10, 12))
+        imagem_pizza.bind("<Enter>", lambda _event: ativar_grafico())
+
+    LatestOnlyWorker(janela).submit(calcular, entregar)
 
     return janela
 
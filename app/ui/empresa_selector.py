@@ -5,7 +5,6 @@ import logging
 from pathlib import Path
 
 import customtkinter as ctk
-from PIL import Image
 from tkinter import messagebox
 
 from app.ui.widgets import ReadOnlyComboBox
@@ -189,6 +188,8 @@ class EmpresaSelector(ctk.CTk):
         if not caminho.exists():
             return None
         try:
+            from PIL import Image
+
             imagem = Image.open(caminho)
         except Exception:
             return None
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import tkinter as tk
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence
+
 import customtkinter as ctk
 
 
@@ -31,3 +35,449 @@ class ReadOnlyComboBox(ctk.CTkComboBox):
             except Exception:
                 pass
 
+
+
+def update_listbox(listbox: tk.Listbox, atuais: list[str], novos: list[str]) -> list[str]:
+    """Atualiza o Listbox só a partir do primeiro item que mudou.
+
+    Mantém o trecho inicial em comum e troca o restante em uma única chamada
+    de ``delete``/``insert``. Devolve ``novos`` (a lista exibida agora).
+    """
+    comum = 0
+    limite = min(len(atuais), len(novos))
+    while comum < limite and atuais[comum] == novos[comum]:
+        comum += 1
+    if comum < len(atuais):
+        listbox.delete(comum, tk.END)
+    if comum < len(novos):
+        listbox.insert(tk.END, *novos[comum:])
+    return novos
+
+
+class _RolagemVirtual:
+    """Rolagem por deslocamento em pixels para listas de linhas de altura fixa.
+
+    A subclasse define ``_viewport`` (área visível), ``_scrollbar`` e
+    ``_render()``; aqui ficam barra de rolagem, roda do mouse e limites.
+    """
+
+    _row_height: int
+    _wheel_step: int
+    _items: Sequence[Any]
+    _topo: int
+
+    _SEQUENCIAS_RODA = ("<MouseWheel>", "<Button-4>", "<Button-5>")
+
+    def _ligar_rolagem(self) -> None:
+        # A roda chega ao widget com foco no Windows, então vai em ``bind_all``
+        # (como na CTkScrollableFrame), mas só enquanto o mouse está na área
+        # visível; sair ou destruir o widget remove exatamente essa ligação
+        self._ligacoes_roda: list[tuple[str, str]] = []
+        self._viewport.bind("<Enter>", self._on_enter, add="+")
+        self._viewport.bind("<Leave>", self._on_leave, add="+")
+        self._viewport.bind("<Destroy>", lambda _evt: self._desligar_roda(), add="+")
+
+    def _on_enter(self, _evento=None) -> None:
+        if not self._ligacoes_roda:
+            self._ligacoes_roda = [
+                (seq, self._viewport.bind_all(seq, self._on_wheel, add="+")) for seq in self._SEQUENCIAS_RODA
+            ]
+
+    def _on_leave(self, evento) -> None:
+        # Entrar numa linha filha também gera <Leave> na área visível
+        try:
+            if self._contem(self._viewport.winfo_containing(evento.x_root, evento.y_root)):
+                return
+        except Exception:
+            pass
+        self._desligar_roda()
+
+    def _desligar_roda(self) -> None:
+        # ``unbind_all`` apagaria também as ligações de outros widgets
+        for seq, funcid in self._ligacoes_roda:
+            try:
+                script = self._viewport.tk.call("bind", "all", seq)
+                restante = "\n".join(linha for linha in script.split("\n") if funcid not in linha)
+                self._viewport.tk.call("bind", "all", seq, restante)
+                self._viewport.deletecommand(funcid)
+            except tk.TclError:
+                pass
+        self._ligacoes_roda = []
+
+    def _altura_visivel(self) -> int:
+        return max(1, self._viewport.winfo_height())
+
+    def _max_topo(self) -> int:
+        return max(0, len(self._items) * self._row_height - self._altura_visivel())
+
+    def _limitar_topo(self) -> None:
+        self._topo = max(0, min(self._topo, self._max_topo()))
+
+    def _atualizar_scrollbar(self) -> None:
+        altura_total = len(self._items) * self._row_height
+        if not altura_total:
+            self._scrollbar.set(0.0, 1.0)
+            return
+        inicio = self._topo / altura_total
+        self._scrollbar.set(inicio, min(1.0, inicio + self._altura_visivel() / altura_total))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        # Com ``__len__`` definido, um widget vazio seria falso em ``if widget:``
+        return True
+
+    def _rolar(self, pixels: int) -> None:
+        self._topo += pixels
+        self._render()
+
+    def _on_scrollbar(self, acao: str, valor: str, unidade: str | None = None) -> None:
+        if acao == "moveto":
+            self._topo = int(float(valor) * len(self._items) * self._row_height)
+            self._render()
+        elif acao == "scroll":
+            passo = self._altura_visivel() if unidade == "pages" else self._row_height
+            self._rolar(int(valor) * passo)
+
+    def _contem(self, widget) -> bool:
+        if widget is None:
+            return False
+        caminho = str(widget)
+        raiz = str(self._viewport)
+        return caminho == raiz or caminho.startswith(raiz + ".")
+
+    def _on_wheel(self, evento) -> None:
+        try:
+            if not self._viewport.winfo_exists() or not self._contem(evento.widget):
+                return
+        except Exception:
+            return
+        if getattr(evento, "num", None) == 4:
+            direcao = -1
+        elif getattr(evento, "num", None) == 5:
+            direcao = 1
+        else:
+            direcao = -1 if evento.delta > 0 else 1
+        self._rolar(direcao * self._wheel_step)
+
+
+class VirtualList(_RolagemVirtual, ctk.CTkFrame):
+    """Lista rolável que só materializa as linhas visíveis.
+
+    Mantém um conjunto fixo de widgets de linha (do tamanho da área visível) e
+    apenas troca os dados ligados a cada um durante a rolagem, então o custo de
+    exibir ou refiltrar é proporcional às linhas na tela, não ao total.
+
+    ``create_row(parent)`` cria um widget de linha reaproveitável e
+    ``bind_row(widget, item, posicao)`` preenche esse widget com um item.
+    """
+
+    def __init__(
+        self,
+        master,
+        row_height: int,
+        create_row: Callable[[Any], Any],
+        bind_row: Callable[[Any, Any, int], None],
+        *,
+        empty_text: str = "",
+        empty_font=None,
+        empty_text_color=None,
+        wheel_step: int = 60,
+        **kwargs,
+    ):
+        super().__init__(master, **kwargs)
+        self._row_height = max(1, int(row_height))
+        self._create_row = create_row
+        self._bind_row = bind_row
+        self._wheel_step = wheel_step
+        self._items: Sequence[Any] = ()
+        self._topo = 0
+        self._pool: list[Any] = []
+        self._ligados: list[int | None] = []
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self._viewport.grid(row=0, column=0, sticky="nsew")
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+        self._vazio = ctk.CTkLabel(
+            self._viewport,
+            text=empty_text,
+            font=empty_font,
+            text_color=empty_text_color,
+        )
+
+        self._viewport.bind("<Configure>", lambda _evt: self._layout())
+        self._ligar_rolagem()
+
+    def set_items(self, items: Sequence[Any], *, keep_position: bool = True) -> None:
+        """Troca os itens exibidos (apenas as linhas visíveis são religadas)."""
+        self._items = items
+        if not keep_position:
+            self._topo = 0
+        self._ligados = [None] * len(self._pool)
+        self._layout()
+
+    def _layout(self) -> None:
+        necessarias = self._altura_visivel() // self._row_height + 2
+        while len(self._pool) < necessarias:
+            self._pool.append(self._create_row(self._viewport))
+            self._ligados.append(None)
+        self._render()
+
+    def _render(self) -> None:
+        total = len(self._items)
+        self._limitar_topo()
+        self._atualizar_scrollbar()
+        if not total:
+            for linha in self._pool:
+                linha.place_forget()
+            self._vazio.place(relx=0.5, y=20, anchor="n")
+            return
+        self._vazio.place_forget()
+        primeira, deslocamento = divmod(self._topo, self._row_height)
+        for slot, linha in enumerate(self._pool):
+            posicao = primeira + slot
+            if posicao >= total:
+                linha.place_forget()
+                self._ligados[slot] = None
+                continue
+            if self._ligados[slot] != posicao:
+                self._bind_row(linha, self._items[posicao], posicao)
+                self._ligados[slot] = posicao
+            linha.place(x=0, y=slot * self._row_height - deslocamento, relwidth=1.0, height=self._row_height)
+
+
+@dataclass
+class TableColumn:
+    """Coluna da ``VirtualTable``.
+
+    ``format(item)`` produz o texto da célula (padrão: ``item.get(key)``) e
+    ``sort_key(item)`` a chave usada ao ordenar pela coluna.
+    """
+
+    key: str
+    title: str
+    minwidth: int = 100
+    weight: int = 0
+    anchor: str = "w"
+    format: Callable[[Any], str] | None = None
+    sort_key: Callable[[Any], Any] | None = None
+
+    def texto(self, item: Any) -> str:
+        if self.format is not None:
+            return self.format(item)
+        valor = item.get(self.key)
+        return "--" if valor in (None, "") else str(valor)
+
+    def chave(self, item: Any) -> Any:
+        if self.sort_key is not None:
+            return self.sort_key(item)
+        return str(item.get(self.key) or "").casefold()
+
+
+class VirtualTable(_RolagemVirtual, ctk.CTkFrame):
+    """Tabela somente leitura desenhada em um único ``Canvas``.
+
+    Só existem itens de texto para as linhas visíveis; rolar apenas reposiciona
+    e troca o texto deles. Clicar no cabeçalho ordena pela coluna (clicar de
+    novo inverte). A contagem de linhas é ``len(tabela)``.
+    """
+
+    def __init__(
+        self,
+        master,
+        columns: Sequence[TableColumn],
+        *,
+        row_height: int = 34,
+        font=None,
+        header_font=None,
+        text_color: str = "#111827",
+        header_text_color: str = "#4B5563",
+        line_color: str = "#E5E7EB",
+        background: str = "#FFFFFF",
+        empty_text: str = "",
+        sort: tuple[str, bool] | None = None,
+        wheel_step: int = 60,
+        **kwargs,
+    ):
+        kwargs.setdefault("fg_color", background)
+        super().__init__(master, **kwargs)
+        self._colunas = list(columns)
+        self._row_height = max(1, int(row_height))
+        self._wheel_step = wheel_step
+        self._font = font
+        self._header_font = header_font or font
+        self._cores = {"texto": text_color, "cabecalho": header_text_color, "linha": line_color}
+        self._empty_text = empty_text
+        self._items: Sequence[Any] = ()
+        self._origem: Sequence[Any] = ()
+        self._ordem = sort
+        self._topo = 0
+        self._x: list[tuple[int, int]] = []
+        self._pool: list[tuple[list[int], int]] = []
+
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self._cabecalho = tk.Canvas(
+            self, height=self._row_height + 4, bg=background, highlightthickness=0, bd=0
+        )
+        self._cabecalho.grid(row=0, column=0, sticky="ew")
+        self._viewport = tk.Canvas(self, bg=background, highlightthickness=0, bd=0)
+        self._viewport.grid(row=1, column=0, sticky="nsew")
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=1, column=1, sticky="ns")
+        self._vazio = self._viewport.create_text(
+            0, 20, text="", anchor="n", font=font, fill=header_text_color, state="hidden"
+        )
+
+        self._viewport.bind("<Configure>", lambda _evt: self._layout())
+        self._cabecalho.bind("<Button-1>", self._on_header_click)
+        self._ligar_rolagem()
+
+    # ------------------------------------------------------------------ #
+    # API
+    # ------------------------------------------------------------------ #
+    def set_items(
+        self,
+        items: Sequence[Any],
+        *,
+        keep_position: bool = False,
+        sorted_by: tuple[str, bool] | None = None,
+    ) -> None:
+        """Troca os dados da tabela, mantendo a ordenação escolhida.
+
+        ``sorted_by`` informa que os itens já vêm nessa ordem; se for a ordem
+        atual da tabela, não há reordenação.
+        """
+        self._origem = items
+        self._items = items if sorted_by is not None and sorted_by == self._ordem else self._ordenar(items)
+        if not keep_position:
+            self._topo = 0
+        self._render()
+
+    @property
+    def items(self) -> Sequence[Any]:
+        """Itens na ordem exibida."""
+        return self._items
+
+    def sort_by(self, key: str, descending: bool | None = None) -> None:
+        """Ordena pela coluna ``key``; sem ``descending`` alterna a direção."""
+        if descending is None:
+            descending = not self._ordem[1] if self._ordem and self._ordem[0] == key else False
+        self._ordem = (key, descending)
+        self._items = self._ordenar(self._origem)
+        self._desenhar_cabecalho()
+        self._render()
+
+    def _ordenar(self, items: Sequence[Any]) -> Sequence[Any]:
+        if not self._ordem:
+            return items
+        chave, decrescente = self._ordem
+        coluna = next((c for c in self._colunas if c.key == chave), None)
+        if coluna is None:
+            return items
+        return sorted(items, key=coluna.chave, reverse=decrescente)
+
+    # ------------------------------------------------------------------ #
+    # Desenho
+    # ------------------------------------------------------------------ #
+    def _calcular_colunas(self, largura: int) -> None:
+        minimo = sum(c.minwidth for c in self._colunas)
+        pesos = sum(c.weight for c in self._colunas) or 1
+        sobra = max(0, largura - minimo)
+        x = 0
+        self._x = []
+        for coluna in self._colunas:
+            largura_coluna = coluna.minwidth + sobra * coluna.weight // pesos
+            self._x.append((x, largura_coluna))
+            x += largura_coluna
+
+    def _ancora(self, indice: int) -> tuple[int, str]:
+        inicio, largura = self._x[indice]
+        if self._colunas[indice].anchor == "e":
+            return inicio + largura - 10, "e"
+        return inicio + 10, "w"
+
+    def _ajustar(self, texto: str, indice: int, font) -> str:
+        """Corta o texto com reticências para caber na coluna."""
+        limite = self._x[indice][1] - 20
+        if font is None or not texto or font.measure(texto) <= limite:
+            return texto
+        while texto and font.measure(texto + "…") > limite:
+            texto = texto[: max(0, min(len(texto) - 1, len(texto) * limite // max(1, font.measure(texto))))]
+        return texto + "…"
+
+    def _desenhar_cabecalho(self) -> None:
+        canvas = self._cabecalho
+        canvas.delete("all")
+        meio = (self._row_height + 4) // 2
+        for indice, coluna in enumerate(self._colunas):
+            x, ancora = self._ancora(indice)
+            titulo = coluna.title
+            if self._ordem and self._ordem[0] == coluna.key:
+                titulo += " ▼" if self._ordem[1] else " ▲"
+            canvas.create_text(
+                x, meio, text=titulo, anchor=ancora, font=self._header_font, fill=self._cores["cabecalho"]
+            )
+        largura = int(canvas.winfo_width())
+        canvas.create_line(0, self._row_height + 3, largura, self._row_height + 3, fill=self._cores["linha"], width=2)
+
+    def _layout(self) -> None:
+        self._calcular_colunas(self._viewport.winfo_width())
+        self._desenhar_cabecalho()
+        necessarias = self._altura_visivel() // self._row_height + 2
+        canvas = self._viewport
+        while len(self._pool) < necessarias:
+            textos = [
+                canvas.create_text(0, 0, text="", font=self._font, fill=self._cores["texto"], state="hidden")
+                for _ in self._colunas
+            ]
+            linha = canvas.create_line(0, 0, 0, 0, fill=self._cores["linha"], state="hidden")
+            self._pool.append((textos, linha))
+        self._render()
+
+    def _render(self) -> None:
+        if not self._x:
+            return
+        canvas = self._viewport
+        total = len(self._items)
+        self._limitar_topo()
+        self._atualizar_scrollbar()
+        if not total:
+            canvas.coords(self._vazio, canvas.winfo_width() // 2, 20)
+            canvas.itemconfigure(self._vazio, text=self._empty_text, state="normal")
+        else:
+            canvas.itemconfigure(self._vazio, state="hidden")
+        largura = canvas.winfo_width()
+        primeira, deslocamento = divmod(self._topo, self._row_height)
+        for slot, (textos, linha) in enumerate(self._pool):
+            posicao = primeira + slot
+            if posicao >= total:
+                for item_id in textos:
+                    canvas.itemconfigure(item_id, state="hidden")
+                canvas.itemconfigure(linha, state="hidden")
+                continue
+            registro = self._items[posicao]
+            topo = slot * self._row_height - deslocamento
+            meio = topo + self._row_height // 2
+            for indice, (coluna, item_id) in enumerate(zip(self._colunas, textos)):
+                x, ancora = self._ancora(indice)
+                canvas.coords(item_id, x, meio)
+                canvas.itemconfigure(
+                    item_id,
+                    text=self._ajustar(coluna.texto(registro), indice, self._font),
+                    anchor=ancora,
+                    state="normal",
+                )
+            fundo = topo + self._row_height - 1
+            canvas.coords(linha, 10, fundo, largura - 10, fundo)
+            canvas.itemconfigure(linha, state="normal")
+
+    def _on_header_click(self, evento) -> None:
+        for indice, (inicio, largura) in enumerate(self._x):
+            if inicio <= evento.x < inicio + largura:
+                self.sort_by(self._colunas[indice].key)
+                return
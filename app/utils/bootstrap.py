@@ -10,6 +10,7 @@ from app.utils.logger import get_logger
 from app.utils.paths import workspace_path
 from app.utils.security import (
     InstanceLock,
+    configure_hash_algorithm,
     ensure_json_integrity,
     install_global_exception_hook,
     validate_environment,
@@ -50,6 +51,8 @@ def bootstrap_application(data_file: Path | None = None) -> BootstrapContext:
     validate_environment([workspace_path("dist"), workspace_path("build")])
 
     config = ConfigManager()
+    store.configure_backend(config.storage_backend)
+    configure_hash_algorithm(config.integrity_algorithm)
     data_target = Path(data_file) if data_file else workspace_path("gastos_empresa.json")
     ensure_json_integrity(data_target, _default_data_factory)
 
@@ -25,6 +25,8 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "borda": "#1e293b",
     },
     "rodape_texto": "Desenvolvido pelo Departamento de Tecnologia • Grupo14D",
+    "armazenamento": "json",
+    "algoritmo_integridade": "sha256",
 }
 
 
@@ -114,6 +116,17 @@ class ConfigManager:
     def footer_text(self) -> str:
         return str(self._data.get("rodape_texto", DEFAULT_CONFIG["rodape_texto"]))
 
+    @property
+    def storage_backend(self) -> str:
+        """Backend dos dados das empresas: ``json`` (snapshot + diário) ou ``sqlite``."""
+        return str(self._data.get("armazenamento") or DEFAULT_CONFIG["armazenamento"]).strip().lower()
+
+    @property
+    def integrity_algorithm(self) -> str:
+        """Hash dos sidecars de integridade: ``sha256``, ``blake2b`` ou ``crc32`` (não criptográfico)."""
+        valor = self._data.get("algoritmo_integridade") or DEFAULT_CONFIG["algoritmo_integridade"]
+        return str(valor).strip().lower()
+
 
 if __name__ == "__main__":
     raise SystemExit("O ConfigManager é usado apenas pelo aplicativo principal.")
@@ -1,7 +1,71 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any
+
+_DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d")
+
+# Abreviações de termos comuns em razões sociais (relatório e canonicalização de fornecedores)
+SUPPLIER_ABBREVIATIONS = {
+    "TRANSPORTES": "TRANS.",
+    "TRANSPORTE": "TRANSP.",
+    "RODOVIARIOS": "ROD.",
+    "RODOVIARIO": "RODOV.",
+    "DISTRIBUIDORA": "DIST.",
+    "DISTRIBUICAO": "DIST.",
+    "COMERCIO": "COM.",
+    "COMERCIAL": "COM.",
+    "REPRESENTACOES": "REPR.",
+    "SERVICOS": "SERV.",
+    "SERVICO": "SERV.",
+    "LOGISTICA": "LOG.",
+    "LOGISTICO": "LOG.",
+    "COOPERATIVA": "COOP.",
+    "INDUSTRIAIS": "IND.",
+    "INDUSTRIA": "IND.",
+    "INGREDIENTES": "ING.",
+    "ALIMENTOS": "ALIM.",
+    "EMBALAGENS": "EMB.",
+    "PRODUTOS": "PROD.",
+    "AGRONEGOCIOS": "AGRONEG.",
+    "APUCARANA": "APUC.",
+}
+
+# Sufixos societários omitidos nos nomes de fornecedor
+SUPPLIER_LEGAL_SUFFIXES = frozenset({"LTDA", "LTDA.", "S.A.", "S.A", "SA"})
+
+
+@lru_cache(maxsize=16384)
+def _ordinal_texto(texto: str) -> int | None:
+    texto = texto.strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(texto, fmt).toordinal()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_ordinal(valor: Any) -> int | None:
+    """Converte ``DD/MM/AAAA`` (ou ``AAAA-MM-DD``/date) no ordinal do dia.
+
+    Textos já vistos vêm de um cache, então datas repetidas não passam de novo
+    pelo ``strptime``.
+    """
+    if isinstance(valor, date):
+        return valor.toordinal()
+    if isinstance(valor, str):
+        return _ordinal_texto(valor) if valor else None
+    return None
+
+
+@lru_cache(maxsize=16384)
+def format_ordinal(ordinal: int) -> str:
+    """Ordinal do dia no formato ``DD/MM/AAAA`` usado pela interface."""
+    dia = date.fromordinal(ordinal)
+    return f"{dia.day:02d}/{dia.month:02d}/{dia.year:04d}"
 
 
 def format_brl(valor: float) -> str:
@@ -5,7 +5,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Iterable
 
-from app.utils.formatting import format_brl
+from app.utils.formatting import SUPPLIER_ABBREVIATIONS, SUPPLIER_LEGAL_SUFFIXES, format_brl, parse_ordinal
 from app.utils.paths import runtime_path, workspace_path
 
 try:
@@ -70,47 +70,12 @@ else:  # pragma: no cover
 
 def abreviar_fornecedor(nome: str) -> str:
     """Abrevia termos comuns de fornecedores para caber na coluna do relatório."""
-    mapa = {
-        "TRANSPORTES": "TRANSP.",
-        "TRANSPORTE": "TRANSP.",
-        "RODOVIARIOS": "RODOV.",
-        "RODOVIARIO": "RODOV.",
-        "DISTRIBUIDORA": "DISTR.",
-        "DISTRIBUICAO": "DISTR.",
-        "COMERCIO": "COM.",
-        "COMERCIAL": "COM.",
-        "REPRESENTACOES": "REPR.",
-        "REPRESENTACOES": "REPR.",
-        "SERVICOS": "SERV.",
-        "SERVICO": "SERV.",
-        "LOGISTICA": "LOG.",
-        "LOGISTICO": "LOG.",
-        "COOPERATIVA": "COOP.",
-        "INDUSTRIAIS": "IND.",
-        "INDUSTRIA": "IND.",
-        "INGREDIENTES": "ING.",
-        "ALIMENTOS": "ALIM.",
-        "EMBALAGENS": "EMB.",
-        "PRODUTOS": "PROD.",
-        "AGRONEGOCIOS": "AGRONEG.",
-        "TRANSPORTES": "TRANS.",
-        "APUCARANA": "APUC.",
-        "RODOVIARIOS": "ROD.",
-        "COMERCIO": "COM.",
-        "REPRESENTACOES": "REPR.",
-        "SERVICOS": "SERV.",
-        "LOGISTICA": "LOG.",
-        "DISTRIBUIDORA": "DIST.",
-        "DISTRIBUICAO": "DIST.",
-    }
-    tokens = str(nome).split()
     abreviado = []
-    for t in tokens:
+    for t in str(nome).split():
         upper = t.upper()
-        if upper in {"LTDA", "Ltda", "LTDA.", "Ltda.", "S.A.", "S.A", "SA"}:
+        if upper in SUPPLIER_LEGAL_SUFFIXES:
             continue
-        ab = mapa.get(upper)
-        abreviado.append(ab if ab else t)
+        abreviado.append(SUPPLIER_ABBREVIATIONS.get(upper, t))
     return " ".join(abreviado)
 
 
@@ -132,6 +97,7 @@ def generate_pdf_report(
     output_path: str,
     company_name: str = "Sua Empresa",
     logo_path: str | None = None,
+    presorted: bool = False,
 ) -> str:
     """
     Gera um relatório PDF minimalista de despesas.
@@ -141,6 +107,9 @@ def generate_pdf_report(
     - Resumo com total e quantidade de lançamentos.
     - Lista de despesas (data, tipo, forma, valor).
     - Inclui fornecedor quando disponível.
+
+    Com ``presorted=True`` os lançamentos são impressos na ordem recebida (a
+    interface já entrega a ordem cronológica mantida pelos dados).
     """
     if canvas is None or A4 is None:
         raise RuntimeError(
@@ -272,14 +241,12 @@ def generate_pdf_report(
 
     y = desenhar_cabecalho_tabela(top_margin - 4.7 * cm, "Detalhamento das Despesas")
 
-    # Ordena por data desc se possível
-    def _parse_data(g: dict[str, Any]) -> datetime:
-        try:
-            return datetime.strptime(g.get("data", "01/01/1970"), "%d/%m/%Y")
-        except (ValueError, TypeError):
-            return datetime(1970, 1, 1)
-
-    gastos_ordenados = sorted(gastos_list, key=_parse_data, reverse=True)
+    # Ordena por data desc, salvo quando a ordem já vem pronta
+    gastos_ordenados = gastos_list if presorted else sorted(
+        gastos_list,
+        key=lambda g: (parse_ordinal(g.get("data")) or 0, str(g.get("timestamp") or "")),
+        reverse=True,
+    )
 
     for gasto in gastos_ordenados:
         if y < 4 * cm:  # mantém margem inferior confortável
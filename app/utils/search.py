@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""Índice de busca incremental para nomes (fornecedores, categorias).
+
+Os nomes normalizados (maiúsculas, sem acento) ficam numa lista ordenada, para
+achar prefixos por ``bisect``, e num índice de trigramas, para achar trechos no
+meio do nome e nomes parecidos (erros de digitação) sem varrer a lista toda.
+Resultados vêm ranqueados: prefixo, depois trecho, depois semelhança.
+"""
+from __future__ import annotations
+
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Iterable
+
+# Fração mínima de trigramas do termo presentes no nome para contar como parecido
+_SEMELHANCA_MINIMA = 0.5
+
+
+def normalize_search(texto: str) -> str:
+    """Maiúsculas, sem acentos e com espaços simples."""
+    decomposto = unicodedata.normalize("NFKD", str(texto or ""))
+    sem_acento = "".join(ch for ch in decomposto if not unicodedata.combining(ch))
+    return " ".join(sem_acento.upper().split())
+
+
+def _trigramas(normalizado: str) -> set[str]:
+    # Bordas com espaço: nomes curtos também geram trigramas e o início pesa mais
+    texto = f"  {normalizado} "
+    return {texto[i : i + 3] for i in range(len(texto) - 2)}
+
+
+class SearchIndex:
+    """Nomes indexados por prefixo e trigramas, com inclusão/remoção incremental."""
+
+    def __init__(self, nomes: Iterable[str] = ()) -> None:
+        self._originais: dict[str, str] = {}
+        self._ordenados: list[str] = []
+        self._trigramas: dict[str, set[str]] = {}
+        self._incluir_varios(nomes)
+
+    def __len__(self) -> int:
+        return len(self._originais)
+
+    def _indexar(self, chave: str, nome: str) -> bool:
+        if not chave or chave in self._originais:
+            return False
+        self._originais[chave] = nome
+        for trigrama in _trigramas(chave):
+            self._trigramas.setdefault(trigrama, set()).add(chave)
+        return True
+
+    def _incluir_varios(self, nomes: Iterable[str]) -> None:
+        # Carga em lote: uma ordenação no fim em vez de um insort por nome
+        novos = [chave for nome in nomes if self._indexar(chave := normalize_search(nome), nome)]
+        if novos:
+            self._ordenados.extend(novos)
+            self._ordenados.sort()
+
+    def add(self, nome: str) -> None:
+        chave = normalize_search(nome)
+        if self._indexar(chave, nome):
+            insort(self._ordenados, chave)
+
+    def discard(self, nome: str) -> None:
+        chave = normalize_search(nome)
+        if self._originais.pop(chave, None) is None:
+            return
+        indice = bisect_left(self._ordenados, chave)
+        if indice < len(self._ordenados) and self._ordenados[indice] == chave:
+            del self._ordenados[indice]
+        for trigrama in _trigramas(chave):
+            chaves = self._trigramas.get(trigrama)
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._trigramas[trigrama]
+
+    def sync(self, nomes: Iterable[str]) -> None:
+        """Acompanha a lista atual aplicando só as diferenças."""
+        atuais = {normalize_search(nome): nome for nome in nomes}
+        atuais.pop("", None)
+        for chave in [c for c in self._originais if c not in atuais]:
+            self.discard(self._originais[chave])
+        novos = []
+        for chave, nome in atuais.items():
+            if chave in self._originais:
+                self._originais[chave] = nome
+            else:
+                novos.append(nome)
+        self._incluir_varios(novos)
+
+    def search(self, termo: str, limit: int | None = None) -> list[str]:
+        """Nomes que casam com ``termo``: prefixo, trecho e então parecidos."""
+        chave = normalize_search(termo)
+        if not chave:
+            nomes = self._ordenados if limit is None else self._ordenados[:limit]
+            return [self._originais[c] for c in nomes]
+
+        resultado: list[str] = []
+        vistos: set[str] = set()
+
+        def incluir(chaves: Iterable[str]) -> bool:
+            for c in chaves:
+                if c not in vistos:
+                    vistos.add(c)
+                    resultado.append(c)
+                    if limit is not None and len(resultado) >= limit:
+                        return True
+            return False
+
+        inicio = bisect_left(self._ordenados, chave)
+        fim = bisect_left(self._ordenados, chave + "\uffff")
+        if incluir(self._ordenados[inicio:fim]):
+            return [self._originais[c] for c in resultado]
+
+        candidatos = self._candidatos(chave)
+        trechos = sorted((c for c in candidatos if chave in c), key=lambda c: (c.index(chave), c))
+        if incluir(trechos):
+            return [self._originais[c] for c in resultado]
+
+        alvo = _trigramas(chave)
+        if len(chave) >= 3:
+            pontos: dict[str, int] = {}
+            for trigrama in alvo:
+                for c in self._trigramas.get(trigrama, ()):
+                    pontos[c] = pontos.get(c, 0) + 1
+            minimo = len(alvo) * _SEMELHANCA_MINIMA
+            parecidos = sorted(
+                (c for c, p in pontos.items() if p >= minimo),
+                key=lambda c: (-pontos[c], c),
+            )
+            incluir(parecidos)
+        return [self._originais[c] for c in resultado]
+
+    def _candidatos(self, chave: str) -> set[str]:
+        """Nomes que podem conter ``chave`` (superconjunto, conferido depois)."""
+        if len(chave) < 3:
+            # Termos curtos: junta os trigramas que contêm o termo
+            candidatos: set[str] = set()
+            for trigrama, chaves in self._trigramas.items():
+                if chave in trigrama:
+                    candidatos |= chaves
+            return candidatos
+        internos = [chave[i : i + 3] for i in range(len(chave) - 2)]
+        conjuntos = sorted((self._trigramas.get(t, set()) for t in internos), key=len)
+        if not conjuntos or not conjuntos[0]:
+            return set()
+        candidatos = set(conjuntos[0])
+        for conjunto in conjuntos[1:]:
+            candidatos &= conjunto
+            if not candidatos:
+                break
+        return candidatos
@@ -6,8 +6,9 @@ import json
 import os
 import sys
 import tempfile
+import zlib
 from pathlib import Path
-from typing import Any, Callable, Iterable, List, Sequence
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
 
 try:
     import msvcrt  # type: ignore[attr-defined]
@@ -25,13 +26,27 @@ from app.utils.paths import workspace_path
 logger = get_logger("capt.security")
 
 _CHECKSUM_SUFFIX = ".sha256"
+_PENDING_SUFFIX = ".new"
 _BACKUP_SUFFIX = ".bak"
+_WRITE_CHUNK = 65536
+# Manifesto por blocos (estilo Merkle) para arquivos grandes
+_MANIFEST_FORMAT = "merkle"
+_MANIFEST_BLOCK = 1024 * 1024
+_MANIFEST_THRESHOLD = 64 * 1024 * 1024
+# Algoritmos aceitos no sidecar ("<algoritmo>:<hex>"); hex puro é o SHA256 legado
+HASH_ALGORITHMS = ("sha256", "blake2b", "crc32")
+_LEGACY_ALGORITHM = "sha256"
+_HASH_ALGORITHM = "sha256"
 _CRITICAL_FOLDERS: Sequence[Path] = (
     workspace_path("app", "data"),
     workspace_path("relatorios"),
     workspace_path("logs"),
 )
 
+# Arquivos já verificados nesta execução: caminho -> (tamanho, mtime_ns, inode).
+# Enquanto a assinatura do arquivo não mudar, o hash completo não é refeito.
+_VERIFIED: Dict[Path, Tuple[int, int, int]] = {}
+
 
 def _checksum_path(target: Path) -> Path:
     return target.with_suffix(target.suffix + _CHECKSUM_SUFFIX)
@@ -46,51 +61,475 @@ def validate_environment(extra_paths: Iterable[Path] | None = None) -> List[Path
     return touched
 
 
-def calculate_checksum(file_path: Path) -> str:
-    """Calcula o hash SHA256 de um arquivo arbitrário."""
-    digest = hashlib.sha256()
+class _Crc32:
+    """CRC32 do zlib com a mesma interface dos objetos do hashlib."""
+
+    def __init__(self) -> None:
+        self._valor = 0
+
+    def update(self, dados: bytes) -> None:
+        self._valor = zlib.crc32(dados, self._valor)
+
+    def hexdigest(self) -> str:
+        return f"{self._valor:08x}"
+
+
+def _new_hasher(algoritmo: str) -> Any:
+    if algoritmo == "blake2b":
+        return hashlib.blake2b(digest_size=32)
+    if algoritmo == "crc32":
+        return _Crc32()
+    return hashlib.sha256()
+
+
+def _digest_bytes(algoritmo: str, dados: bytes) -> str:
+    hasher = _new_hasher(algoritmo)
+    hasher.update(dados)
+    return hasher.hexdigest()
+
+
+def configure_hash_algorithm(nome: str | None) -> str:
+    """Seleciona o algoritmo usado nos próximos sidecars (``sha256``, ``blake2b`` ou ``crc32``)."""
+    global _HASH_ALGORITHM
+    escolhido = (nome or _LEGACY_ALGORITHM).strip().lower()
+    if escolhido not in HASH_ALGORITHMS:
+        logger.warning("Algoritmo de hash desconhecido '%s'. Usando SHA256.", nome)
+        escolhido = _LEGACY_ALGORITHM
+    _HASH_ALGORITHM = escolhido
+    return escolhido
+
+
+def get_hash_algorithm() -> str:
+    return _HASH_ALGORITHM
+
+
+def calculate_checksum(file_path: Path, algorithm: str | None = None) -> str:
+    """Calcula o hash de um arquivo com o algoritmo informado (ou o configurado)."""
+    digest = _new_hasher(algorithm or _HASH_ALGORITHM)
     with open(file_path, "rb") as handler:
         while chunk := handler.read(65536):
             digest.update(chunk)
     return digest.hexdigest()
 
 
+def _format_digest(algoritmo: str, digest: str) -> str:
+    return f"{algoritmo}:{digest}"
+
+
+def _parse_digest(conteudo: str) -> Tuple[str, str] | None:
+    """Separa ``algoritmo:hex``; hex puro é tratado como SHA256 legado."""
+    algoritmo, sep, digest = conteudo.partition(":")
+    if not sep:
+        return _LEGACY_ALGORITHM, conteudo
+    if algoritmo not in HASH_ALGORITHMS:
+        return None
+    return algoritmo, digest
+
+
+class _ChunkedDigest:
+    """Acumula digests por bloco de tamanho fixo a partir de um fluxo de bytes."""
+
+    def __init__(self, block_size: int, algoritmo: str) -> None:
+        self.block_size = block_size
+        self.algoritmo = algoritmo
+        self.blocks: List[str] = []
+        self.size = 0
+        self._current = _new_hasher(algoritmo)
+        self._filled = 0
+
+    def update(self, dados: bytes) -> None:
+        view = memoryview(dados)
+        while view:
+            parte = view[: self.block_size - self._filled]
+            self._current.update(parte)
+            self._filled += len(parte)
+            self.size += len(parte)
+            view = view[len(parte):]
+            if self._filled == self.block_size:
+                self.blocks.append(self._current.hexdigest())
+                self._current = _new_hasher(self.algoritmo)
+                self._filled = 0
+
+    def manifest(self) -> Dict[str, Any]:
+        blocks = list(self.blocks)
+        if self._filled:
+            blocks.append(self._current.hexdigest())
+        return _build_manifest(blocks, self.block_size, self.size, self.algoritmo)
+
+
+def _build_manifest(blocks: List[str], block_size: int, size: int, algoritmo: str) -> Dict[str, Any]:
+    raiz = _digest_bytes(algoritmo, b"".join(bytes.fromhex(digest) for digest in blocks))
+    return {
+        "formato": _MANIFEST_FORMAT,
+        "algoritmo": algoritmo,
+        "bloco": block_size,
+        "tamanho": size,
+        "raiz": raiz,
+        "blocos": blocks,
+    }
+
+
+def calculate_manifest(
+    file_path: Path,
+    block_size: int = _MANIFEST_BLOCK,
+    algorithm: str | None = None,
+) -> Dict[str, Any]:
+    """Calcula o manifesto por blocos (digest de cada bloco + raiz) de um arquivo."""
+    digest = _ChunkedDigest(block_size, algorithm or _HASH_ALGORITHM)
+    with open(file_path, "rb") as handler:
+        while chunk := handler.read(block_size):
+            digest.update(chunk)
+    return digest.manifest()
+
+
+def _parse_manifest(conteudo: str) -> Dict[str, Any] | None:
+    """Interpreta o sidecar no formato por blocos; None para o formato legado."""
+    if not conteudo.startswith("{"):
+        return None
+    try:
+        manifest = json.loads(conteudo)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(manifest, dict) or manifest.get("formato") != _MANIFEST_FORMAT:
+        return None
+    if manifest.setdefault("algoritmo", _LEGACY_ALGORITHM) not in HASH_ALGORITHMS:
+        return None
+    return manifest
+
+
+def _read_sidecar(file_path: Path) -> str | None:
+    try:
+        return _checksum_path(file_path).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def _corrupted_blocks(file_path: Path, manifest: Dict[str, Any], stop_at_first: bool = False) -> List[int]:
+    """Índices dos blocos que não conferem com o manifesto.
+
+    A comparação cobre apenas os ``tamanho`` bytes registrados: conteúdo anexado
+    depois do último selo não é considerado corrupção; truncamento é.
+    """
+    block_size = int(manifest["bloco"])
+    selado = int(manifest["tamanho"])
+    algoritmo = manifest["algoritmo"]
+    ruins: List[int] = []
+    with open(file_path, "rb") as handler:
+        for indice, esperado in enumerate(manifest["blocos"]):
+            inicio = indice * block_size
+            leitura = min(block_size, selado - inicio)
+            handler.seek(inicio)
+            dados = handler.read(leitura)
+            if len(dados) != leitura or _digest_bytes(algoritmo, dados) != esperado:
+                ruins.append(indice)
+                if stop_at_first:
+                    break
+    return ruins
+
+
+def _sidecar_matches(file_path: Path, conteudo: str) -> bool:
+    manifest = _parse_manifest(conteudo)
+    if manifest is None:
+        digest = _parse_digest(conteudo)
+        if digest is None:
+            return False
+        algoritmo, esperado = digest
+        return esperado == calculate_checksum(file_path, algoritmo)
+    try:
+        if file_path.stat().st_size != int(manifest["tamanho"]):
+            return False
+        return not _corrupted_blocks(file_path, manifest, stop_at_first=True)
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+def find_corrupted_blocks(file_path: Path) -> List[Tuple[int, int]] | None:
+    """Retorna as faixas de bytes ``(inicio, fim)`` que não conferem com o sidecar.
+
+    Com manifesto por blocos a faixa aponta o bloco exato; no formato legado
+    (digest único) só é possível apontar o arquivo inteiro. Retorna None quando
+    não há sidecar para comparar.
+    """
+    conteudo = _read_sidecar(file_path)
+    if conteudo is None or not file_path.exists():
+        return None
+    manifest = _parse_manifest(conteudo)
+    if manifest is None:
+        if _sidecar_matches(file_path, conteudo):
+            return []
+        return [(0, file_path.stat().st_size)]
+    block_size = int(manifest["bloco"])
+    selado = int(manifest["tamanho"])
+    return [
+        (indice * block_size, min((indice + 1) * block_size, selado))
+        for indice in _corrupted_blocks(file_path, manifest)
+    ]
+
+
+def sealed_size(file_path: Path) -> int | None:
+    """Bytes cobertos pelo manifesto por blocos do arquivo; None sem manifesto."""
+    manifest = _parse_manifest(_read_sidecar(file_path) or "")
+    if manifest is None:
+        return None
+    try:
+        return int(manifest["tamanho"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _file_signature(file_path: Path) -> Tuple[int, int, int]:
+    info = file_path.stat()
+    return info.st_size, info.st_mtime_ns, info.st_ino
+
+
+def mark_verified(file_path: Path) -> None:
+    """Registra que o conteúdo atual do arquivo confere com o sidecar."""
+    try:
+        _VERIFIED[file_path] = _file_signature(file_path)
+    except OSError:
+        _VERIFIED.pop(file_path, None)
+
+
+def forget_verified(file_path: Path) -> None:
+    """Descarta a verificação em cache, forçando novo hash na próxima consulta."""
+    _VERIFIED.pop(file_path, None)
+
+
+def _pending_path(marker: Path) -> Path:
+    return marker.with_suffix(marker.suffix + _PENDING_SUFFIX)
+
+
+def _fsync_directory(folder: Path) -> None:
+    """Garante que as renomeações na pasta cheguem ao disco (somente POSIX)."""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_text_durable(target: Path, texto: str) -> None:
+    with open(target, "w", encoding="utf-8") as handler:
+        handler.write(texto)
+        handler.flush()
+        os.fsync(handler.fileno())
+
+
+def _replace_sidecar(file_path: Path, conteudo: str) -> None:
+    marker = _checksum_path(file_path)
+    pending = _pending_path(marker)
+    _write_text_durable(pending, conteudo)
+    os.replace(pending, marker)
+
+
 def persist_checksum(file_path: Path, checksum: str | None = None) -> str:
-    """Salva o checksum em arquivo auxiliar."""
-    checksum = checksum or calculate_checksum(file_path)
-    with open(_checksum_path(file_path), "w", encoding="utf-8") as handler:
-        handler.write(checksum)
+    """Salva o checksum (``algoritmo:hex``) em arquivo auxiliar com troca atômica."""
+    calculado = checksum is None
+    checksum = checksum or _format_digest(_HASH_ALGORITHM, calculate_checksum(file_path))
+    _replace_sidecar(file_path, checksum)
+    if calculado:
+        mark_verified(file_path)
+    else:
+        forget_verified(file_path)
+    return checksum
+
+
+def persist_manifest(file_path: Path, block_size: int = _MANIFEST_BLOCK) -> Dict[str, Any]:
+    """Salva o sidecar no formato por blocos (manifesto) para o arquivo inteiro."""
+    manifest = calculate_manifest(file_path, block_size, _HASH_ALGORITHM)
+    _replace_sidecar(file_path, json.dumps(manifest))
+    mark_verified(file_path)
+    return manifest
+
+
+def refresh_manifest(
+    file_path: Path,
+    *,
+    changed_from: int | None = None,
+    changed_ranges: Iterable[Tuple[int, int]] = (),
+    block_size: int = _MANIFEST_BLOCK,
+) -> Dict[str, Any]:
+    """Atualiza o manifesto re-hasheando apenas os blocos alterados.
+
+    ``changed_from`` indica o offset a partir do qual o arquivo mudou (ex.: o
+    tamanho anterior a um append); ``changed_ranges`` lista edições locais
+    ``(inicio, fim)``. Blocos fora dessas faixas reaproveitam o digest anterior.
+    Sem manifesto prévio, o arquivo inteiro é processado em blocos de
+    ``block_size``; havendo manifesto, vale o tamanho de bloco já gravado.
+    """
+    manifest = _parse_manifest(_read_sidecar(file_path) or "")
+    if manifest is None:
+        return persist_manifest(file_path, block_size)
+    block_size = int(manifest["bloco"])
+    algoritmo = manifest["algoritmo"]
+    if algoritmo != _HASH_ALGORITHM:
+        # Digests de outro algoritmo não podem ser reaproveitados
+        return persist_manifest(file_path, block_size)
+    antigos: List[str] = list(manifest["blocos"])
+    tamanho = file_path.stat().st_size
+    limite = min(tamanho, int(manifest["tamanho"]))
+    if changed_from is not None:
+        limite = min(limite, changed_from)
+    primeiro_sujo = limite // block_size
+    sujos = set()
+    for inicio, fim in changed_ranges:
+        sujos.update(range(inicio // block_size, max(inicio, fim - 1) // block_size + 1))
+    total = -(-tamanho // block_size)
+    blocos: List[str] = []
+    with open(file_path, "rb") as handler:
+        for indice in range(total):
+            if indice < primeiro_sujo and indice < len(antigos) and indice not in sujos:
+                blocos.append(antigos[indice])
+                continue
+            handler.seek(indice * block_size)
+            blocos.append(_digest_bytes(algoritmo, handler.read(block_size)))
+    atualizado = _build_manifest(blocos, block_size, tamanho, algoritmo)
+    _replace_sidecar(file_path, json.dumps(atualizado))
+    mark_verified(file_path)
+    return atualizado
+
+
+def discard_checksum(file_path: Path) -> None:
+    """Remove o sidecar de um arquivo descartado."""
+    _checksum_path(file_path).unlink(missing_ok=True)
+    forget_verified(file_path)
+
+
+def _uses_manifest(target: Path) -> bool:
+    conteudo = _read_sidecar(target)
+    if conteudo and _parse_manifest(conteudo) is not None:
+        return True
+    try:
+        return target.stat().st_size >= _MANIFEST_THRESHOLD
+    except OSError:
+        return False
+
+
+def atomic_write_json(target: Path, payload: Any, *, chunked: bool | None = None) -> str:
+    """Grava JSON sem nunca deixar o arquivo pela metade e retorna o checksum.
+
+    O conteúdo é serializado em blocos num temporário da mesma pasta, com o
+    hash (algoritmo configurado) calculado sobre os bytes à medida que são
+    gravados (uma única passada). Após ``fsync``, o temporário substitui o alvo via ``os.replace``
+    e o sidecar ``.sha256`` é trocado da mesma forma. Se o processo cair entre
+    as duas trocas, o sidecar pendente (``.sha256.new``) é aproveitado em
+    ``checksum_is_valid``.
+
+    ``chunked`` grava o sidecar como manifesto por blocos; por padrão ele é
+    usado quando o arquivo já o tinha ou passa de ``_MANIFEST_THRESHOLD``.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if chunked is None:
+        chunked = _uses_manifest(target)
+    algoritmo = _HASH_ALGORITHM
+    digest: Any = _ChunkedDigest(_MANIFEST_BLOCK, algoritmo) if chunked else _new_hasher(algoritmo)
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as handler:
+            pendentes: list[str] = []
+            tamanho = 0
+            for pedaco in encoder.iterencode(payload):
+                pendentes.append(pedaco)
+                tamanho += len(pedaco)
+                if tamanho >= _WRITE_CHUNK:
+                    dados = "".join(pendentes).encode("utf-8")
+                    digest.update(dados)
+                    handler.write(dados)
+                    pendentes.clear()
+                    tamanho = 0
+            dados = "".join(pendentes).encode("utf-8")
+            digest.update(dados)
+            handler.write(dados)
+            handler.flush()
+            os.fsync(handler.fileno())
+        if chunked:
+            manifest = digest.manifest()
+            checksum = _format_digest(algoritmo, manifest["raiz"])
+            conteudo = json.dumps(manifest)
+        else:
+            checksum = _format_digest(algoritmo, digest.hexdigest())
+            conteudo = checksum
+        marker = _checksum_path(target)
+        pending = _pending_path(marker)
+        _write_text_durable(pending, conteudo)
+        os.replace(tmp_path, target)
+        os.replace(pending, marker)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        forget_verified(target)
+        raise
+    _fsync_directory(target.parent)
+    mark_verified(target)
     return checksum
 
 
+def _recover_pending_checksum(file_path: Path) -> bool:
+    """Promove o sidecar pendente quando a gravação caiu entre as trocas."""
+    pending = _pending_path(_checksum_path(file_path))
+    try:
+        conteudo = pending.read_text(encoding="utf-8").strip()
+        if not _sidecar_matches(file_path, conteudo):
+            return False
+        os.replace(pending, _checksum_path(file_path))
+    except OSError:
+        return False
+    logger.warning("Checksum pendente de %s recuperado após gravação interrompida.", file_path)
+    return True
+
+
 def checksum_is_valid(file_path: Path) -> bool:
-    """Confere se o checksum salvo combina com o arquivo alvo."""
-    marker = _checksum_path(file_path)
-    if not marker.exists() or not file_path.exists():
+    """Confere se o checksum salvo combina com o arquivo alvo.
+
+    Aceita o digest único (``algoritmo:hex`` ou hex puro legado, SHA256) e o
+    manifesto por blocos, sempre com o algoritmo registrado no sidecar. Arquivos
+    já verificados cuja assinatura (tamanho, mtime_ns, inode) não mudou desde
+    então são aceitos sem recalcular o hash.
+    """
+    if not _checksum_path(file_path).exists() or not file_path.exists():
+        _VERIFIED.pop(file_path, None)
         return False
-    current = calculate_checksum(file_path)
     try:
-        saved = marker.read_text(encoding="utf-8").strip()
+        assinatura = _file_signature(file_path)
     except OSError:
         return False
-    return saved == current
+    if _VERIFIED.get(file_path) == assinatura:
+        return True
+    conteudo = _read_sidecar(file_path)
+    if conteudo is None:
+        return False
+    if _sidecar_matches(file_path, conteudo) or _recover_pending_checksum(file_path):
+        _VERIFIED[file_path] = assinatura
+        return True
+    _VERIFIED.pop(file_path, None)
+    return False
 
 
 def _write_json(target: Path, payload: Any) -> None:
-    with open(target, "w", encoding="utf-8") as handler:
-        json.dump(payload, handler, indent=2, ensure_ascii=False)
+    atomic_write_json(target, payload)
 
 
 def ensure_json_integrity(file_path: Path, data_factory: Callable[[], Any]) -> bool:
     """Valida o JSON informado e restaura via factory quando necessário."""
     if not file_path.exists():
-        payload = data_factory()
-        _write_json(file_path, payload)
-        persist_checksum(file_path)
+        _write_json(file_path, data_factory())
         return True
 
     if not checksum_is_valid(file_path):
-        logger.warning("Checksum inválido para %s. Executando restauração.", file_path)
+        faixas = find_corrupted_blocks(file_path) or []
+        logger.warning(
+            "Checksum inválido para %s (faixas divergentes: %s). Executando restauração.",
+            file_path,
+            ", ".join(f"{inicio}-{fim}" for inicio, fim in faixas) or "sem sidecar",
+        )
         return restore_json_file(file_path, data_factory)
 
     try:
@@ -109,7 +548,6 @@ def restore_json_file(file_path: Path, data_factory: Callable[[], Any]) -> bool:
         _write_json(file_path, payload)
         backup_path = file_path.with_suffix(file_path.suffix + _BACKUP_SUFFIX)
         backup_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-        persist_checksum(file_path)
         return True
     except Exception as exc:  # noqa: BLE001
         logger.exception("Falha ao restaurar %s: %s", file_path, exc)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Perfil de importação da partida, no formato do ``python -X importtime``.
+
+Com ``CAPT_IMPORTTIME=1`` no ambiente, ``start_import_profile`` põe um buscador
+no início de ``sys.meta_path`` que cronometra a execução de cada módulo
+importado (tempo próprio e acumulado, com o aninhamento das importações).
+``finish_import_profile`` grava o relatório em ``logs/startup_imports.txt`` e
+retira o buscador. Serve também no executável do PyInstaller, onde não há como
+passar ``-X importtime`` ao interpretador.
+
+Este módulo só depende da biblioteca padrão para poder ser o primeiro a
+carregar e medir todo o resto.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from importlib.abc import MetaPathFinder
+from pathlib import Path
+from typing import Any
+
+ENV_VAR = "CAPT_IMPORTTIME"
+REPORT_NAME = "startup_imports.txt"
+# Módulos listados no resumo do relatório (maior tempo próprio)
+_RESUMO = 15
+
+_perfil: "_CronometroImportacao | None" = None
+
+
+class _CronometroImportacao(MetaPathFinder):
+    """Buscador que só embrulha o ``exec_module`` do loader encontrado pelos demais."""
+
+    def __init__(self) -> None:
+        self.inicio = time.perf_counter()
+        # (módulo, profundidade, próprio, acumulado) na ordem em que terminam
+        self.medicoes: list[tuple[str, int, float, float]] = []
+        self._filhos: list[float] = []
+        self._thread = threading.get_ident()
+
+    def find_spec(self, fullname: str, path: Any, target: Any = None) -> Any:
+        if threading.get_ident() != self._thread:
+            return None
+        for buscador in sys.meta_path:
+            if buscador is self:
+                continue
+            buscar = getattr(buscador, "find_spec", None)
+            if buscar is None:
+                continue
+            spec = buscar(fullname, path, target)
+            if spec is None:
+                continue
+            loader = spec.loader
+            # Loaders que são classes (builtin/frozen) ficam sem medição:
+            # trocar o método na classe afetaria todos os módulos dela
+            executar = getattr(loader, "exec_module", None)
+            if executar is not None and not isinstance(loader, type):
+                try:
+                    loader.exec_module = self._cronometrar(fullname, executar)
+                except (AttributeError, TypeError):
+                    pass
+            return spec
+        return None
+
+    def _cronometrar(self, nome: str, exec_module: Any) -> Any:
+        def executar(module: Any) -> None:
+            self._filhos.append(0.0)
+            inicio = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                acumulado = time.perf_counter() - inicio
+                filhos = self._filhos.pop()
+                if self._filhos:
+                    self._filhos[-1] += acumulado
+                self.medicoes.append((nome, len(self._filhos), acumulado - filhos, acumulado))
+
+        return executar
+
+    def relatorio(self) -> str:
+        total = time.perf_counter() - self.inicio
+        linhas = ["import time: self [us] | cumulative | imported package"]
+        for nome, profundidade, proprio, acumulado in self.medicoes:
+            linhas.append(f"import time: {proprio * 1e6:9.0f} | {acumulado * 1e6:10.0f} | {'  ' * profundidade}{nome}")
+        pesados = sorted(self.medicoes, key=lambda medicao: medicao[2], reverse=True)
+        linhas += ["", f"Total até o fim do perfil: {total * 1000:.0f} ms; maior tempo próprio:"]
+        for nome, _, proprio, acumulado in pesados[:_RESUMO]:
+            linhas.append(f"  {proprio * 1000:8.1f} ms  (acumulado {acumulado * 1000:8.1f} ms)  {nome}")
+        return "\n".join(linhas) + "\n"
+
+
+def start_import_profile(force: bool = False) -> bool:
+    """Começa a medir as importações se ``CAPT_IMPORTTIME`` estiver ligado (ou ``force``)."""
+    global _perfil
+    if _perfil is not None:
+        return True
+    if not force and os.environ.get(ENV_VAR, "").strip().lower() not in {"1", "true", "sim"}:
+        return False
+    _perfil = _CronometroImportacao()
+    sys.meta_path.insert(0, _perfil)
+    return True
+
+
+def finish_import_profile(destino: Path | None = None) -> Path | None:
+    """Encerra a medição e grava o relatório; None quando o perfil não estava ativo."""
+    global _perfil
+    perfil, _perfil = _perfil, None
+    if perfil is None:
+        return None
+    try:
+        sys.meta_path.remove(perfil)
+    except ValueError:
+        pass
+
+    from app.utils.logger import LOG_DIR, get_logger
+
+    destino = destino or LOG_DIR / REPORT_NAME
+    try:
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        destino.write_text(perfil.relatorio(), encoding="utf-8")
+    except OSError:
+        get_logger("capt.startup").exception("Falha ao gravar o perfil de importação")
+        return None
+    get_logger("capt.startup").info(
+        "Perfil de importação: %d módulos em %.0f ms (%s)",
+        len(perfil.medicoes),
+        (time.perf_counter() - perfil.inicio) * 1000,
+        destino,
+    )
+    return destino
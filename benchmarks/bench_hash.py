@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Benchmark de vazão dos algoritmos de integridade conforme o tamanho do arquivo.
+
+Para cada algoritmo aceito no sidecar (``sha256``, ``blake2b``, ``crc32``) mede:
+    - ``calculate_checksum``: hash do arquivo inteiro lido do disco;
+    - ``checksum_is_valid`` frio: verificação completa sem o cache de assinatura.
+
+Uso:
+    python benchmarks/bench_hash.py [--tamanhos-mib 1 16 64] [--repeticoes 5]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils import security  # noqa: E402
+
+
+def _medir(func, repeticoes: int) -> float:
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        amostras.append(time.perf_counter() - inicio)
+    return statistics.median(amostras)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Vazão dos algoritmos de hash de integridade.")
+    parser.add_argument("--tamanhos-mib", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        print(f"{'MiB':>6} {'algoritmo':>10} {'hash (MiB/s)':>14} {'verificação (ms)':>18}")
+        for mib in args.tamanhos_mib:
+            arquivo = Path(pasta) / f"dados_{mib}.bin"
+            arquivo.write_bytes(os.urandom(mib * 1024 * 1024))
+            for algoritmo in security.HASH_ALGORITHMS:
+                security.configure_hash_algorithm(algoritmo)
+                security.persist_checksum(arquivo)
+
+                def verificar() -> None:
+                    security.forget_verified(arquivo)
+                    security.checksum_is_valid(arquivo)
+
+                t_hash = _medir(lambda: security.calculate_checksum(arquivo, algoritmo), args.repeticoes)
+                t_verif = _medir(verificar, args.repeticoes)
+                print(f"{mib:>6} {algoritmo:>10} {mib / t_hash:>14.1f} {t_verif * 1000:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Benchmark da latência de ``load_data`` conforme o tamanho do arquivo.
+
+Mede, para arquivos sintéticos de tamanhos crescentes:
+    - leitura fria: sem cache de verificação nem de dados (hash + parse);
+    - verificação em cache: dados descartados, integridade já confirmada (só parse);
+    - leitura quente: arquivo inalterado (nenhum hash, nenhum parse).
+
+Uso:
+    python benchmarks/bench_load_data.py [--registros 1000 10000 100000] [--repeticoes 5]
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.data import store  # noqa: E402
+from app.utils import security  # noqa: E402
+
+
+def _gerar_registros(quantidade: int) -> list[dict]:
+    tipos = ["ALUGUEL", "ENERGIA ELÉTRICA", "FRETES E TRANSPORTES", "MATERIAIS DE CONSUMO"]
+    formas = ["Dinheiro", "E. G. FONSECA — Cresol 104687-0", "M X FONSECA CAPELLO — Sicoob 131.309-6"]
+    return [
+        {
+            "data": f"{(i % 28) + 1:02d}/{(i % 12) + 1:02d}/2025",
+            "tipo": tipos[i % len(tipos)],
+            "forma_pagamento": formas[i % len(formas)],
+            "valor": round(10 + (i % 997) * 1.37, 2),
+            "fornecedor": f"FORNECEDOR {i % 250:03d} LTDA",
+            "timestamp": f"2025-01-01T00:00:{i % 60:02d}",
+        }
+        for i in range(quantidade)
+    ]
+
+
+def _medir(func, repeticoes: int) -> float:
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        amostras.append(time.perf_counter() - inicio)
+    return statistics.median(amostras) * 1000
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Latência de load_data por tamanho de arquivo.")
+    parser.add_argument("--registros", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        print(f"{'registros':>10} {'MiB':>8} {'fria (ms)':>12} {'verif. cache (ms)':>18} {'quente (ms)':>12}")
+        for quantidade in args.registros:
+            arquivo = Path(pasta) / f"empresa_{quantidade}.json"
+            security.atomic_write_json(arquivo, _gerar_registros(quantidade))
+            tamanho = arquivo.stat().st_size / (1024 * 1024)
+
+            def fria() -> None:
+                security.forget_verified(arquivo)
+                store._DATA_CACHE.pop(arquivo, None)
+                store.load_data(arquivo)
+
+            def verificacao_em_cache() -> None:
+                store._DATA_CACHE.pop(arquivo, None)
+                store.load_data(arquivo)
+
+            def quente() -> None:
+                store.load_data(arquivo)
+
+            t_fria = _medir(fria, args.repeticoes)
+            t_verif = _medir(verificacao_em_cache, args.repeticoes)
+            t_quente = _medir(quente, args.repeticoes)
+            print(f"{quantidade:>10} {tamanho:>8.2f} {t_fria:>12.2f} {t_verif:>18.2f} {t_quente:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
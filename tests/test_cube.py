@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from app.data import consolidated, store
+from app.data.cube import AggregateCube, cube_path_for, load_cube
+from app.utils import security
+
+
+@pytest.fixture
+def empresa(tmp_path, monkeypatch):
+    monkeypatch.delenv("APP_ENV", raising=False)
+    caminho = tmp_path / "empresa.json"
+    assert store.save_data(caminho, [{"id": "a", "data": "01/02/2024", "tipo": "Aluguel", "valor": 10.0}])
+    yield caminho
+    store._DATA_CACHE.clear()
+    store._CUBOS.clear()
+    store._CUBOS_PENDENTES.clear()
+
+
+def _do_zero(caminho):
+    store._DATA_CACHE.clear()
+    return AggregateCube.from_records(store.load_data(caminho, typed=True)).celulas
+
+
+def test_operacoes_nao_regravam_o_cubo_em_disco(empresa):
+    salvo = cube_path_for(empresa).read_bytes()
+    assert store.append_record(empresa, {"id": "b", "data": "03/02/2024", "tipo": "Outros", "valor": 5.0})
+    assert store.update_record(empresa, {"id": "a", "data": "01/03/2024", "tipo": "Aluguel", "valor": 12.0})
+    assert store.delete_record(empresa, "b")
+    assert cube_path_for(empresa).read_bytes() == salvo
+
+    assert store.get_cube(empresa).celulas == _do_zero(empresa)
+
+
+def test_cubo_vai_ao_disco_na_compactacao(empresa):
+    assert store.append_record(empresa, {"id": "b", "data": "03/02/2024", "tipo": "Outros", "valor": 5.0})
+    assert store.compact(empresa)
+    store._CUBOS.clear()
+    cubo = load_cube(cube_path_for(empresa), store._assinatura(empresa))
+    assert cubo is not None and cubo.celulas == _do_zero(empresa)
+
+
+def test_peek_cube_grava_o_cubo_pendente(empresa):
+    assert store.append_record(empresa, {"id": "b", "data": "03/02/2024", "tipo": "Outros", "valor": 5.0})
+    assert load_cube(cube_path_for(empresa), store._assinatura(empresa)) is None
+    assert store.peek_cube(empresa) is not None
+    cubo = load_cube(cube_path_for(empresa), store._assinatura(empresa))
+    assert cubo is not None and cubo.celulas == _do_zero(empresa)
+
+
+def test_parcial_do_processo_filho_usa_o_algoritmo_do_pai(empresa):
+    # Sem cubo em disco nem em memória, o filho recalcula e grava o .cube.json
+    cube_path_for(empresa).unlink()
+    store._CUBOS.clear()
+    anterior = security.get_hash_algorithm()
+    try:
+        consolidated._parcial_empresa(str(empresa), "json", "blake2b")
+        assert security._read_sidecar(cube_path_for(empresa)).startswith("blake2b:")
+    finally:
+        security.configure_hash_algorithm(anterior)
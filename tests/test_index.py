@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from app.data.index import RecordIndex, select_positions
+from app.data.models import Despesa
+from app.data.ordering import SortedOrder, order_positions
+from app.data.query import compile_filter, normalize_filters, record_keys
+
+FILTROS = [
+    {},
+    {"tipo": " aluguel "},
+    {"fornecedor": "makro"},
+    {"forma": "PIX"},
+    {"data_inicio": "05/01/2024", "data_fim": "10/01/2024"},
+    {"data_fim": "03/01/2024"},
+    {"valor_min": 20, "valor_max": 60},
+    {"tipo": "Outros", "forma": "Cartão", "valor_min": 50},
+    {"fornecedor": "Todos", "tipo": "Todos"},
+]
+
+
+def _sortear(sorteio, numero):
+    dia = sorteio.choice([None, *range(1, 29)])
+    return Despesa(
+        {
+            "id": f"r{numero}",
+            "data": f"{dia:02d}/01/2024" if dia else "",
+            "tipo": sorteio.choice(["Aluguel", "aluguel ", "Outros"]),
+            "forma_pagamento": sorteio.choice(["PIX", "Cartão"]),
+            "fornecedor": sorteio.choice(["MAKRO", "Makro", "ATACADAO", ""]),
+            "valor": float(sorteio.randint(1, 100)),
+            "timestamp": f"2024-01-01T00:00:{sorteio.randint(0, 59):02d}",
+        }
+    )
+
+
+def _lista_mutada():
+    sorteio = random.Random(3)
+    registros = [_sortear(sorteio, numero) for numero in range(200)]
+    indice = RecordIndex.from_records(registros)
+    ordem = SortedOrder.from_records(registros)
+    for numero in range(200, 400):
+        acao = sorteio.random()
+        posicao = sorteio.randrange(len(registros))
+        if acao < 0.4:
+            registros.append(_sortear(sorteio, numero))
+            indice.append(registros[-1])
+            ordem.append(registros[-1])
+        elif acao < 0.7 and registros[posicao] is not None:
+            registros[posicao] = _sortear(sorteio, numero)
+            indice.update(posicao, registros[posicao])
+            ordem.update(posicao, registros[posicao])
+        else:
+            registros[posicao] = None
+            indice.discard(posicao)
+            ordem.discard(posicao)
+    return registros, indice, ordem
+
+
+@pytest.mark.parametrize("filtros", FILTROS)
+def test_indice_igual_ao_predicado_dos_registros(filtros):
+    registros, indice, _ = _lista_mutada()
+    predicado = compile_filter(normalize_filters(filtros))
+    esperado = [posicao for posicao, registro in enumerate(registros) if registro is not None and predicado(registro)]
+
+    assert indice.select(filtros) == esperado
+    normalizados = normalize_filters(filtros)
+    candidatos = indice.candidates(normalizados) if normalizados else None
+    assert select_positions(indice.rows(), normalizados, candidatos) == esperado
+    por_chaves = compile_filter(normalizados, keys=True)
+    vivos = [registro for registro in registros if registro is not None]
+    assert [por_chaves(record_keys(registro)) for registro in vivos] == [predicado(registro) for registro in vivos]
+
+
+def test_ordem_cronologica_com_empate_pela_posicao():
+    registros, _, ordem = _lista_mutada()
+    vivos = [posicao for posicao, registro in enumerate(registros) if registro is not None]
+    esperado = sorted(
+        vivos,
+        key=lambda posicao: (registros[posicao].data_ord or 0, registros[posicao]["timestamp"], -posicao),
+        reverse=True,
+    )
+    assert ordem.positions() == esperado
+    assert ordem.positions(descending=False) == esperado[::-1]
+
+
+@pytest.mark.parametrize("filtros", FILTROS)
+def test_ordem_da_selecao_igual_a_ordem_completa(filtros):
+    _, indice, ordem = _lista_mutada()
+    selecionados = indice.select(filtros)
+    conjunto = set(selecionados)
+    esperado = [posicao for posicao in ordem.positions() if posicao in conjunto]
+
+    assert ordem.order(selecionados) == esperado
+    assert order_positions(ordem.keys(selecionados), selecionados) == esperado
+    assert ordem.order(selecionados, descending=False) == esperado[::-1]
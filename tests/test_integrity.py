@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from app.data import store
+from app.utils import security
+
+
+@pytest.fixture
+def empresa(tmp_path, monkeypatch):
+    monkeypatch.delenv("APP_ENV", raising=False)
+    caminho = tmp_path / "empresa.json"
+    assert store.save_data(caminho, [{"data": "01/02/2024", "tipo": "Aluguel", "valor": 10.0}])
+    yield caminho
+    store._DATA_CACHE.clear()
+
+
+def _novo(valor):
+    return {"data": "02/02/2024", "tipo": "Outros", "forma_pagamento": "PIX", "valor": valor}
+
+
+def _valores(caminho):
+    store._DATA_CACHE.clear()
+    return sorted(registro["valor"] for registro in store.load_data(caminho))
+
+
+def test_manifesto_aponta_o_bloco_alterado(tmp_path):
+    arquivo = tmp_path / "dados.bin"
+    arquivo.write_bytes(bytes(range(256)) * 16)
+    security.persist_manifest(arquivo, block_size=1024)
+    assert security.checksum_is_valid(arquivo)
+    assert security.find_corrupted_blocks(arquivo) == []
+
+    dados = bytearray(arquivo.read_bytes())
+    dados[2500] ^= 0xFF
+    arquivo.write_bytes(bytes(dados))
+    security.forget_verified(arquivo)
+    assert not security.checksum_is_valid(arquivo)
+    assert security.find_corrupted_blocks(arquivo) == [(2048, 3072)]
+
+
+def test_refresh_manifest_apos_append(tmp_path):
+    arquivo = tmp_path / "dados.bin"
+    arquivo.write_bytes(b"a" * 3000)
+    security.persist_manifest(arquivo, block_size=1024)
+    with open(arquivo, "ab") as handler:
+        handler.write(b"b" * 500)
+    assert security.find_corrupted_blocks(arquivo) == []
+    assert security.sealed_size(arquivo) == 3000
+    security.refresh_manifest(arquivo, changed_from=3000)
+    security.forget_verified(arquivo)
+    assert security.checksum_is_valid(arquivo)
+    assert security.sealed_size(arquivo) == 3500
+
+
+def test_diario_selado_e_reaplicado(empresa):
+    assert store.append_record(empresa, _novo(1.0))
+    assert store.append_record(empresa, _novo(2.0))
+    assert _valores(empresa) == [1.0, 2.0, 10.0]
+
+
+def test_diario_sem_manifesto_nao_e_confiavel(empresa):
+    store.append_record(empresa, _novo(1.0))
+    store.append_record(empresa, _novo(2.0))
+    security.discard_checksum(store._journal_path(empresa))
+    assert _valores(empresa) == [10.0]
+
+
+def test_linhas_anexadas_fora_do_selo_sao_ignoradas(empresa):
+    store.append_record(empresa, _novo(1.0))
+    journal = store._journal_path(empresa)
+    linha = journal.read_bytes()
+    with open(journal, "ab") as handler:
+        handler.write(linha.replace(b"1.0", b"5.0") + linha.replace(b"1.0", b"6.0"))
+    assert _valores(empresa) == [1.0, 10.0]
+
+
+def test_uma_linha_deixada_por_queda_e_selada_de_novo(empresa):
+    store.append_record(empresa, _novo(1.0))
+    journal = store._journal_path(empresa)
+    linha = journal.read_bytes()
+    outra = linha.replace(linha[linha.index(b'"id"'):linha.index(b'"registro"')], b'"id": "queda", ')
+    with open(journal, "ab") as handler:
+        handler.write(outra)
+    assert _valores(empresa) == [1.0, 1.0, 10.0]
+    assert security.checksum_is_valid(journal)
+
+
+def test_bloco_divergente_limita_a_reaplicacao(empresa):
+    store.append_record(empresa, _novo(1.0))
+    journal = store._journal_path(empresa)
+    journal.write_bytes(journal.read_bytes().replace(b"1.0", b"9.0"))
+    assert _valores(empresa) == [10.0]
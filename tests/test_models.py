@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import json
+import pickle
+
+from app.data.models import Despesa, as_despesa
+
+
+def _registro(**campos):
+    base = {
+        "id": "abc",
+        "data": "05/03/2024",
+        "tipo": "ALIMENTACAO",
+        "forma_pagamento": "Pix",
+        "valor": 12.5,
+        "fornecedor": "ATACADAO",
+        "timestamp": "2024-03-05T10:00:00",
+    }
+    base.update(campos)
+    return base
+
+
+def test_ida_e_volta_preserva_o_registro():
+    registro = _registro()
+    despesa = Despesa(registro)
+    assert despesa.to_dict() == registro
+    assert list(despesa) == list(registro)
+    assert despesa.data_ord is not None
+    assert despesa.centavos == 1250
+
+
+def test_formas_nao_canonicas_sao_devolvidas_como_lidas():
+    registro = _registro(data="2024-03-05", valor="12,50", extra={"obs": 1})
+    despesa = Despesa(registro)
+    assert despesa.to_dict() == registro
+    assert despesa.data_ord == Despesa(_registro()).data_ord
+    assert despesa["valor"] == "12,50"
+
+
+def test_none_e_guardado_como_dado():
+    despesa = Despesa({"data": None, "valor": None})
+    assert despesa.get("data") is None
+    assert despesa["valor"] is None
+    assert despesa.data_ord is None
+    assert despesa.to_dict() == {"data": None, "valor": None}
+    assert json.loads(json.dumps(despesa.to_dict())) == {"data": None, "valor": None}
+    assert "None" in repr(despesa)
+
+
+def test_campos_ausentes_e_exclusao():
+    despesa = Despesa({"tipo": "X"})
+    assert "data" not in despesa and despesa.get("data", "-") == "-"
+    despesa["data"] = "01/01/2024"
+    del despesa["data"]
+    assert "data" not in despesa
+    assert len(despesa) == 1
+
+
+def test_copia_e_pickle():
+    despesa = Despesa(_registro(valor=None))
+    assert despesa.copy().to_dict() == despesa.to_dict()
+    assert pickle.loads(pickle.dumps(despesa)).to_dict() == despesa.to_dict()
+    assert as_despesa(despesa) is despesa
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from app.utils.search import SearchIndex, normalize_search
+
+NOMES = ["Atacadão", "ATACADO BOM PRECO", "Makro", "Padaria São João", "Posto Ipiranga", "João Materiais"]
+
+
+def test_normaliza_acento_caixa_e_espacos():
+    assert normalize_search("  padaria   são  joão ") == "PADARIA SAO JOAO"
+
+
+def test_ranking_prefixo_trecho_e_parecidos():
+    indice = SearchIndex(NOMES)
+    assert indice.search("ata") == ["Atacadão", "ATACADO BOM PRECO"]
+    assert indice.search("joao") == ["João Materiais", "Padaria São João"]
+    assert indice.search("ipiranag") == ["Posto Ipiranga"]
+    assert indice.search("", limit=2) == ["Atacadão", "ATACADO BOM PRECO"]
+    assert indice.search("zzz") == []
+
+
+@pytest.mark.parametrize("termo", ["a", "ao", "ata", "sao jo", "ma", "o i"])
+def test_trechos_iguais_a_varredura(termo):
+    sorteio = random.Random(11)
+    indice = SearchIndex()
+    atuais = set()
+    for _ in range(300):
+        nome = "".join(sorteio.choice("ABCAO ÃÕI") for _ in range(sorteio.randint(1, 8)))
+        if sorteio.random() < 0.3 and atuais:
+            removido = sorteio.choice(sorted(atuais))
+            indice.discard(removido)
+            atuais.discard(removido)
+        elif normalize_search(nome):
+            # Grafias com a mesma forma normalizada são um único nome
+            indice.add(nome)
+            atuais.add(normalize_search(nome))
+    chave = normalize_search(termo)
+    esperado = {nome for nome in atuais if chave in nome}
+    encontrados = {normalize_search(nome) for nome in indice.search(termo) if chave in normalize_search(nome)}
+    assert encontrados == esperado
+
+
+def test_sync_aplica_so_as_diferencas():
+    indice = SearchIndex(NOMES)
+    indice.sync(["Makro", "makro atacadista", "Atacadão"])
+    assert len(indice) == 3
+    assert indice.search("mak") == ["Makro", "makro atacadista"]
+    assert indice.search("padaria") == []
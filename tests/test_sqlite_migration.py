@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from app.data import sqlite_backend, store
+
+
+@pytest.fixture
+def empresa(tmp_path, monkeypatch):
+    monkeypatch.delenv("APP_ENV", raising=False)
+    caminho = tmp_path / "empresa.json"
+    registros = [
+        {"data": "01/02/2024", "tipo": "Aluguel", "forma_pagamento": "PIX", "valor": 10.0},
+        {"data": "02/02/2024", "tipo": "Outros", "forma_pagamento": "Boleto", "valor": 2.5},
+    ]
+    assert store.save_data(caminho, registros)
+    yield caminho
+    store._MIGRADOS.clear()
+    store._DATA_CACHE.clear()
+
+
+def test_migracao_importa_uma_unica_vez(empresa):
+    db_path = sqlite_backend.db_path_for(empresa)
+    assert store.migrate_to_sqlite(empresa) == 2
+    assert sqlite_backend.get_meta(db_path, "migrado_de")
+    assert len(list(sqlite_backend.iter_records(db_path))) == 2
+    assert store.migrate_to_sqlite(empresa) == 0
+
+
+def test_json_que_falha_na_verificacao_nao_e_migrado(empresa):
+    db_path = sqlite_backend.db_path_for(empresa)
+    empresa.write_text(empresa.read_text(encoding="utf-8").replace("Aluguel", "Alugueo"), encoding="utf-8")
+    store._DATA_CACHE.clear()
+    with pytest.raises(ValueError):
+        store.migrate_to_sqlite(empresa)
+    assert sqlite_backend.get_meta(db_path, "migrado_de") is None
+    assert list(sqlite_backend.iter_records(db_path)) == []
+
+
+def test_empresa_nova_migra_vazia(tmp_path):
+    caminho = tmp_path / "nova.json"
+    assert store.migrate_to_sqlite(caminho) == 0
+    assert sqlite_backend.get_meta(sqlite_backend.db_path_for(caminho), "migrado_de")
+    store._MIGRADOS.clear()
+
+
+def test_esquema_criado_uma_vez(tmp_path):
+    db_path = tmp_path / "x.sqlite3"
+    with sqlite_backend.connect(db_path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == sqlite_backend._VERSAO_ESQUEMA
+    conn.close()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from app.data import sqlite_backend, store
+from app.utils import security
+
+
+@pytest.fixture
+def empresa(tmp_path, monkeypatch):
+    monkeypatch.delenv("APP_ENV", raising=False)
+    caminho = tmp_path / "empresa.json"
+    assert store.save_data(
+        caminho,
+        [
+            {"id": "a", "data": "01/02/2024", "tipo": "Aluguel", "valor": 10.0},
+            {"id": "b", "data": "02/02/2024", "tipo": "Outros", "valor": 20.0},
+        ],
+    )
+    yield caminho
+    store._DATA_CACHE.clear()
+    store._CUBOS.clear()
+    store._CUBOS_PENDENTES.clear()
+
+
+def _por_id(registros):
+    return {registro["id"]: registro["valor"] for registro in registros}
+
+
+def _do_disco(caminho):
+    store._DATA_CACHE.clear()
+    return _por_id(store.load_data(caminho))
+
+
+def _operar(caminho):
+    assert store.append_record(caminho, {"id": "c", "data": "03/02/2024", "tipo": "Outros", "valor": 30.0})
+    assert store.update_record(caminho, {"id": "a", "data": "01/02/2024", "tipo": "Aluguel", "valor": 11.0})
+    assert store.delete_record(caminho, "b")
+
+
+def test_operacoes_vao_ao_diario_e_sao_reaplicadas(empresa):
+    snapshot = empresa.read_bytes()
+    _operar(empresa)
+    assert empresa.read_bytes() == snapshot
+    linhas = store._journal_path(empresa).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(linha)["op"] for linha in linhas] == ["insert", "update", "delete"]
+
+    assert _do_disco(empresa) == {"a": 11.0, "c": 30.0}
+    assert _por_id(store.iter_records(empresa)) == {"a": 11.0, "c": 30.0}
+
+
+def test_manifesto_do_diario_usa_blocos_pequenos(empresa):
+    _operar(empresa)
+    journal = store._journal_path(empresa)
+    manifesto = security._parse_manifest(security._read_sidecar(journal))
+    assert manifesto["bloco"] == store._JOURNAL_BLOCK
+    assert security.checksum_is_valid(journal)
+
+
+def test_compactacao_incorpora_e_descarta_o_diario(empresa):
+    _operar(empresa)
+    assert store.compact(empresa)
+    assert not store._journal_path(empresa).exists()
+    with open(empresa, encoding="utf-8") as handler:
+        assert _por_id(json.load(handler)) == {"a": 11.0, "c": 30.0}
+    assert _do_disco(empresa) == {"a": 11.0, "c": 30.0}
+
+
+def test_compacta_sozinho_ao_atingir_o_limite(empresa, monkeypatch):
+    monkeypatch.setattr(store, "_COMPACT_THRESHOLD", 3)
+    assert store.append_record(empresa, {"id": "c", "valor": 1.0})
+    assert store.append_record(empresa, {"id": "d", "valor": 2.0})
+    assert store._journal_path(empresa).exists()
+    assert store.append_record(empresa, {"id": "e", "valor": 3.0})
+    assert not store._journal_path(empresa).exists()
+    assert set(_do_disco(empresa)) == {"a", "b", "c", "d", "e"}
+
+
+
+def test_edicao_ou_exclusao_de_id_inexistente_falha(empresa):
+    assert not store.update_record(empresa, {"id": "zz", "valor": 1.0})
+    assert not store.delete_record(empresa, "zz")
+    assert not store._journal_path(empresa).exists()
+    assert _do_disco(empresa) == {"a": 10.0, "b": 20.0}
+
+
+def test_sqlite_recusa_edicao_ou_exclusao_de_id_inexistente(tmp_path):
+    banco = tmp_path / "empresa.sqlite3"
+    sqlite_backend.upsert(banco, {"id": "a", "valor": 1.0})
+    assert not sqlite_backend.update(banco, {"id": "zz", "valor": 2.0})
+    assert not sqlite_backend.delete(banco, "zz")
+    assert sqlite_backend.update(banco, {"id": "a", "valor": 3.0})
+    assert [registro["valor"] for registro in sqlite_backend.iter_records(banco)] == [3.0]
+    assert sqlite_backend.delete(banco, "a")
+
+
+def test_diario_antigo_com_edicao_orfa_e_ignorado_nas_duas_leituras(empresa):
+    assert store.append_record(empresa, {"id": "c", "valor": 30.0})
+    journal = store._journal_path(empresa)
+    with open(journal, "a", encoding="utf-8") as handler:
+        handler.write(json.dumps({"op": "update", "id": "zz", "registro": {"valor": 1.0}}) + "\n")
+    security.persist_manifest(journal)
+    assert _do_disco(empresa) == {"a": 10.0, "b": 20.0, "c": 30.0}
+    assert _por_id(store.iter_records(empresa)) == {"a": 10.0, "b": 20.0, "c": 30.0}
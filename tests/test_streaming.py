@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from app.data import store
+from app.utils.security import persist_checksum
+
+VALIDOS = [
+    "[]",
+    " [ ] ",
+    "[1]",
+    "[1, 2 ,3]",
+    '﻿[{"a": [1, 2]}, "x,]", null]',
+    '[\n  {"valor": 1.5},\n  {"valor": 2}\n]\n',
+    "[" + ", ".join(json.dumps({"i": i, "t": "é" * i}) for i in range(40)) + "]",
+]
+
+INVALIDOS = [
+    "",
+    "[1,,2]",
+    "[1 2]",
+    "[,1]",
+    "[1,]",
+    "[1",
+    "[1,",
+    "[1] 2",
+    '[{"a": 1]',
+]
+
+
+@pytest.fixture(autouse=True)
+def blocos_pequenos(monkeypatch):
+    # Força itens e separadores a atravessarem o fim dos blocos
+    monkeypatch.setattr(store, "_READ_CHUNK", 3)
+
+
+@pytest.mark.parametrize("texto", VALIDOS)
+def test_itens_iguais_aos_do_json_load(tmp_path, texto):
+    arquivo = tmp_path / "dados.json"
+    arquivo.write_text(texto, encoding="utf-8")
+    assert list(store._iter_json_array(arquivo)) == json.loads(texto.lstrip("﻿"))
+
+
+@pytest.mark.parametrize("texto", INVALIDOS)
+def test_rejeita_o_que_o_json_load_rejeita(tmp_path, texto):
+    arquivo = tmp_path / "dados.json"
+    arquivo.write_text(texto, encoding="utf-8")
+    with pytest.raises(ValueError):
+        json.loads(texto)
+    with pytest.raises(ValueError):
+        list(store._iter_json_array(arquivo))
+
+
+def test_exige_array_no_topo(tmp_path):
+    arquivo = tmp_path / "dados.json"
+    arquivo.write_text('{"a": 1}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(store._iter_json_array(arquivo))
+
+
+def test_iter_records_avisa_o_truncamento(tmp_path, monkeypatch):
+    monkeypatch.delenv("APP_ENV", raising=False)
+    caminho = tmp_path / "empresa.json"
+    assert store.save_data(caminho, [{"data": "01/02/2024", "valor": float(i)} for i in range(5)])
+    store._DATA_CACHE.clear()
+    assert [registro["valor"] for registro in store.iter_records(caminho, limit=2, offset=1)] == [1.0, 2.0]
+
+    texto = caminho.read_text(encoding="utf-8")
+    caminho.write_text(texto[: len(texto) // 2], encoding="utf-8")
+    persist_checksum(caminho)
+    entregues = []
+    with pytest.raises(ValueError):
+        for registro in store.iter_records(caminho):
+            entregues.append(registro)
+    assert 0 < len(entregues) < 5
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from app.data import store
+from app.data.cube import AggregateCube
+from app.data.suppliers import CanonicalSuppliers, _agrupar_conjuntos, supplier_tokens
+from app.data.table import ExpenseTable
+
+
+def test_tokens_ignoram_sufixo_acento_e_pontuacao():
+    assert supplier_tokens("Atacadão S.A.") == supplier_tokens("ATACADAO SA") == ("ATACADAO",)
+    assert supplier_tokens("Comércio de Alimentos Ltda") == ("ALIM", "COM")
+
+
+def test_variantes_caem_no_mesmo_id_mais_usado():
+    tabela = CanonicalSuppliers.build({"ATACADAO S.A.": 3, "Atacadão SA": 1, "ATACADAO LTDA": 1, "MAKRO": 2})
+    assert tabela.ids == {"ATACADÃO SA": "ATACADAO S.A.", "ATACADAO LTDA": "ATACADAO S.A."}
+    assert "MAKRO" not in tabela.ids
+
+
+def _forca_bruta(conjuntos, limiar, peso):
+    grupos = list(range(len(conjuntos)))
+
+    def raiz(item):
+        while grupos[item] != item:
+            item = grupos[item]
+        return item
+
+    for a in range(len(conjuntos)):
+        for b in range(a):
+            comuns = sum(peso[t] for t in set(conjuntos[a]) & set(conjuntos[b]))
+            uniao = sum(peso[t] for t in set(conjuntos[a]) | set(conjuntos[b]))
+            if uniao and comuns / uniao >= limiar:
+                ra, rb = raiz(a), raiz(b)
+                grupos[max(ra, rb)] = min(ra, rb)
+    return [raiz(item) for item in range(len(conjuntos))]
+
+
+@pytest.mark.parametrize("limiar", [0.5, 0.8])
+def test_filtragem_por_prefixo_igual_a_forca_bruta(limiar):
+    import math
+
+    sorteio = random.Random(7)
+    vocabulario = [f"T{i}" for i in range(30)]
+    conjuntos = list(
+        {tuple(sorted(set(sorteio.sample(vocabulario, sorteio.randint(1, 4))))) for _ in range(300)}
+    )
+    frequencia = {}
+    for conjunto in conjuntos:
+        for token in conjunto:
+            frequencia[token] = frequencia.get(token, 0) + 1
+    peso = {token: math.log(1 + len(conjuntos) / vezes) for token, vezes in frequencia.items()}
+
+    grupos = _agrupar_conjuntos(conjuntos, limiar)
+    esperado = _forca_bruta(conjuntos, limiar, peso)
+    for a in range(len(conjuntos)):
+        for b in range(a):
+            assert (grupos.raiz(a) == grupos.raiz(b)) == (esperado[a] == esperado[b])
+
+
+def test_top_suppliers_agrupa_por_id_canonico():
+    registros = [
+        {"data": "01/03/2024", "fornecedor": "ATACADAO S.A.", "valor": 50.0},
+        {"data": "02/03/2024", "fornecedor": "ATACADAO SA", "valor": 40.0},
+        {"data": "03/03/2024", "fornecedor": "MAKRO", "valor": 70.0},
+        {"data": "03/02/2024", "fornecedor": "MAKRO", "valor": 700.0},
+    ]
+    canonicos = {"ATACADAO SA": "ATACADAO S.A."}
+    for agregado in (ExpenseTable.from_records(registros), AggregateCube.from_records(registros)):
+        assert agregado.top_suppliers(month="2024-03") == [("MAKRO", 70.0), ("ATACADAO S.A.", 50.0), ("ATACADAO SA", 40.0)]
+        assert agregado.top_suppliers(1, month="2024-03", canonical=canonicos) == [("ATACADAO S.A.", 90.0)]
+        assert agregado.top_suppliers(1, canonical=canonicos) == [("MAKRO", 770.0)]
+
+
+def test_tabela_so_e_refeita_quando_os_nomes_mudam(tmp_path, monkeypatch):
+    monkeypatch.delenv("APP_ENV", raising=False)
+    caminho = tmp_path / "empresa.json"
+    registros = [{"data": "01/03/2024", "fornecedor": nome, "valor": 1.0} for nome in ("ATACADAO S.A.", "ATACADAO SA")]
+    assert store.save_data(caminho, registros)
+
+    primeira = store.refresh_canonical_suppliers(caminho)
+    # Empate no uso: fica a grafia mais curta
+    assert primeira.ids == {"ATACADAO S.A.": "ATACADAO SA"}
+    assert store.get_canonical_suppliers(caminho).origem == primeira.origem
+
+    store.append_record(caminho, {"data": "02/03/2024", "fornecedor": "ATACADAO SA", "valor": 1.0})
+    assert store.refresh_canonical_suppliers(caminho).origem == primeira.origem
+
+    store.append_record(caminho, {"data": "02/03/2024", "fornecedor": "Atacadão Ltda", "valor": 1.0})
+    nova = store.refresh_canonical_suppliers(caminho)
+    assert nova.origem != primeira.origem
+    assert nova.ids["ATACADÃO LTDA"] == "ATACADAO SA"
+    store._DATA_CACHE.clear()
+    store._CUBOS.clear()
+
+
+def test_contagens_de_fornecedor_iguais_na_tabela_e_no_cubo():
+    registros = [
+        {"fornecedor": "Makro", "valor": 1.0},
+        {"fornecedor": "MAKRO ", "valor": 2.0},
+        {"fornecedor": "", "valor": 3.0},
+        {"fornecedor": "ATACADAO SA", "valor": 4.0},
+    ]
+    tabela = ExpenseTable.from_records(registros)
+    tabela.discard(3)
+    assert tabela.supplier_counts() == AggregateCube.from_records(registros[:3]).supplier_counts() == {"MAKRO": 2}
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from app.data.table import ExpenseTable
+
+REGISTROS = [
+    {"id": "a", "data": "01/02/2024", "tipo": "Aluguel", "valor": 10.0},
+    {"id": "b", "data": "02/02/2024", "tipo": "Outros", "valor": 20.0},
+    {"id": "c", "data": "03/03/2024", "tipo": "Aluguel", "valor": 5.5},
+]
+
+
+def test_copia_da_tabela_nao_acompanha_alteracoes():
+    tabela = ExpenseTable.from_records(REGISTROS)
+    copia = tabela.snapshot()
+    for numero in range(100):
+        tabela.append({"tipo": f"Nova {numero}", "fornecedor": "MAKRO", "valor": 1.0})
+    tabela.update(0, dict(REGISTROS[0], valor=99.0))
+    tabela.discard(1)
+
+    assert len(copia) == 3
+    assert copia.total() == (3550, 3)
+    assert copia.by_category() == {"Aluguel": 15.5, "Outros": 20.0}
+    assert copia.supplier_counts() == {}
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from app.data.table import ExpenseTable
+from app.data.totals import RunningTotals
+
+REGISTROS = [
+    {"id": "a", "data": "01/02/2024", "tipo": "Aluguel", "valor": 10.0},
+    {"id": "b", "data": "02/02/2024", "tipo": "Outros", "valor": 20.0},
+    {"id": "c", "data": "03/03/2024", "tipo": "Aluguel", "valor": 5.5},
+]
+
+
+def test_deltas_batem_com_a_recontagem():
+    filtros = {"tipo": "aluguel"}
+    totais = RunningTotals.from_table(ExpenseTable.from_records(REGISTROS[:2]), filtros)
+    totais.add(REGISTROS[2])
+    totais.replace(REGISTROS[1], dict(REGISTROS[1], tipo="Aluguel", valor=1.0))
+    totais.remove(REGISTROS[0])
+
+    finais = [dict(REGISTROS[1], tipo="Aluguel", valor=1.0), REGISTROS[2]]
+    recontado = RunningTotals.from_table(ExpenseTable.from_records(finais), filtros)
+    assert totais.overall == recontado.overall == (650, 2)
+    assert totais.filtered == recontado.filtered == (650, 2)
+
+    totais.add({"id": "d", "tipo": "Outros", "valor": 2.0})
+    assert totais.overall == (850, 3)
+    assert totais.filtered == (650, 2)